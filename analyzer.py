@@ -6,9 +6,12 @@ import re
 from typing import Dict, Tuple, Optional, Any
 from dataclasses import dataclass
 import pandas as pd
-import glob
 import numpy as np
 
+from details_decoder import decode_tray_details
+from log_tail_reader import LogTailReader
+from log_catalog import LogFileCatalog, LIVE_LOCATIONS
+
 @dataclass
 class WorkerPerformance:
     worker: str
@@ -29,58 +32,134 @@ class WorkerPerformance:
 class DataAnalyzer:
     def __init__(self):
         self.raw_event_df: pd.DataFrame = pd.DataFrame()
+        # 실시간(date_filter) 로딩용 증분 상태: 파일별 오프셋, 누적 이벤트/세션, 마지막 트레이 완료 행
+        self.tail_reader = LogTailReader()
+        self._live_events: Dict[str, list] = {}
+        self._live_sessions: Dict[str, pd.DataFrame] = {}
+        self._live_last_tray: Dict[str, pd.DataFrame] = {}
+        # 로그 파일 목록 색인 (폴더 glob 재검색 대신 사용)
+        self.catalog = LogFileCatalog()
+
+    def _prepare_event_frame(self, df: pd.DataFrame, file_path: str, process_mode: str) -> Optional[pd.DataFrame]:
+        """로그 파일 DataFrame에 worker/process 컬럼을 채우고 timestamp를 변환 (대상 외 파일은 None)"""
+        filename = os.path.basename(file_path)
+        
+        if '이적작업이벤트로그' in filename:
+            current_process = "이적실"
+        elif '포장실작업이벤트로그' in filename:
+            current_process = "포장실"
+        elif '검사작업이벤트로그' in filename:
+            current_process = "검사실"
+        else:
+            return None
+
+        if process_mode not in ["전체", "전체 비교"] and (
+            (process_mode == "이적실" and current_process != "이적실") or
+            (process_mode == "포장실" and current_process != "포장실") or
+            (process_mode == "검사실" and current_process != "검사실")
+        ):
+            return None
+        
+        if 'worker_name' in df.columns: df.rename(columns={'worker_name': 'worker'}, inplace=True)
+        
+        if 'worker' not in df.columns:
+            if current_process == "이적실":
+                match = re.search(r'이적작업이벤트로그_([^_]+)_\d{8}\.csv', filename)
+                df['worker'] = match.group(1) if match else 'UNKNOWN_WORKER'
+            elif current_process == "검사실":
+                match = re.search(r'검사작업이벤트로그_([^_]+)_\d{8}\.csv', filename)
+                df['worker'] = match.group(1) if match else 'UNKNOWN_WORKER'
+            else:
+                df['worker'] = 'UNKNOWN_WORKER'
+
+        df['worker'], df['process'] = df['worker'].astype(str), current_process
+        if not all(h in df.columns for h in ['timestamp', 'event', 'details']): return None
+        
+        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+        df.dropna(subset=['timestamp'], inplace=True)
+        return df
+
+    def _load_live_data(self, target_files: list, process_mode: str) -> pd.DataFrame:
+        """실시간 로딩 - 파일별로 마지막 호출 이후 추가된 행만 읽어 세션화하고 기존 결과에 이어붙임
+
+        각 파일의 마지막 TRAY_COMPLETE 행을 함께 넘겨 새 구간 첫 트레이의 준비시간(latency)도
+        전체 로딩과 같은 방식으로 계산한다.
+        """
+        # 대상에서 빠진 파일(날짜 변경, 아카이브 이동 등)의 상태 정리
+        for file_path in list(self._live_events):
+            if file_path not in target_files:
+                self._live_events.pop(file_path, None)
+                self._live_sessions.pop(file_path, None)
+                self._live_last_tray.pop(file_path, None)
+                self.tail_reader.forget(file_path)
+
+        for file_path in target_files:
+            try:
+                delta = self.tail_reader.read_new_rows(file_path)
+                if self.tail_reader.consume_reset(file_path):
+                    # 파일이 교체/절단된 경우 누적 결과 초기화
+                    self._live_events.pop(file_path, None)
+                    self._live_sessions.pop(file_path, None)
+                    self._live_last_tray.pop(file_path, None)
+                if delta.empty: continue
+                delta = self._prepare_event_frame(delta, file_path, process_mode)
+                if delta is None or delta.empty: continue
+            except Exception as e:
+                print(f"ERROR: Event log file '{file_path}' processing error: {e}")
+                continue
+
+            self._live_events.setdefault(file_path, []).append(delta)
+
+            carry = self._live_last_tray.get(file_path)
+            events = delta if carry is None else pd.concat([carry, delta])
+            new_sessions = self.process_events_to_sessions(events)
+            if carry is not None and not new_sessions.empty:
+                new_sessions = new_sessions.drop(index=carry.index, errors='ignore')
+
+            trays = delta[delta['event'] == 'TRAY_COMPLETE']
+            if not trays.empty:
+                # 인덱스 -1은 이어붙일 새 구간(0부터 시작)과 겹치지 않는 표식
+                self._live_last_tray[file_path] = trays.iloc[[-1]].set_axis([-1])
+
+            if not new_sessions.empty:
+                previous = self._live_sessions.get(file_path)
+                self._live_sessions[file_path] = new_sessions if previous is None else pd.concat([previous, new_sessions], ignore_index=True)
+
+        event_chunks = [chunk for chunks in self._live_events.values() for chunk in chunks]
+        if not event_chunks:
+            self.raw_event_df = pd.DataFrame()
+            return pd.DataFrame()
+
+        self.raw_event_df = pd.concat(event_chunks, ignore_index=True)
+        session_frames = [df for df in self._live_sessions.values() if not df.empty]
+        if not session_frames: return pd.DataFrame()
+        return pd.concat(session_frames, ignore_index=True)
 
     def load_all_data(self, folder_path: str, process_mode: str, date_filter: Optional[datetime.date] = None) -> pd.DataFrame:
         all_event_data_dfs, target_files = [], []
 
+        # 파일 목록은 로그 카탈로그 색인으로 조회 ("전체"/"전체 비교"는 공정 구분 없이 모두)
+        self.catalog.refresh(folder_path)
         if date_filter:
-            # 메인 폴더와 날짜별 아카이브에서 모두 검색
-            main_logs = glob.glob(os.path.join(folder_path, '*작업이벤트로그*.csv'))
-            archive_logs = glob.glob(os.path.join(folder_path, '2025-*', '*작업이벤트로그*.csv'))
-            all_log_files = main_logs + archive_logs
-
-            date_str_today = date_filter.strftime('%Y%m%d')
-            yesterday = date_filter - datetime.timedelta(days=1)
-            date_str_yesterday = yesterday.strftime('%Y%m%d')
-            all_log_files = [
-                f for f in all_log_files
-                if f"_{date_str_today}.csv" in os.path.basename(f) or f"_{date_str_yesterday}.csv" in os.path.basename(f)
-            ]
-            print(f"실시간 로딩: {len(all_log_files)}개 파일만 읽습니다. (경로: {folder_path}, 아카이브 포함)")
+            # 메인 폴더와 날짜별 아카이브의 오늘/어제 파일만
+            target_files = self.catalog.get_files(
+                folder_path, process_mode,
+                start_date=date_filter - datetime.timedelta(days=1), end_date=date_filter,
+                locations=LIVE_LOCATIONS, include_undated=False,
+            )
+            print(f"실시간 로딩: {len(target_files)}개 파일만 읽습니다. (경로: {folder_path}, 아카이브 포함)")
         else:
             print(f"전체 데이터 로딩: '{folder_path}' 및 날짜별 아카이브 폴더를 모두 검색합니다.")
-            main_folder_logs = glob.glob(os.path.join(folder_path, '*작업이벤트로그*.csv'))
-
-            # 날짜별 아카이브 폴더 검색 (2025-XX-XX 형태)
-            archived_logs = []
-            archived_logs.extend(glob.glob(os.path.join(folder_path, '2025-*', '*작업이벤트로그*.csv')))
-
-            # 분기별 백업 폴더도 검색 (quarterly_backup/Q1-2025 등)
-            quarterly_path = os.path.join(os.path.dirname(folder_path), 'quarterly_backup')
-            if os.path.isdir(quarterly_path):
-                archived_logs.extend(glob.glob(os.path.join(quarterly_path, '**', '*작업이벤트로그*.csv'), recursive=True))
-
-            # 기존 log 폴더도 호환성을 위해 유지
-            log_archive_path = os.path.join(folder_path, 'log')
-            if os.path.isdir(log_archive_path):
-                archived_logs.extend(glob.glob(os.path.join(log_archive_path, '**', '*작업이벤트로그*.csv'), recursive=True))
-
-            all_log_files = main_folder_logs + archived_logs
-            print(f"총 {len(all_log_files)}개의 로그 파일 발견 (메인: {len(main_folder_logs)}, 아카이브: {len(archived_logs)}).")
-
-        if process_mode == '포장실':
-            target_files = [f for f in all_log_files if '포장실작업이벤트로그' in os.path.basename(f)]
-        elif process_mode == '이적실':
-            target_files = [f for f in all_log_files if '이적작업이벤트로그' in os.path.basename(f)]
-        elif process_mode == '검사실':
-            target_files = [f for f in all_log_files if '검사작업이벤트로그' in os.path.basename(f)]
-        else: # "전체" 또는 "전체 비교"
-            target_files = all_log_files
+            target_files = self.catalog.get_files(folder_path, process_mode)
+            print(f"총 {len(target_files)}개의 로그 파일 발견 (전체 색인: {self.catalog.count(folder_path)}개).")
 
         if not target_files:
             if date_filter: return pd.DataFrame()
             raise FileNotFoundError(f"지정한 폴더 경로에 '{process_mode}'에 대한 로그 파일이 없습니다.")
 
+        if date_filter:
+            return self._load_live_data(target_files, process_mode)
+
         for file_path in target_files:
             if os.path.getsize(file_path) == 0: continue
             
@@ -95,45 +174,9 @@ class DataAnalyzer:
             if df is None or df.empty: continue
             
             try:
-                filename = os.path.basename(file_path)
-                
-                if '이적작업이벤트로그' in filename:
-                    current_process = "이적실"
-                elif '포장실작업이벤트로그' in filename:
-                    current_process = "포장실"
-                elif '검사작업이벤트로그' in filename:
-                    current_process = "검사실"
-                else:
-                    continue
-
-                if process_mode not in ["전체", "전체 비교"] and (
-                    (process_mode == "이적실" and current_process != "이적실") or
-                    (process_mode == "포장실" and current_process != "포장실") or
-                    (process_mode == "검사실" and current_process != "검사실")
-                ):
-                    continue
-                
-                if 'worker_name' in df.columns: df.rename(columns={'worker_name': 'worker'}, inplace=True)
-                
-                if 'worker' not in df.columns:
-                    if current_process == "이적실":
-                        match = re.search(r'이적작업이벤트로그_([^_]+)_\d{8}\.csv', filename)
-                        df['worker'] = match.group(1) if match else 'UNKNOWN_WORKER'
-                    elif current_process == "검사실":
-                        match = re.search(r'검사작업이벤트로그_([^_]+)_\d{8}\.csv', filename)
-                        df['worker'] = match.group(1) if match else 'UNKNOWN_WORKER'
-                    else:
-                        df['worker'] = 'UNKNOWN_WORKER'
-
-                df['worker'], df['process'] = df['worker'].astype(str), current_process
-                if not all(h in df.columns for h in ['timestamp', 'event', 'details']): continue
-                
-                df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-                df.dropna(subset=['timestamp'], inplace=True)
-                if df.empty: continue
-                
+                df = self._prepare_event_frame(df, file_path, process_mode)
                 # `details` 파싱 로직을 `process_events_to_sessions`로 이동
-                if not df.empty: all_event_data_dfs.append(df)
+                if df is not None and not df.empty: all_event_data_dfs.append(df)
 
             except Exception as e:
                 print(f"ERROR: Event log file '{file_path}' processing error: {e}")
@@ -153,57 +196,16 @@ class DataAnalyzer:
         completed_trays_df = event_df[event_df['event'] == 'TRAY_COMPLETE'].copy()
         if completed_trays_df.empty: return pd.DataFrame()
 
-        def _parse_details(detail_data):
-            """JSON과 새로운 QR 형식(key=value|...)을 모두 처리하는 헬퍼 함수"""
-            if isinstance(detail_data, dict):
-                return detail_data # 이미 dict 형태이면 그대로 반환
-            if not isinstance(detail_data, str):
-                return {}
-
-            # 1. JSON 파싱 시도
-            try:
-                if detail_data.strip().startswith('{'):
-                    return json.loads(detail_data)
-            except (json.JSONDecodeError, TypeError):
-                pass
-
-            # 2. QR 형식 파싱 시도
-            try:
-                if '|' in detail_data and '=' in detail_data:
-                    # 'PHS=1|CLC=...' 형식의 데이터를 dict로 변환
-                    return dict(item.split('=', 1) for item in detail_data.split('|') if '=' in item)
-            except ValueError: # '='가 없는 항목 등으로 인한 오류 방지
-                pass
-
-            return {} # 어떤 형식에도 해당하지 않으면 빈 dict 반환
-
-        # apply를 사용하여 details 컬럼을 일괄적으로 파싱
-        completed_trays_df['details'] = completed_trays_df['details'].apply(_parse_details)
-
-        def safe_get(d, k, default):
-            return d.get(k, default) if isinstance(d, dict) else default
-
-        details_series = completed_trays_df['details']
-        
-        completed_trays_df['start_time_str'] = details_series.apply(lambda d: safe_get(d, 'start_time', ''))
-        completed_trays_df['start_time_dt'] = pd.to_datetime(completed_trays_df['start_time_str'], errors='coerce')
+        # details(JSON / QR 형식)를 한 번만 파싱하여 세션 필드를 컬럼 단위로 일괄 변환
+        decoded = decode_tray_details(completed_trays_df['details'], completed_trays_df['process'])
+        completed_trays_df['start_time_dt'] = decoded['start_time']
         completed_trays_df.dropna(subset=['start_time_dt'], inplace=True)
         if completed_trays_df.empty: return pd.DataFrame()
 
         completed_trays_df = completed_trays_df.sort_values(by=['worker', 'start_time_dt']).copy()
+        decoded = decoded.loc[completed_trays_df.index]
         completed_trays_df['prev_end_time'] = completed_trays_df.groupby('worker')['timestamp'].shift(1)
         completed_trays_df['latency'] = (completed_trays_df['start_time_dt'] - pd.to_datetime(completed_trays_df['prev_end_time'], errors='coerce')).dt.total_seconds().fillna(0).clip(lower=0)
-        
-        def calculate_pcs(row):
-            details = row['details']
-            if row['process'] == '포장실':
-                return 60
-            elif row['process'] == '검사실':
-                return safe_get(details, 'good_count', 0) + safe_get(details, 'defective_count', 0)
-            else: # 이적실
-                return safe_get(details, 'scan_count', 0)
-
-        pcs_completed_values = completed_trays_df.apply(calculate_pcs, axis=1)
 
         sessions_df = pd.DataFrame({
             'date': completed_trays_df['start_time_dt'].dt.date,
@@ -211,31 +213,30 @@ class DataAnalyzer:
             'end_time_dt': completed_trays_df['timestamp'],
             
             # --- 신규/변경 필드 ---
-            'shipping_date': details_series.apply(lambda d: safe_get(d, 'OBD', safe_get(d, 'shipping_date', pd.NaT))), # OBD 우선
-            'item_code': details_series.apply(lambda d: safe_get(d, 'CLC', safe_get(d, 'item_code', 'N/A'))), # CLC 우선
-            'work_order_id': details_series.apply(lambda d: safe_get(d, 'WID', 'N/A')),
-            'phase': details_series.apply(lambda d: safe_get(d, 'PHS', 'N/A')),
-            'supplier_code': details_series.apply(lambda d: safe_get(d, 'SPC', 'N/A')),
-            'product_batch': details_series.apply(lambda d: safe_get(d, 'FPB', 'N/A')),
-            'item_group': details_series.apply(lambda d: safe_get(d, 'IG', 'N/A')),
+            'shipping_date': decoded['shipping_date'], # OBD 우선
+            'item_code': decoded['item_code'], # CLC 우선
+            'work_order_id': decoded['work_order_id'],
+            'phase': decoded['phase'],
+            'supplier_code': decoded['supplier_code'],
+            'product_batch': decoded['product_batch'],
+            'item_group': decoded['item_group'],
             
             # --- 기존 필드 (호환성 유지) ---
             'worker': completed_trays_df['worker'],
             'process': completed_trays_df['process'],
-            'item_name': details_series.apply(lambda d: safe_get(d, 'item_name', '')), # item_name은 기존 유지
-            'work_time': details_series.apply(lambda d: float(safe_get(d, 'work_time', safe_get(d, 'work_time_sec', 0.0)))),
+            'item_name': decoded['item_name'], # item_name은 기존 유지
+            'work_time': decoded['work_time'],
             'latency': completed_trays_df['latency'],
-            'idle_time': details_series.apply(lambda d: float(safe_get(d, 'idle_time', safe_get(d, 'total_idle_seconds', 0.0)))),
-            'process_errors': details_series.apply(lambda d: int(safe_get(d, 'process_errors', safe_get(d, 'error_count', 0)))),
-            'had_error': details_series.apply(lambda d: int(safe_get(d, 'had_error', safe_get(d, 'has_error_or_reset', False)))),
-            'is_partial': details_series.apply(lambda d: safe_get(d, 'is_partial', safe_get(d, 'is_partial_submission', False))),
-            'is_restored': details_series.apply(lambda d: safe_get(d, 'is_restored_session', False)),
-            'is_test': details_series.apply(lambda d: safe_get(d, 'is_test', safe_get(d, 'is_test_tray', False))),
-            'pcs_completed': pcs_completed_values,
-            'defective_count': details_series.apply(lambda d: int(safe_get(d, 'defective_count', 0)))
+            'idle_time': decoded['idle_time'],
+            'process_errors': decoded['process_errors'],
+            'had_error': decoded['had_error'],
+            'is_partial': decoded['is_partial'],
+            'is_restored': decoded['is_restored'],
+            'is_test': decoded['is_test'],
+            'pcs_completed': decoded['pcs_completed'],
+            'defective_count': decoded['defective_count']
         })
 
-        sessions_df['shipping_date'] = pd.to_datetime(sessions_df['shipping_date'], errors='coerce')
         sessions_df['item_display'] = sessions_df['item_name'].astype(str) + " (" + sessions_df['item_code'].astype(str) + ")"
         
         return sessions_df
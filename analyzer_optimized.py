@@ -6,11 +6,14 @@ import re
 from typing import Dict, Tuple, Optional, Any
 from dataclasses import dataclass
 import pandas as pd
-import glob
 import numpy as np
 import logging
+from concurrent.futures import ProcessPoolExecutor
 
 from cache_manager import DataCache, SessionCache, OptimizedDataManager
+from details_decoder import decode_tray_details
+from log_catalog import LIVE_LOCATIONS
+from log_tail_reader import process_from_filename
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,99 +35,125 @@ class WorkerPerformance:
     best_work_time: float = float('inf')
     best_work_time_date: Optional[datetime.date] = None
 
+# 캐시 미스 파일이 이 개수 이상일 때만 프로세스 풀로 병렬 처리
+PARALLEL_INGEST_MIN_FILES = 4
+
+# 프로세스 풀 워커별 분석기 (워커 프로세스 안에서만 사용)
+_worker_analyzer = None
+
+
+def _init_ingest_worker(cache_dir: str):
+    """프로세스 풀 워커 초기화 - 워커마다 분석기를 한 번만 생성"""
+    global _worker_analyzer
+    _worker_analyzer = OptimizedDataAnalyzer(cache_dir=cache_dir, ingest_workers=1)
+
+
+def _ingest_file_worker(file_path: str, process_mode: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """워커 프로세스에서 단일 파일 처리 후 자체 DataCache 항목 저장
+
+    추적용 raw 이벤트는 워커에 누적하지 않고 세션과 함께 반환하여 부모 프로세스가 병합한다.
+    """
+    sessions = _worker_analyzer._ingest_single_file(file_path, process_mode)
+    raw_events = _worker_analyzer.raw_event_df
+    _worker_analyzer.raw_event_df = pd.DataFrame()
+    return sessions, raw_events
+
+
 class OptimizedDataAnalyzer:
-    def __init__(self):
+    def __init__(self, cache_dir: str = 'cache', ingest_workers: Optional[int] = None):
+        """
+        Args:
+            cache_dir: 파일 캐시 디렉토리
+            ingest_workers: 캐시 미스 파일 병렬 처리에 사용할 프로세스 수
+                            (None이면 CPU 코어 수, 1이면 순차 처리)
+        """
         self.raw_event_df: pd.DataFrame = pd.DataFrame()
-        self.data_manager = OptimizedDataManager()
+        self.data_manager = OptimizedDataManager(cache_dir)
+        self.cache_dir = cache_dir
+        self.ingest_workers = ingest_workers if ingest_workers is not None else (os.cpu_count() or 1)
+        self._seen_catalog_changes = 0
         logger.info("최적화된 데이터 분석기 초기화 완료")
 
     def load_all_data(self, folder_path: str, process_mode: str, date_filter: Optional[datetime.date] = None,
-                     start_date: str = None, end_date: str = None) -> pd.DataFrame:
-        """최적화된 데이터 로딩 - 캐싱 및 날짜 필터링 적용"""
+                     start_date: str = None, end_date: str = None, columns: Optional[list] = None) -> pd.DataFrame:
+        """최적화된 데이터 로딩 - 캐싱 및 날짜 필터링 적용
 
-        # 세션 캐시 확인
-        if start_date and end_date and not date_filter:
-            cache_key = self.data_manager.session_cache.generate_cache_key(
-                process_mode, start_date, end_date, []
-            )
-            cached_sessions = self.data_manager.session_cache.get_sessions(cache_key)
-            if cached_sessions is not None:
-                logger.info(f"세션 캐시 히트: {len(cached_sessions)}개 세션")
-                return cached_sessions
+        Args:
+            columns: 필요한 세션 컬럼 목록 (None이면 전체). 파일 캐시에서 해당 컬럼만 읽는다.
+        """
 
-        # 파일 목록 결정
+        # 파일 목록 결정 (로그 카탈로그 색인 조회)
+        catalog = self.data_manager.catalog
         if start_date and end_date:
             # 날짜 범위 기반 파일 필터링
             target_files = self.data_manager.get_files_by_date_range(folder_path, start_date, end_date)
         elif date_filter:
-            # 실시간 모드 (오늘/어제 파일만)
-            main_logs = glob.glob(os.path.join(folder_path, '*작업이벤트로그*.csv'))
-            archive_logs = glob.glob(os.path.join(folder_path, '2025-*', '*작업이벤트로그*.csv'))
-            all_log_files = main_logs + archive_logs
-
-            date_str_today = date_filter.strftime('%Y%m%d')
-            yesterday = date_filter - datetime.timedelta(days=1)
-            date_str_yesterday = yesterday.strftime('%Y%m%d')
-            target_files = [
-                f for f in all_log_files
-                if f"_{date_str_today}.csv" in os.path.basename(f) or f"_{date_str_yesterday}.csv" in os.path.basename(f)
-            ]
+            # 실시간 모드 (메인 폴더와 날짜별 아카이브의 오늘/어제 파일만)
+            catalog.refresh(folder_path)
+            target_files = catalog.get_files(
+                folder_path, process_mode,
+                start_date=date_filter - datetime.timedelta(days=1), end_date=date_filter,
+                locations=LIVE_LOCATIONS, include_undated=False,
+            )
             logger.info(f"실시간 로딩: {len(target_files)}개 파일")
         else:
-            # 전체 데이터 로딩
-            main_folder_logs = glob.glob(os.path.join(folder_path, '*작업이벤트로그*.csv'))
-            archived_logs = []
-            archived_logs.extend(glob.glob(os.path.join(folder_path, '2025-*', '*작업이벤트로그*.csv')))
-
-            quarterly_path = os.path.join(os.path.dirname(folder_path), 'quarterly_backup')
-            if os.path.isdir(quarterly_path):
-                archived_logs.extend(glob.glob(os.path.join(quarterly_path, '**', '*작업이벤트로그*.csv'), recursive=True))
-
-            log_archive_path = os.path.join(folder_path, 'log')
-            if os.path.isdir(log_archive_path):
-                archived_logs.extend(glob.glob(os.path.join(log_archive_path, '**', '*작업이벤트로그*.csv'), recursive=True))
-
-            target_files = main_folder_logs + archived_logs
+            # 전체 데이터 로딩 (메인, 날짜별 아카이브, quarterly_backup, log 폴더)
+            catalog.refresh(folder_path)
+            target_files = catalog.get_files(folder_path, process_mode)
             logger.info(f"전체 로딩: {len(target_files)}개 파일")
 
-        # 프로세스별 파일 필터링
-        if process_mode == '포장실':
-            target_files = [f for f in target_files if '포장실작업이벤트로그' in os.path.basename(f)]
-        elif process_mode == '이적실':
-            target_files = [f for f in target_files if '이적작업이벤트로그' in os.path.basename(f)]
-        elif process_mode == '검사실':
-            target_files = [f for f in target_files if '검사작업이벤트로그' in os.path.basename(f)]
+        # 프로세스별 파일 필터링 (날짜 범위 조회 결과)
+        if start_date and end_date and process_mode in ('포장실', '이적실', '검사실'):
+            target_files = [f for f in target_files if process_from_filename(os.path.basename(f)) == process_mode]
 
         if not target_files:
             logger.warning(f"'{process_mode}'에 대한 로그 파일이 없습니다.")
             return pd.DataFrame()
 
-        # 캐시 활용한 파일 처리
-        all_sessions = []
-        cache_hits = 0
-        cache_misses = 0
+        # 세션 캐시 확인 (카탈로그 갱신에서 로그 파일 변경이 감지되면 세대 증가로 무효화)
+        if catalog.changes != self._seen_catalog_changes:
+            self._seen_catalog_changes = catalog.changes
+            self.data_manager.session_cache.bump_generation()
+        if start_date and end_date and not date_filter:
+            cache_key = self.data_manager.session_cache.generate_cache_key(
+                process_mode, start_date, end_date, []
+            )
+            if columns is not None:
+                cache_key += '_cols=' + ','.join(columns)
+            cached_sessions = self.data_manager.session_cache.get_sessions(cache_key)
+            if cached_sessions is not None:
+                logger.info(f"세션 캐시 히트: {len(cached_sessions)}개 세션")
+                return cached_sessions
 
-        for file_path in target_files:
+        # 캐시 활용한 파일 처리 (결과는 target_files 순서대로 병합)
+        file_results: Dict[int, pd.DataFrame] = {}
+        missed = []
+
+        for position, file_path in enumerate(target_files):
             if os.path.getsize(file_path) == 0:
                 continue
 
             # 캐시 확인
-            cached_sessions = self.data_manager.file_cache.get_cached_data(file_path)
+            cached_sessions = self.data_manager.file_cache.get_cached_data(file_path, columns)
             if cached_sessions is not None:
-                all_sessions.append(cached_sessions)
-                cache_hits += 1
+                file_results[position] = cached_sessions
             else:
-                # 새로 처리
-                sessions = self._process_single_file(file_path, process_mode)
-                if not sessions.empty:
-                    # 메모리 최적화 적용
-                    sessions = self.data_manager.optimize_dataframe(sessions)
-                    all_sessions.append(sessions)
-                    # 캐시에 저장
-                    self.data_manager.file_cache.save_cached_data(file_path, sessions)
-                cache_misses += 1
+                missed.append((position, file_path))
+
+        cache_hits, cache_misses = len(file_results), len(missed)
+
+        # 캐시 미스 파일 새로 처리 (파일별 캐시 저장 포함)
+        for (position, _), sessions in zip(missed, self._ingest_files([f for _, f in missed], process_mode)):
+            if not sessions.empty:
+                if columns is not None:
+                    sessions = sessions[[c for c in sessions.columns if c in set(columns)]]
+                file_results[position] = sessions
+
+        all_sessions = [file_results[position] for position in sorted(file_results)]
 
         logger.info(f"캐시 통계 - 히트: {cache_hits}, 미스: {cache_misses}")
+        if cache_misses:
+            self.data_manager.file_cache.enforce_budget()
 
         # 결과 합치기
         if all_sessions:
@@ -140,6 +169,39 @@ class OptimizedDataAnalyzer:
         else:
             return pd.DataFrame()
 
+    def _ingest_files(self, file_paths: list, process_mode: str) -> list:
+        """캐시 미스 파일 목록 처리 - 파일 수가 충분하면 프로세스 풀로 병렬 처리
+
+        반환 목록은 file_paths와 같은 순서의 세션 DataFrame 목록이다.
+        """
+        workers = min(self.ingest_workers, len(file_paths))
+        if workers > 1 and len(file_paths) >= PARALLEL_INGEST_MIN_FILES:
+            try:
+                logger.info(f"병렬 처리: {len(file_paths)}개 파일, 워커 {workers}개")
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_ingest_worker,
+                                         initargs=(self.cache_dir,)) as executor:
+                    results = list(executor.map(_ingest_file_worker, file_paths,
+                                                [process_mode] * len(file_paths)))
+                # 워커가 반환한 추적용 raw 이벤트를 순차 처리와 같은 파일 순서로 누적
+                raw_frames = [raw_events for _, raw_events in results if not raw_events.empty]
+                if raw_frames:
+                    self.raw_event_df = pd.concat([self.raw_event_df, *raw_frames], ignore_index=True)
+                return [sessions for sessions, _ in results]
+            except Exception as e:
+                logger.warning(f"병렬 처리 실패, 순차 처리로 전환: {e}")
+
+        return [self._ingest_single_file(file_path, process_mode) for file_path in file_paths]
+
+    def _ingest_single_file(self, file_path: str, process_mode: str) -> pd.DataFrame:
+        """단일 파일 처리 후 메모리 최적화 및 파일 캐시 저장"""
+        sessions = self._process_single_file(file_path, process_mode)
+        if not sessions.empty:
+            # 메모리 최적화 적용
+            sessions = self.data_manager.optimize_dataframe(sessions)
+            # 캐시에 저장
+            self.data_manager.file_cache.save_cached_data(file_path, sessions)
+        return sessions
+
     def _process_single_file(self, file_path: str, process_mode: str) -> pd.DataFrame:
         """단일 파일 처리"""
         try:
@@ -195,8 +257,11 @@ class OptimizedDataAnalyzer:
             logger.error(f"파일 처리 실패 {file_path}: {e}")
             return pd.DataFrame()
 
-    def process_events_to_sessions(self, event_df: pd.DataFrame) -> pd.DataFrame:
-        """이벤트 데이터를 세션으로 변환 (기존 로직 유지)"""
+    def process_events_to_sessions(self, event_df: pd.DataFrame, keep_raw: bool = True) -> pd.DataFrame:
+        """이벤트 데이터를 세션으로 변환 (기존 로직 유지)
+
+        keep_raw=False이면 추적용 raw_event_df에 누적하지 않는다 (증분 동기화용).
+        """
         if event_df.empty:
             return pd.DataFrame()
 
@@ -211,7 +276,8 @@ class OptimizedDataAnalyzer:
             return pd.DataFrame()
 
         # Raw 데이터 저장 (추적 기능용)
-        self.raw_event_df = pd.concat([self.raw_event_df, event_df], ignore_index=True)
+        if keep_raw:
+            self.raw_event_df = pd.concat([self.raw_event_df, event_df], ignore_index=True)
 
         # TRAY_COMPLETE 이벤트만 추출
         completed_trays_df = event_df[event_df['event'] == 'TRAY_COMPLETE'].copy()
@@ -219,77 +285,18 @@ class OptimizedDataAnalyzer:
         if completed_trays_df.empty:
             return pd.DataFrame()
 
-        # 세션 데이터 구성
-        def safe_get(d, key, default=None):
-            if isinstance(d, dict):
-                return d.get(key, default)
-            elif isinstance(d, str):
-                try:
-                    parsed = json.loads(d)
-                    return parsed.get(key, default)
-                except:
-                    return default
-            return default
+        # details를 한 번만 파싱하여 세션 필드를 컬럼 단위로 일괄 변환
+        decoded = decode_tray_details(completed_trays_df['details'], completed_trays_df['process'])
 
-        def safe_parse_details(details_str):
-            try:
-                if isinstance(details_str, str):
-                    return json.loads(details_str)
-                return details_str if isinstance(details_str, dict) else {}
-            except:
-                return {}
-
-        details_series = completed_trays_df['details'].apply(safe_parse_details)
-
-        # 시작 시간 계산
-        def calculate_start_time(row):
-            details = safe_parse_details(row['details'])
-            start_time_str = safe_get(details, 'start_time')
-            if start_time_str:
-                try:
-                    return pd.to_datetime(start_time_str)
-                except:
-                    pass
-            work_time = float(safe_get(details, 'work_time_sec', safe_get(details, 'work_time', 0)))
-            return row['timestamp'] - pd.Timedelta(seconds=work_time)
-
-        completed_trays_df['start_time_dt'] = completed_trays_df.apply(calculate_start_time, axis=1)
-
-        # 지연시간 계산
-        def calculate_latency(details):
-            start_scan_times = []
-            for event_type in ['MASTER_LABEL_SCANNED', 'MASTER_LABEL_SCANNED_OLD']:
-                scan_time = safe_get(details, f'{event_type.lower()}_time')
-                if scan_time:
-                    try:
-                        start_scan_times.append(pd.to_datetime(scan_time))
-                    except:
-                        pass
-
-            if start_scan_times:
-                first_scan_time = min(start_scan_times)
-                start_time_str = safe_get(details, 'start_time')
-                if start_time_str:
-                    try:
-                        start_time = pd.to_datetime(start_time_str)
-                        return max(0, (start_time - first_scan_time).total_seconds())
-                    except:
-                        pass
-            return 0.0
-
-        completed_trays_df['latency'] = details_series.apply(calculate_latency)
-
-        # PCS 계산
-        def calculate_pcs(row):
-            details = safe_parse_details(row['details'])
-            if row['process'] == '포장실':
-                return 60
-            elif row['process'] == '검사실':
-                return safe_get(details, 'good_count', 0) + safe_get(details, 'defective_count', 0)
-            else:  # 이적실
-                return safe_get(details, 'scan_count', 0)
-
-        pcs_completed_values = completed_trays_df.apply(calculate_pcs, axis=1)
+        # 시작 시간 계산 (start_time이 없으면 완료 시각 - 작업시간)
+        fallback_start = completed_trays_df['timestamp'] - pd.to_timedelta(decoded['work_time_sec'], unit='s')
+        completed_trays_df['start_time_dt'] = decoded['start_time'].fillna(fallback_start)
+
+        # 지연시간 계산 (마스터 라벨 첫 스캔 ~ 작업 시작)
+        first_scan_time = decoded[['master_label_scanned_time', 'master_label_scanned_old_time']].min(axis=1)
+        completed_trays_df['latency'] = (
+            (decoded['start_time'] - first_scan_time).dt.total_seconds().clip(lower=0).fillna(0.0)
+        )
 
         # 세션 DataFrame 생성
         sessions_df = pd.DataFrame({
@@ -298,32 +305,31 @@ class OptimizedDataAnalyzer:
             'end_time_dt': completed_trays_df['timestamp'],
 
             # 신규/변경 필드
-            'shipping_date': details_series.apply(lambda d: safe_get(d, 'OBD', safe_get(d, 'shipping_date', pd.NaT))),
-            'item_code': details_series.apply(lambda d: safe_get(d, 'CLC', safe_get(d, 'item_code', 'N/A'))),
-            'work_order_id': details_series.apply(lambda d: safe_get(d, 'WID', 'N/A')),
-            'phase': details_series.apply(lambda d: safe_get(d, 'PHS', 'N/A')),
-            'supplier_code': details_series.apply(lambda d: safe_get(d, 'SPC', 'N/A')),
-            'product_batch': details_series.apply(lambda d: safe_get(d, 'FPB', 'N/A')),
-            'item_group': details_series.apply(lambda d: safe_get(d, 'IG', 'N/A')),
+            'shipping_date': decoded['shipping_date'],
+            'item_code': decoded['item_code'],
+            'work_order_id': decoded['work_order_id'],
+            'phase': decoded['phase'],
+            'supplier_code': decoded['supplier_code'],
+            'product_batch': decoded['product_batch'],
+            'item_group': decoded['item_group'],
 
             # 기존 필드
             'worker': completed_trays_df['worker'],
             'process': completed_trays_df['process'],
-            'item_name': details_series.apply(lambda d: safe_get(d, 'item_name', '')),
-            'work_time': details_series.apply(lambda d: float(safe_get(d, 'work_time', safe_get(d, 'work_time_sec', 0.0)))),
+            'item_name': decoded['item_name'],
+            'work_time': decoded['work_time'],
             'latency': completed_trays_df['latency'],
-            'idle_time': details_series.apply(lambda d: float(safe_get(d, 'idle_time', safe_get(d, 'total_idle_seconds', 0.0)))),
-            'process_errors': details_series.apply(lambda d: int(safe_get(d, 'process_errors', safe_get(d, 'error_count', 0)))),
-            'had_error': details_series.apply(lambda d: int(safe_get(d, 'had_error', safe_get(d, 'has_error_or_reset', False)))),
-            'is_partial': details_series.apply(lambda d: safe_get(d, 'is_partial', safe_get(d, 'is_partial_submission', False))),
-            'is_restored': details_series.apply(lambda d: safe_get(d, 'is_restored_session', False)),
-            'is_test': details_series.apply(lambda d: safe_get(d, 'is_test', safe_get(d, 'is_test_tray', False))),
-            'pcs_completed': pcs_completed_values,
-            'defective_count': details_series.apply(lambda d: int(safe_get(d, 'defective_count', 0)))
+            'idle_time': decoded['idle_time'],
+            'process_errors': decoded['process_errors'],
+            'had_error': decoded['had_error'],
+            'is_partial': decoded['is_partial'],
+            'is_restored': decoded['is_restored'],
+            'is_test': decoded['is_test'],
+            'pcs_completed': decoded['pcs_completed'],
+            'defective_count': decoded['defective_count']
         })
 
         # 추가 필드 처리
-        sessions_df['shipping_date'] = pd.to_datetime(sessions_df['shipping_date'], errors='coerce')
         sessions_df['item_display'] = sessions_df['item_name'].astype(str) + " (" + sessions_df['item_code'].astype(str) + ")"
 
         return sessions_df
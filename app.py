@@ -14,9 +14,10 @@ from datetime import datetime, timedelta
 import re
 import logging
 from io import BytesIO
+from typing import Optional
 
 from flask import Flask, jsonify, render_template, request, Response
-from flask_socketio import SocketIO
+from flask_socketio import SocketIO, join_room, leave_room, rooms
 import gzip
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
@@ -24,7 +25,11 @@ from watchdog.events import FileSystemEventHandler
 from db_manager import DatabaseManager
 from analyzer_optimized import WorkerPerformance, OptimizedDataAnalyzer
 from config.app_config import config as app_config
-from cache_manager import SessionCache
+from cache_manager import SessionCache, SectionCache
+from log_tail_reader import LogTailReader
+from log_catalog import ARCHIVE_DIR_PATTERN
+from sync_engine import SyncEngine
+from realtime_aggregator import RealtimeAggregator, AGGREGATE_SESSION_COLUMNS, REALTIME_WORK_HOURS
 
 # ============ 로깅 설정 ============
 logging.basicConfig(
@@ -104,6 +109,7 @@ def load_settings():
 
 LOG_FOLDER_PATH = load_settings()
 DB_PATH = '/root/WorkerAnalysisGUI-web/data/worker_analysis.db'
+TAIL_STATE_PATH = '/root/WorkerAnalysisGUI-web/data/tail_offsets.json'
 
 # Flask 및 SocketIO 설정
 app = Flask(__name__)
@@ -114,8 +120,10 @@ setup_security(app)
 
 socketio = SocketIO(app, async_mode='eventlet')
 
-# 세션 캐시 초기화
-session_cache = SessionCache()
+# 세션 캐시 초기화 (메모리 예산 LRU, 새 세션 동기화 시 세대 증가로 무효화)
+session_cache = SessionCache(max_bytes=app_config.performance.SESSION_CACHE_MAX_MB * 1024 * 1024)
+# /api/data 섹션 캐시 (변경된 공정 항목만 무효화)
+section_cache = SectionCache(max_bytes=app_config.performance.SECTION_CACHE_MAX_MB * 1024 * 1024)
 
 # Stock Ledger Blueprint 등록
 from blueprints.stock import stock_bp
@@ -144,9 +152,17 @@ def notify_stock_update(entry_data):
 
 # Database Manager
 db = DatabaseManager(DB_PATH)
+db.refresh_derived_tables()  # 이전 실행에서 남은(또는 최초 생성된) 롤업/세션 바코드 목록 반영
 
 # Data Analyzer
 analyzer = OptimizedDataAnalyzer()
+analyzer.data_manager.file_cache.max_bytes = app_config.performance.FILE_CACHE_MAX_MB * 1024 * 1024
+
+# 로그 파일 카탈로그 (파일 감시 이벤트로 최신 상태 유지)
+log_catalog = analyzer.data_manager.catalog
+
+# 로그 파일 tail 리더 (파일별 오프셋 유지, 새로 추가된 행만 동기화)
+tail_reader = LogTailReader(TAIL_STATE_PATH)
 
 # 설정에서 레이더 메트릭 로드
 RADAR_METRICS_CONFIG = app_config.display.RADAR_METRICS.copy()
@@ -154,44 +170,227 @@ RADAR_METRICS_CONFIG['전체 비교'] = RADAR_METRICS_CONFIG['이적실']
 
 # 설정에서 테스트 작업자 및 수정 매핑 로드
 TEST_WORKERS = app_config.worker.TEST_WORKERS
+VALID_PROCESSES = ['이적실', '검사실', '포장실', '전체 비교']  # 유효한 공정 모드
 WORKER_CORRECTIONS = app_config.worker.WORKER_CORRECTIONS
 
 # 파일 감시 핸들러
 class LogFileHandler(FileSystemEventHandler):
-    def __init__(self, socket_instance):
-        self.socketio = socket_instance
-        self.last_triggered_time = 0
+    def __init__(self, engine: SyncEngine):
+        self.engine = engine
+
+    @staticmethod
+    def _is_event_log(file_path) -> bool:
+        return "작업이벤트로그" in str(os.path.basename(file_path))
+
+    @staticmethod
+    def _is_archive_dir(dir_path) -> bool:
+        """메인 폴더 바로 아래의 날짜별 아카이브 폴더(20YY-*) 여부"""
+        dir_path = os.path.abspath(dir_path)
+        return (os.path.dirname(dir_path) == os.path.abspath(LOG_FOLDER_PATH)
+                and bool(ARCHIVE_DIR_PATTERN.match(os.path.basename(dir_path))))
+
+    @classmethod
+    def _is_watched(cls, file_path) -> bool:
+        """감시 대상 파일 여부 - 메인 폴더와 날짜별 아카이브 폴더의 파일만 (log/ 등 하위 폴더 제외)"""
+        dir_path = os.path.dirname(os.path.abspath(file_path))
+        return dir_path == os.path.abspath(LOG_FOLDER_PATH) or cls._is_archive_dir(dir_path)
+
+    def on_created(self, event):
+        if event.is_directory:
+            # 자정에 새로 생긴 아카이브 폴더를 카탈로그에 등록해 이동해 들어오는 파일을 반영할 수 있게 함
+            if self._is_archive_dir(event.src_path):
+                log_catalog.refresh(LOG_FOLDER_PATH)
+            return
+        if not self._is_watched(event.src_path):
+            return
+        log_catalog.update_file(event.src_path)
+        if self._is_event_log(event.src_path):
+            # 자정 이후 새 날짜 로그 파일: 첫 행부터 바로 동기화
+            # (이동이 삭제+생성으로 나뉘어 온 경우 tail 리더가 같은 이름/inode의 오프셋을 이어받음)
+            self.engine.enqueue(event.src_path, immediate=True)
+
+    def on_deleted(self, event):
+        if not event.is_directory and self._is_watched(event.src_path):
+            log_catalog.remove_file(event.src_path)
+            tail_reader.detach(event.src_path)
+
+    def on_moved(self, event):
+        # 자정 아카이브 이동 등: 원래 경로는 제거하고 새 경로를 카탈로그에 반영
+        if event.is_directory:
+            return
+        src_watched, dest_watched = self._is_watched(event.src_path), self._is_watched(event.dest_path)
+        if src_watched:
+            log_catalog.remove_file(event.src_path)
+        if dest_watched:
+            log_catalog.update_file(event.dest_path)
+        if dest_watched and self._is_event_log(event.dest_path):
+            # 오프셋을 새 경로로 옮겨 이동 직전에 추가된 행만 이어서 동기화
+            tail_reader.rename(event.src_path, event.dest_path)
+            self.engine.enqueue(event.dest_path, immediate=True)
+        elif src_watched:
+            tail_reader.forget(event.src_path)
 
     def on_modified(self, event):
-        if time.time() - self.last_triggered_time < 5: return
-        if not event.is_directory and "작업이벤트로그" in str(os.path.basename(event.src_path)):
-            self.last_triggered_time = time.time()
-            logger.info(f"파일 변경 감지: {event.src_path}. 증분 동기화 트리거...")
-            # 증분 동기화 실행 (백그라운드)
-            threading.Thread(target=run_incremental_sync, daemon=True).start()
-            self.socketio.emit('data_updated', {'message': 'Log file has been modified.'})
+        if event.is_directory or not self._is_watched(event.src_path):
+            return
+        log_catalog.update_file(event.src_path)
+        if self._is_event_log(event.src_path):
+            # 파일별 디바운스 후 새로 추가된 행만 동기화 (계속 수정 중이어도 최대 지연 시간 안에 처리)
+            self.engine.enqueue(event.src_path)
+
+def process_room(process_mode: str) -> str:
+    """공정 모드별 Socket.IO 방 이름"""
+    return f"process:{process_mode}"
+
+def build_realtime_delta(process_mode: str, today: str, changed: list) -> Optional[dict]:
+    """오늘 변경된 세션으로 실시간 현황 델타 구성 (변경된 작업자/품목/시간대의 최신 집계값만 포함)
+
+    클라이언트는 같은 키의 행을 교체하는 방식으로 반영하므로 같은 델타를 여러 번 받아도 결과가 같다.
+    """
+    snapshot = realtime_aggregator.snapshot(process_mode)
+    if not changed or snapshot['display_date'] != today:
+        return None
+    workers = {record['worker'] for record in changed}
+    items = {record['item_display'] for record in changed}
+    hours = {int(record['start_time_dt'][11:13]) for record in changed if record.get('start_time_dt')}
+    hourly = snapshot['hourly_production']
+
+    worker_status = [row for row in snapshot['worker_status'] if row['worker'] in workers]
+    return {
+        'process_mode': process_mode,
+        'date': today,
+        'workers': worker_status,
+        'removed_workers': sorted(workers - {row['worker'] for row in worker_status} - {None}),
+        'items': [row for row in snapshot['item_status'] if row['item_display'] in items],
+        'hourly': {str(hour): hourly['today'][index] for index, hour in enumerate(REALTIME_WORK_HOURS) if hour in hours},
+        'average_hourly': hourly['average'],
+        'monthly_averages': snapshot['monthly_averages'],
+        'sessions': [
+            {'worker': record['worker'], 'item_display': record['item_display'],
+             'pcs_completed': 60 if process_mode == '포장실' else record['pcs_completed'],
+             'start_time_dt': record['start_time_dt']}
+            for record in changed
+        ],
+    }
+
+def push_realtime_deltas(changed_sessions: list):
+    """변경된 오늘 세션을 공정 모드별 방에 실시간 델타로 전송 (전체 비교 방에는 모든 공정의 변경)"""
+    today = datetime.now().date().isoformat()
+    changed_today = [record for record in changed_sessions if record.get('date') == today]
+    if not changed_today:
+        return
+
+    by_process = {}
+    for record in changed_today:
+        by_process.setdefault(record['process'], []).append(record)
+    by_process['전체 비교'] = changed_today
+
+    for process_mode, changed in by_process.items():
+        try:
+            delta = build_realtime_delta(process_mode, today, changed)
+        except Exception as e:
+            logger.warning(f"실시간 델타 계산 실패 ({process_mode}): {e}")
+            continue
+        if delta:
+            socketio.emit('realtime_delta', delta, to=process_room(process_mode))
+
+def on_sync_applied(summary: dict):
+    """동기화 엔진이 새 데이터를 반영한 뒤 호출 - 세션/섹션 캐시 무효화, 실시간 델타 전송 및 변경 알림"""
+    processes = sorted({record['process'] for record in summary['changed_sessions']})
+    if summary['sessions'] or summary['updated']:
+        session_cache.bump_generation()
+        section_cache.invalidate(processes + ['전체 비교'])
+        realtime_aggregator.apply(summary['changed_sessions'])
+        push_realtime_deltas(summary['changed_sessions'])
+    socketio.emit('data_updated', {'message': 'Log file has been modified.', 'processes': processes})
+
+# 증분 동기화 엔진 (상주 작업 스레드, 파일별 오프셋 유지)
+sync_engine = SyncEngine(db, analyzer, tail_reader, log_catalog, LOG_FOLDER_PATH, on_synced=on_sync_applied,
+                         debounce=app_config.performance.SYNC_DEBOUNCE_SECONDS,
+                         max_latency=app_config.performance.SYNC_MAX_LATENCY_SECONDS,
+                         raw_event_hot_months=app_config.performance.RAW_EVENT_HOT_MONTHS)
 
 def run_incremental_sync():
-    """증분 동기화 실행"""
+    """증분 동기화 점검 - 마지막 동기화 이후 수정된 로그 파일을 동기화 엔진 큐에 추가"""
     try:
-        import subprocess
-        result = subprocess.run(
-            ['/root/WorkerAnalysisGUI-web/venv/bin/python', 'migrate_csv_to_db.py', '--incremental'],
-            cwd='/root/WorkerAnalysisGUI-web',
-            capture_output=True,
-            timeout=300
-        )
-        if result.returncode == 0:
-            logger.info("증분 동기화 성공")
-        else:
-            logger.error(f"증분 동기화 실패: {result.stderr.decode()}")
+        queued = sync_engine.enqueue_unsynced()
+        if queued:
+            logger.info(f"증분 동기화 대기열 추가: {queued}개 파일")
     except Exception as e:
         logger.error(f"증분 동기화 오류: {e}")
 
+def get_sessions_cached(start_date: Optional[str] = None, end_date: Optional[str] = None,
+                        process: Optional[str] = None, columns: Optional[list] = None) -> pd.DataFrame:
+    """세션 조회 (현재 데이터 세대의 세션 캐시 우선, 반환값은 호출측이 수정해도 되는 복사본)"""
+    cache_key = session_cache.generate_cache_key(process or '전체', start_date, end_date, [])
+    if columns:
+        cache_key += '_cols=' + ','.join(columns)
+    cached = session_cache.get_sessions(cache_key)
+    if cached is not None:
+        return cached
+
+    sessions_df = db.get_sessions(start_date=start_date, end_date=end_date, process=process, columns=columns)
+    session_cache.set_sessions(cache_key, sessions_df)
+    return sessions_df
+
+def load_rollups(start_date: Optional[str], end_date: Optional[str], process_mode: str, hourly: bool = False,
+                 exclude_test_workers: bool = False, normalize_workers: bool = False,
+                 drop_empty_records: bool = False) -> pd.DataFrame:
+    """일별(hourly=True면 시간대별) 롤업 조회 후 API 공통 규칙 적용
+    (포장실 60 PCS 추정/빈 레코드 제외, 테스트 작업자 제외, 작업자명 정규화)"""
+    read = db.get_hourly_rollups if hourly else db.get_daily_rollups
+    rollups = read(start_date=start_date, end_date=end_date, process=process_mode)
+    if rollups.empty:
+        return rollups
+
+    if process_mode == '포장실':
+        if drop_empty_records:
+            rollups = rollups[rollups['empty_record'] == 0]
+        rollups = rollups.assign(pcs_sum=rollups['session_count'] * 60)
+
+    if exclude_test_workers:
+        test_workers = app_config.worker.TEST_WORKERS.copy()
+        if process_mode != '포장실':
+            test_workers.append('1.0.5')
+        rollups = rollups[~rollups['worker'].isin(test_workers)]
+
+    if normalize_workers:
+        rollups = rollups.assign(worker=rollups['worker'].map(normalize_worker_name))
+    return rollups
+
+def merge_rollups(rollups: pd.DataFrame, by) -> pd.DataFrame:
+    """롤업 부분 집계를 by 기준으로 병합 (합계는 더하고 평균/표준편차는 개수/합/제곱합으로 계산)
+
+    작업자 기준 병합 시 작업자가 없는 행은 세션 groupby와 동일하게 제외된다.
+    """
+    sums = rollups.groupby(by).agg({
+        'session_count': 'sum', 'pcs_sum': 'sum', 'no_error_sessions': 'sum',
+        'work_time_count': 'sum', 'work_time_sum': 'sum', 'work_time_sumsq': 'sum',
+        'latency_count': 'sum', 'latency_sum': 'sum',
+        'fpy_count': 'sum', 'fpy_sum': 'sum',
+    })
+
+    n = sums['work_time_count'].where(sums['work_time_count'] > 0)
+    variance = (sums['work_time_sumsq'] - sums['work_time_sum'] ** 2 / n) / (n - 1)
+
+    merged = pd.DataFrame({
+        'session_count': sums['session_count'],
+        'pcs_completed': sums['pcs_sum'],
+        'no_error_sessions': sums['no_error_sessions'],
+        'work_time': sums['work_time_sum'] / n,
+        'work_time_std': np.sqrt(variance.clip(lower=0)).where(n > 1),
+        'latency': sums['latency_sum'] / sums['latency_count'].where(sums['latency_count'] > 0),
+        'first_pass_yield': sums['fpy_sum'] / sums['fpy_count'].where(sums['fpy_count'] > 0),
+    }, index=sums.index)
+    return merged.reset_index()
+
 def start_file_monitor():
-    event_handler = LogFileHandler(socketio)
+    event_handler = LogFileHandler(sync_engine)
+    log_catalog.refresh(LOG_FOLDER_PATH)
     observer = Observer()
-    observer.schedule(event_handler, LOG_FOLDER_PATH, recursive=False)
+    # 자정 아카이브 이동(메인 → 20YY-* 폴더)이 on_moved로 짝지어 오도록 하위 폴더까지 한 번에 감시
+    # (폴더별로 따로 감시하면 이동이 삭제+생성으로 나뉨). 대상 외 폴더 이벤트는 핸들러에서 거름
+    observer.schedule(event_handler, LOG_FOLDER_PATH, recursive=True)
     observer.start()
     logger.info(f"'{LOG_FOLDER_PATH}' 폴더에 대한 파일 감시를 시작합니다.")
     try:
@@ -291,6 +490,10 @@ def health_check():
         cursor.fetchone()
         conn.close()
         health_status["components"]["database"] = "healthy"
+        # 날짜 범위 raw_events 조회의 인덱스 사용 여부 (전체 스캔이면 degraded)
+        if not db.check_raw_events_index_usage():
+            health_status["status"] = "degraded"
+            health_status["components"]["database"] = "healthy (raw_events date range query not using index)"
     except Exception as e:
         health_status["status"] = "degraded"
         health_status["components"]["database"] = f"unhealthy: {str(e)}"
@@ -310,10 +513,384 @@ def health_check():
         health_status["status"] = "degraded"
         health_status["components"]["log_folder"] = "unhealthy: folder not found"
 
+    # 증분 동기화 큐 상태
+    queue_status = sync_engine.queue_status()
+    health_status["components"]["sync_queue"] = (
+        f"healthy ({queue_status['depth']} pending, oldest {queue_status['oldest_wait_sec']}s)"
+    )
+
     status_code = 200 if health_status["status"] == "healthy" else 503
     return jsonify(health_status), status_code
 
 
+# /api/data 응답 섹션 (요청 sections로 필요한 것만 조회, 생략 시 전체) - 섹션별로 계산/캐시된다
+ANALYSIS_SECTIONS = ('summary', 'sessions', 'history', 'comparison', 'hr')
+
+def parse_analysis_sections(value) -> Optional[list]:
+    """요청의 sections 값(목록 또는 쉼표 구분 문자열) 해석 - 알 수 없는 섹션이 있으면 None"""
+    if not value:
+        return list(ANALYSIS_SECTIONS)
+    names = value.split(',') if isinstance(value, str) else value
+    sections = []
+    for name in names:
+        name = str(name).strip()
+        if name not in ANALYSIS_SECTIONS:
+            return None
+        if name not in sections:
+            sections.append(name)
+    return sections
+
+def analysis_section_key(section: str, process_mode: str, start_date: Optional[str], end_date: Optional[str],
+                         selected_workers: Optional[list]) -> tuple:
+    """섹션 캐시 키 - 섹션이 실제로 의존하는 조건만 포함 (HR은 기간 무관, 30일 요약은 오늘 날짜 의존)"""
+    if section == 'hr':
+        return (process_mode, section)
+    if section == 'comparison':
+        return (process_mode, section, start_date, end_date)
+    if section == 'history':
+        return (process_mode, section, start_date, end_date, datetime.now().strftime('%Y-%m-%d'))
+    return (process_mode, section, start_date, end_date, tuple(sorted(selected_workers or [])))
+
+def get_analysis_extended_start(start_date: Optional[str]) -> Optional[str]:
+    """30일 평균 계산을 위한 확장된 시작 날짜 (선택 시작일 60일 전)"""
+    if not start_date:
+        return None
+    try:
+        selected_start = datetime.strptime(start_date, '%Y-%m-%d')
+        extended_start = (selected_start - timedelta(days=60)).strftime('%Y-%m-%d')
+        logger.debug(f"[API] 30일 평균용 확장 시작 날짜: {extended_start}")
+        return extended_start
+    except:
+        return None
+
+def load_analysis_frames(process_mode: str, start_date: str, end_date: str, selected_workers: Optional[list]):
+    """분석용 세션 로드 및 공통 규칙 적용 - (확장 기간 전체 세션, 선택 기간/작업자 세션, 작업자 목록) 반환
+    (세션이 없으면 빈 DataFrame과 빈 작업자 목록)"""
+    # 데이터베이스에서 세션 조회
+    full_df = get_sessions_cached(start_date=get_analysis_extended_start(start_date), end_date=end_date, process=process_mode)
+    logger.info(f"[API] DB에서 {len(full_df)}개 세션 로드 완료")
+
+    # 포장실 데이터: 트레이 단위로 PCS 추정 (1 트레이 = 60 PCS)
+    if process_mode == '포장실' and not full_df.empty:
+        # 빈 레코드 제외 (작업시간=0, 품목=N/A인 무효 데이터)
+        before_filter = len(full_df)
+        full_df = full_df[~((full_df['work_time'] == 0) & (full_df['item_code'] == 'N/A'))].copy()
+        if before_filter != len(full_df):
+            logger.debug(f"[API] 포장실 빈 레코드 제외: {before_filter}개 → {len(full_df)}개")
+
+        original_total = full_df['pcs_completed'].sum()
+        full_df['pcs_completed'] = 60  # 각 트레이당 60 PCS 추정
+        estimated_total = full_df['pcs_completed'].sum()
+        logger.debug(f"[API] 포장실 PCS 추정 적용: {int(original_total):,} → {int(estimated_total):,} PCS")
+
+    # 테스트 데이터 제외 (설정에서 로드, 포장실의 1.0.5는 실제 작업자이므로 제외하지 않음)
+    test_workers = app_config.worker.TEST_WORKERS.copy()
+    if process_mode != '포장실':
+        test_workers.append('1.0.5')  # 포장실 외에서는 1.0.5 제외
+    full_df = full_df[~full_df['worker'].isin(test_workers)].copy()
+    logger.debug(f"[API] 테스트 작업자 제외 후: {len(full_df)}개 세션")
+
+    # 작업자명 정규화 (특수문자 제거 및 오타 수정)
+    if not full_df.empty and 'worker' in full_df.columns:
+        original_workers = full_df['worker'].nunique()
+        full_df['worker'] = full_df['worker'].apply(normalize_worker_name)
+        normalized_workers = full_df['worker'].nunique()
+        if original_workers != normalized_workers:
+            logger.debug(f"[API] 작업자명 정규화: {original_workers}명 → {normalized_workers}명")
+
+    if full_df.empty:
+        logger.info("[API] 데이터 없음")
+        return full_df, full_df, []
+
+    # 작업자 필터링
+    all_workers = sorted(full_df['worker'].unique().tolist())
+    selected_workers = selected_workers or all_workers
+
+    # 필터링
+    filtered_df = full_df[
+        (full_df['date'] >= pd.to_datetime(start_date)) &
+        (full_df['date'] <= pd.to_datetime(end_date)) &
+        (full_df['worker'].isin(selected_workers))
+    ].copy()
+
+    logger.debug(f"[API] 필터링 완료: {len(filtered_df)}개 세션")
+
+    # 분석 전 누락된 컬럼 추가
+    if 'idle_time' not in filtered_df.columns:
+        filtered_df['idle_time'] = 0.0
+    if 'defective_count' not in filtered_df.columns:
+        filtered_df['defective_count'] = 0
+    if 'idle_time' not in full_df.columns:
+        full_df['idle_time'] = 0.0
+    if 'defective_count' not in full_df.columns:
+        full_df['defective_count'] = 0
+
+    return full_df, filtered_df, all_workers
+
+def build_summary_section(process_mode: str, full_df: pd.DataFrame, filtered_df: pd.DataFrame, all_workers: list) -> dict:
+    """summary 섹션 - KPI, 작업자별 성과, 정규화 점수, 작업자 목록, 데이터 날짜 범위"""
+    if full_df.empty:
+        return {'kpis': {}, 'worker_data': [], 'normalized_performance': [],
+                'workers': [], 'date_range': {'min': None, 'max': None}}
+
+    # 분석
+    radar_metrics = RADAR_METRICS_CONFIG.get(process_mode, RADAR_METRICS_CONFIG['이적실'])
+    worker_data, kpis, _, normalized_df = analyzer.analyze_dataframe(filtered_df, radar_metrics, full_df)
+
+    # 생산량 0인 작업자 제외
+    active_worker_data = {k: v for k, v in worker_data.items() if v.total_pcs_completed > 0}
+    worker_data = active_worker_data
+
+    # normalized_df에서도 생산량 0인 작업자 제외
+    if normalized_df is not None and not normalized_df.empty:
+        active_workers = list(active_worker_data.keys())
+        normalized_df = normalized_df[normalized_df['worker'].isin(active_workers)]
+        logger.debug(f"[API] normalized_df 필터링 완료: {len(normalized_df)}명")
+
+    # JSON 직렬화
+    worker_data_json = [perf.__dict__ for perf in worker_data.values()]
+    for item in worker_data_json:
+        for key, value in item.items():
+            if isinstance(value, (datetime, pd.Timestamp)):
+                item[key] = value.isoformat()
+            elif isinstance(value, (np.integer, np.int32, np.int64)):
+                item[key] = int(value)
+            elif isinstance(value, (np.floating, np.float32, np.float64)):
+                item[key] = None if (np.isinf(value) or np.isnan(value)) else float(value)
+            elif isinstance(value, float):
+                # Python float도 Infinity 체크
+                item[key] = None if (value == float('inf') or value == float('-inf') or value != value) else value
+
+    valid_dates = full_df['date'].dropna()
+    date_range = {
+        'min': valid_dates.min().strftime('%Y-%m-%d') if not valid_dates.empty else None,
+        'max': valid_dates.max().strftime('%Y-%m-%d') if not valid_dates.empty else None
+    }
+
+    # normalized_df JSON 변환
+    normalized_df_json = []
+    if normalized_df is not None and not normalized_df.empty:
+        normalized_df_json = json.loads(normalized_df.replace([np.inf, -np.inf], None).to_json(orient='records', date_format='iso'))
+
+    return {
+        'kpis': convert_to_json_serializable(kpis),
+        'worker_data': convert_to_json_serializable(worker_data_json),
+        'normalized_performance': convert_to_json_serializable(normalized_df_json),
+        'workers': all_workers,
+        'date_range': date_range,
+    }
+
+def build_sessions_section(full_df: pd.DataFrame, filtered_df: pd.DataFrame, all_workers: list) -> dict:
+    """sessions 섹션 - 선택 기간/작업자의 세션 행"""
+    if full_df.empty:
+        return {'filtered_sessions_data': [], 'filtered_raw_events': []}
+    safe_sessions_data = json.loads(filtered_df.replace([np.inf, -np.inf], np.nan).fillna('').to_json(orient='records', date_format='iso'))
+    return {'filtered_sessions_data': safe_sessions_data, 'filtered_raw_events': []}
+
+def build_history_section(process_mode: str, extended_start: Optional[str], end_date: str) -> dict:
+    """history 섹션 - 최근 30일 일별/시간대별 요약과 작업자별 KPI 범위 (롤업 기반)"""
+    # 30일 평균 요약
+    safe_historical_summary = {'daily_stats': [], 'total_sessions': 0, 'num_days': 0,
+                               'averages': {'daily_pcs': 0, 'hourly_pcs': [0] * 16},
+                               'date_range': {'start': None, 'end': None}}
+
+    # 최근 30일 일별/시간대별/작업자별 통계는 롤업에서 병합 (full_df와 같은 기간/작업자 규칙)
+    thirty_days_ago = datetime.now() - timedelta(days=30)
+    recent_start = pd.Timestamp(thirty_days_ago).ceil('D')
+    if extended_start:
+        recent_start = max(recent_start, pd.Timestamp(extended_start))
+    rollup_filters = dict(exclude_test_workers=True, normalize_workers=True, drop_empty_records=True)
+    recent_rollups = load_rollups(recent_start.strftime('%Y-%m-%d'), end_date, process_mode, **rollup_filters)
+
+    if not recent_rollups.empty:
+        try:
+            daily_summary = merge_rollups(recent_rollups, 'date')
+            daily_summary['worker'] = daily_summary['date'].map(
+                recent_rollups.groupby('date')['worker'].nunique()).fillna(0).astype(int)
+            daily_summary = daily_summary[['date', 'pcs_completed', 'work_time', 'latency', 'first_pass_yield', 'worker']]
+
+            if not daily_summary.empty:
+                num_days = len(daily_summary)
+                daily_pcs = daily_summary.set_index('date')['pcs_completed']
+                daily_dates = daily_pcs.index
+
+                # 시간대별 평균 계산 (0-23시 전체)
+                hourly_rollups = load_rollups(recent_start.strftime('%Y-%m-%d'), end_date, process_mode,
+                                              hourly=True, **rollup_filters)
+                hourly_sum = hourly_rollups.groupby('hour')['pcs_sum'].sum() if not hourly_rollups.empty else pd.Series(dtype=float)
+                hourly_avg = (hourly_sum / num_days).reindex(range(0, 24), fill_value=0)
+
+                # 요일별 평균 계산 (월-일: 0-6)
+                weekday_avg = daily_pcs.groupby(daily_dates.dayofweek).mean().reindex(range(0, 7), fill_value=0)
+
+                # 월 내 주차별 평균 계산 (1-5주차)
+                week_avg = daily_pcs.groupby((daily_dates.day - 1) // 7 + 1).mean().reindex(range(1, 6), fill_value=0)
+
+                # 월별 평균 계산 (1-12월)
+                month_avg = daily_pcs.groupby(daily_dates.month).mean().reindex(range(1, 13), fill_value=0)
+
+                daily_summary = daily_summary.assign(date=daily_summary['date'].dt.date)
+                safe_historical_summary = {
+                    'daily_stats': json.loads(daily_summary.to_json(orient='records', date_format='iso')),
+                    'total_sessions': int(recent_rollups['session_count'].sum()),
+                    'num_days': num_days,
+                    'averages': {
+                        'daily_pcs': round(daily_summary['pcs_completed'].mean(), 1),
+                        'hourly_pcs': hourly_avg.round(1).to_dict(),  # 시간대별 평균 (0-23시)
+                        'weekday_pcs': weekday_avg.round(1).to_dict(),  # 요일별 평균 (0-6: 월-일)
+                        'week_of_month_pcs': week_avg.round(1).to_dict(),  # 월 내 주차별 평균 (1-5주차)
+                        'monthly_pcs': month_avg.round(1).to_dict()  # 월별 평균 (1-12월)
+                    },
+                    'date_range': {
+                        'start': daily_dates.min().isoformat(),
+                        'end': daily_dates.max().isoformat()
+                    }
+                }
+                logger.debug(f"[API] 30일 평균 요약 생성: {len(daily_summary)}일치")
+        except Exception as e:
+            logger.warning(f"[API] 30일 요약 오류: {e}")
+
+    # 최근 30일 기준 KPI 범위 계산 (작업자가 적을 때 왜곡 방지)
+    baseline_stats = {
+        'daily_prod': {'min': 0, 'max': 100},
+        'hourly_eff': {'min': 0, 'max': 100},
+        'fpy': {'min': 0, 'max': 100},
+        'consistency': {'min': 0, 'max': 100},
+        'intensity': {'min': 0, 'max': 10}
+    }
+
+    if not recent_rollups.empty:
+        try:
+            # 작업자별 KPI 계산 (총생산량, 평균 시간/표준편차, FPY, 세션 수)
+            worker_stats = merge_rollups(recent_rollups, 'worker')
+
+            if not worker_stats.empty:
+                worker_stats = worker_stats.rename(columns={
+                    'pcs_completed': 'total_pcs', 'work_time': 'avg_work_time', 'first_pass_yield': 'avg_fpy'
+                })[['worker', 'total_pcs', 'avg_work_time', 'work_time_std', 'avg_fpy', 'session_count']]
+
+                # 각 KPI 계산
+                worker_stats['hourly_eff'] = worker_stats.apply(
+                    lambda x: (x['total_pcs'] / x['session_count'] / x['avg_work_time'] * 3600) if x['avg_work_time'] > 0 else 0,
+                    axis=1
+                )
+                worker_stats['consistency'] = worker_stats.apply(
+                    lambda x: 100 - min((x['work_time_std'] / x['avg_work_time'] * 100) if x['avg_work_time'] > 0 else 0, 100),
+                    axis=1
+                )
+                worker_stats['fpy_pct'] = worker_stats['avg_fpy'] * 100
+
+                # Min/Max 계산
+                baseline_stats = {
+                    'daily_prod': {
+                        'min': float(worker_stats['total_pcs'].min()),
+                        'max': float(worker_stats['total_pcs'].max())
+                    },
+                    'hourly_eff': {
+                        'min': float(worker_stats['hourly_eff'].min()),
+                        'max': float(worker_stats['hourly_eff'].max())
+                    },
+                    'fpy': {
+                        'min': float(worker_stats['fpy_pct'].min()),
+                        'max': float(worker_stats['fpy_pct'].max())
+                    },
+                    'consistency': {
+                        'min': float(worker_stats['consistency'].min()),
+                        'max': float(worker_stats['consistency'].max())
+                    },
+                    'intensity': {
+                        'min': float(worker_stats['session_count'].min()),
+                        'max': float(worker_stats['session_count'].max())
+                    }
+                }
+                logger.debug(f"[API] 30일 기준 KPI 범위 계산 완료: {len(worker_stats)}명")
+        except Exception as e:
+            logger.warning(f"[API] 30일 기준 KPI 계산 오류: {e}")
+
+    return {'historical_summary': safe_historical_summary, 'baseline_stats': baseline_stats}
+
+def build_comparison_section(process_mode: str, start_date: str, end_date: str) -> dict:
+    """comparison 섹션 - 전체 비교 모드의 공정별 KPI/대기량과 추세 데이터 (그 외 모드는 None)"""
+    # 전체 비교 모드용 comparison_data 생성
+    comparison_data = None
+    if process_mode == '전체 비교':
+        logger.info("[API] 전체 비교 데이터 생성 중...")
+        try:
+            def calculate_process_kpis(df):
+                """공정별 KPI 계산"""
+                if df.empty:
+                    return {
+                        'total_trays': 0, 'total_pcs_completed': 0,
+                        'avg_tray_time': 0, 'avg_fpy': 0
+                    }
+                return {
+                    'total_trays': int(len(df)),
+                    'total_pcs_completed': int(df['pcs_completed'].sum()),
+                    'avg_tray_time': float(df['work_time'].mean()),
+                    'avg_fpy': float(df['first_pass_yield'].mean())
+                }
+
+            # 선택 기간 기준 데이터 (사용자가 선택한 날짜 범위)
+            period_inspection = get_sessions_cached(start_date=start_date, end_date=end_date, process='검사실')
+            period_transfer = get_sessions_cached(start_date=start_date, end_date=end_date, process='이적실')
+            period_packaging = get_sessions_cached(start_date=start_date, end_date=end_date, process='포장실')
+
+            # 포장실 데이터: 트레이 단위로 PCS 추정 (1 트레이 = 60 PCS)
+            if not period_packaging.empty:
+                period_packaging['pcs_completed'] = 60
+
+            period_inspection_kpis = calculate_process_kpis(period_inspection)
+            period_transfer_kpis = calculate_process_kpis(period_transfer)
+            period_packaging_kpis = calculate_process_kpis(period_packaging)
+
+            # 선택 기간 데이터로 통합 (날짜 필터 반영)
+            summary_period = {
+                'inspection': period_inspection_kpis,
+                'transfer': period_transfer_kpis,
+                'packaging': period_packaging_kpis,
+                'transfer_standby_trays': period_inspection_kpis['total_trays'] - period_transfer_kpis['total_trays'],
+                'packaging_standby_trays': period_transfer_kpis['total_trays'] - period_packaging_kpis['total_trays'],
+                'transfer_standby_pcs': period_inspection_kpis['total_pcs_completed'] - period_transfer_kpis['total_pcs_completed'],
+                'packaging_standby_pcs': period_transfer_kpis['total_pcs_completed'] - period_packaging_kpis['total_pcs_completed'],
+            }
+
+            # 추세 그래프용 데이터 (선택 기간)
+            trends_data = {
+                'inspection': json.loads(period_inspection.replace([np.inf, -np.inf], np.nan).fillna('').to_json(orient='records', date_format='iso')),
+                'transfer': json.loads(period_transfer.replace([np.inf, -np.inf], np.nan).fillna('').to_json(orient='records', date_format='iso')),
+                'packaging': json.loads(period_packaging.replace([np.inf, -np.inf], np.nan).fillna('').to_json(orient='records', date_format='iso')),
+            }
+
+            comparison_data = {
+                'summary_period': summary_period,  # summary_today 제거 - 모든 데이터가 선택한 날짜 범위 사용
+                'trends': trends_data
+            }
+
+            logger.info(f"[API] 전체 비교 데이터 생성 완료: 검사실:{period_inspection_kpis['total_trays']}, 이적실:{period_transfer_kpis['total_trays']}, 포장실:{period_packaging_kpis['total_trays']}")
+
+        except Exception as e:
+            logger.error(f"[API] 전체 비교 데이터 생성 오류: {e}")
+            import traceback
+            traceback.print_exc()
+
+    return {'comparison_data': convert_to_json_serializable(comparison_data)}
+
+def build_hr_section(process_mode: str) -> dict:
+    """hr 섹션 - HR 분석용 전체 기간 세션 (날짜 필터 없이 모든 기록)"""
+    hr_sessions_data = []
+    try:
+        hr_df = get_sessions_cached(process=process_mode)  # 날짜 필터 없이 전체 조회
+        if not hr_df.empty:
+            # 테스트 작업자 제외
+            hr_df = hr_df[~hr_df['worker'].isin(TEST_WORKERS)].copy()
+            # 작업자명 정규화
+            hr_df['worker'] = hr_df['worker'].apply(normalize_worker_name)
+            hr_sessions_data = json.loads(hr_df.replace([np.inf, -np.inf], np.nan).fillna('').to_json(orient='records', date_format='iso'))
+            logger.debug(f"[API] HR용 전체 데이터: {len(hr_sessions_data)}개 세션")
+    except Exception as e:
+        logger.warning(f"[API] HR 데이터 로드 오류: {e}")
+    return {'hr_sessions_data': hr_sessions_data}
+
 @app.route('/')
 def index():
     cache_buster = str(int(time.time()))
@@ -322,19 +899,24 @@ def index():
 @app.route('/api/data', methods=['POST'])
 @validate_date_params('start_date', 'end_date')
 def get_analysis_data():
+    """분석 데이터 API - sections로 필요한 섹션만 요청 가능 (생략 시 전체), 섹션별 캐시 사용"""
     logger.info("[API] /api/data 요청 시작 (DB 기반)")
     try:
         filters = request.json or {}
         process_mode = filters.get('process_mode', '이적실')
         start_date = filters.get('start_date')
         end_date = filters.get('end_date')
+        selected_workers = filters.get('selected_workers')
 
         # 유효한 공정 모드 확인
-        VALID_PROCESSES = ['이적실', '검사실', '포장실', '전체 비교']
         if process_mode not in VALID_PROCESSES:
             return jsonify({"error": f"Invalid process_mode. Must be one of: {VALID_PROCESSES}"}), 400
 
-        logger.info(f"[API] 공정={process_mode}, 기간={start_date}~{end_date}")
+        sections = parse_analysis_sections(filters.get('sections'))
+        if sections is None:
+            return jsonify({"error": f"Invalid sections. Must be any of: {list(ANALYSIS_SECTIONS)}"}), 400
+
+        logger.info(f"[API] 공정={process_mode}, 기간={start_date}~{end_date}, 섹션={','.join(sections)}")
 
         # 데이터베이스에서 날짜 범위 가져오기
         if not start_date or not end_date:
@@ -342,340 +924,37 @@ def get_analysis_data():
             start_date = start_date or min_date
             end_date = end_date or max_date
 
-        # 30일 평균 계산을 위한 확장된 기간
-        extended_start = None
-        if start_date:
-            try:
-                selected_start = datetime.strptime(start_date, '%Y-%m-%d')
-                extended_start = (selected_start - timedelta(days=60)).strftime('%Y-%m-%d')
-                logger.debug(f"[API] 30일 평균용 확장 시작 날짜: {extended_start}")
-            except:
-                extended_start = None
-
-        # 데이터베이스에서 세션 조회
-        full_df = db.get_sessions(start_date=extended_start, end_date=end_date, process=process_mode)
-        logger.info(f"[API] DB에서 {len(full_df)}개 세션 로드 완료")
-
-        # 포장실 데이터: 트레이 단위로 PCS 추정 (1 트레이 = 60 PCS)
-        if process_mode == '포장실' and not full_df.empty:
-            # 빈 레코드 제외 (작업시간=0, 품목=N/A인 무효 데이터)
-            before_filter = len(full_df)
-            full_df = full_df[~((full_df['work_time'] == 0) & (full_df['item_code'] == 'N/A'))].copy()
-            if before_filter != len(full_df):
-                logger.debug(f"[API] 포장실 빈 레코드 제외: {before_filter}개 → {len(full_df)}개")
-
-            original_total = full_df['pcs_completed'].sum()
-            full_df['pcs_completed'] = 60  # 각 트레이당 60 PCS 추정
-            estimated_total = full_df['pcs_completed'].sum()
-            logger.debug(f"[API] 포장실 PCS 추정 적용: {int(original_total):,} → {int(estimated_total):,} PCS")
-
-        # 테스트 데이터 제외 (설정에서 로드, 포장실의 1.0.5는 실제 작업자이므로 제외하지 않음)
-        test_workers = app_config.worker.TEST_WORKERS.copy()
-        if process_mode != '포장실':
-            test_workers.append('1.0.5')  # 포장실 외에서는 1.0.5 제외
-        full_df = full_df[~full_df['worker'].isin(test_workers)].copy()
-        logger.debug(f"[API] 테스트 작업자 제외 후: {len(full_df)}개 세션")
-
-        # 작업자명 정규화 (특수문자 제거 및 오타 수정)
-        if not full_df.empty and 'worker' in full_df.columns:
-            original_workers = full_df['worker'].nunique()
-            full_df['worker'] = full_df['worker'].apply(normalize_worker_name)
-            normalized_workers = full_df['worker'].nunique()
-            if original_workers != normalized_workers:
-                logger.debug(f"[API] 작업자명 정규화: {original_workers}명 → {normalized_workers}명")
-
-        if full_df.empty:
-            logger.info("[API] 데이터 없음")
-            return jsonify({
-                'kpis': {}, 'worker_data': [], 'normalized_performance': [],
-                'workers': [], 'date_range': {'min': None, 'max': None},
-                'filtered_sessions_data': [], 'filtered_raw_events': []
-            })
-
-        # 작업자 필터링
-        all_workers = sorted(full_df['worker'].unique().tolist())
-        selected_workers = filters.get('selected_workers') or all_workers
-
-        # 필터링
-        filtered_df = full_df[
-            (full_df['date'] >= pd.to_datetime(start_date)) &
-            (full_df['date'] <= pd.to_datetime(end_date)) &
-            (full_df['worker'].isin(selected_workers))
-        ].copy()
-
-        logger.debug(f"[API] 필터링 완료: {len(filtered_df)}개 세션")
-
-        # 분석 전 누락된 컬럼 추가
-        if 'idle_time' not in filtered_df.columns:
-            filtered_df['idle_time'] = 0.0
-        if 'defective_count' not in filtered_df.columns:
-            filtered_df['defective_count'] = 0
-        if 'idle_time' not in full_df.columns:
-            full_df['idle_time'] = 0.0
-        if 'defective_count' not in full_df.columns:
-            full_df['defective_count'] = 0
-
-        # 분석
-        radar_metrics = RADAR_METRICS_CONFIG.get(process_mode, RADAR_METRICS_CONFIG['이적실'])
-        worker_data, kpis, _, normalized_df = analyzer.analyze_dataframe(filtered_df, radar_metrics, full_df)
-
-        # 생산량 0인 작업자 제외
-        active_worker_data = {k: v for k, v in worker_data.items() if v.total_pcs_completed > 0}
-        worker_data = active_worker_data
-
-        # normalized_df에서도 생산량 0인 작업자 제외
-        if normalized_df is not None and not normalized_df.empty:
-            active_workers = list(active_worker_data.keys())
-            normalized_df = normalized_df[normalized_df['worker'].isin(active_workers)]
-            logger.debug(f"[API] normalized_df 필터링 완료: {len(normalized_df)}명")
-
-        # JSON 직렬화
-        worker_data_json = [perf.__dict__ for perf in worker_data.values()]
-        for item in worker_data_json:
-            for key, value in item.items():
-                if isinstance(value, (datetime, pd.Timestamp)):
-                    item[key] = value.isoformat()
-                elif isinstance(value, (np.integer, np.int32, np.int64)):
-                    item[key] = int(value)
-                elif isinstance(value, (np.floating, np.float32, np.float64)):
-                    item[key] = None if (np.isinf(value) or np.isnan(value)) else float(value)
-                elif isinstance(value, float):
-                    # Python float도 Infinity 체크
-                    item[key] = None if (value == float('inf') or value == float('-inf') or value != value) else value
-
-        # 30일 평균 요약
-        safe_historical_summary = {'daily_stats': [], 'total_sessions': 0, 'num_days': 0,
-                                   'averages': {'daily_pcs': 0, 'hourly_pcs': [0] * 16},
-                                   'date_range': {'start': None, 'end': None}}
-
-        if not full_df.empty:
-            try:
-                thirty_days_ago = datetime.now() - timedelta(days=30)
-                recent_df = full_df[full_df['date'] >= pd.Timestamp(thirty_days_ago)].copy()
-
-                if not recent_df.empty:
-                    daily_summary = recent_df.groupby(recent_df['date'].dt.date).agg({
-                        'pcs_completed': 'sum',
-                        'work_time': 'mean',
-                        'latency': 'mean',
-                        'first_pass_yield': 'mean',
-                        'worker': 'nunique'
-                    }).reset_index()
-
-                    # 시간대별 평균 계산 (0-23시 전체)
-                    recent_df['hour'] = pd.to_datetime(recent_df['start_time_dt']).dt.hour
-                    hourly_sum = recent_df.groupby('hour')['pcs_completed'].sum()
-                    num_days = recent_df['date'].nunique()
-                    hourly_avg = (hourly_sum / num_days).reindex(range(0, 24), fill_value=0)
-
-                    # 요일별 평균 계산 (월-일: 0-6)
-                    recent_df['weekday'] = pd.to_datetime(recent_df['date']).dt.dayofweek
-                    weekday_sum = recent_df.groupby('weekday')['pcs_completed'].sum()
-                    weekday_counts = recent_df.groupby('weekday')['date'].nunique()
-                    weekday_avg = (weekday_sum / weekday_counts).reindex(range(0, 7), fill_value=0)
-
-                    # 월 내 주차별 평균 계산 (1-5주차)
-                    recent_df['week_of_month'] = (pd.to_datetime(recent_df['date']).dt.day - 1) // 7 + 1
-                    week_sum = recent_df.groupby('week_of_month')['pcs_completed'].sum()
-                    week_counts = recent_df.groupby('week_of_month')['date'].nunique()
-                    week_avg = (week_sum / week_counts).reindex(range(1, 6), fill_value=0)
-
-                    # 월별 평균 계산 (1-12월)
-                    recent_df['month_num'] = pd.to_datetime(recent_df['date']).dt.month
-                    month_sum = recent_df.groupby('month_num')['pcs_completed'].sum()
-                    month_counts = recent_df.groupby('month_num')['date'].nunique()
-                    month_avg = (month_sum / month_counts).reindex(range(1, 13), fill_value=0)
-
-                    safe_historical_summary = {
-                        'daily_stats': json.loads(daily_summary.to_json(orient='records', date_format='iso')),
-                        'total_sessions': len(recent_df),
-                        'num_days': num_days,
-                        'averages': {
-                            'daily_pcs': round(daily_summary['pcs_completed'].mean(), 1),
-                            'hourly_pcs': hourly_avg.round(1).to_dict(),  # 시간대별 평균 (0-23시)
-                            'weekday_pcs': weekday_avg.round(1).to_dict(),  # 요일별 평균 (0-6: 월-일)
-                            'week_of_month_pcs': week_avg.round(1).to_dict(),  # 월 내 주차별 평균 (1-5주차)
-                            'monthly_pcs': month_avg.round(1).to_dict()  # 월별 평균 (1-12월)
-                        },
-                        'date_range': {
-                            'start': recent_df['date'].min().isoformat(),
-                            'end': recent_df['date'].max().isoformat()
-                        }
-                    }
-                    logger.debug(f"[API] 30일 평균 요약 생성: {len(daily_summary)}일치")
-            except Exception as e:
-                logger.warning(f"[API] 30일 요약 오류: {e}")
-
-        # 최근 30일 기준 KPI 범위 계산 (작업자가 적을 때 왜곡 방지)
-        baseline_stats = {
-            'daily_prod': {'min': 0, 'max': 100},
-            'hourly_eff': {'min': 0, 'max': 100},
-            'fpy': {'min': 0, 'max': 100},
-            'consistency': {'min': 0, 'max': 100},
-            'intensity': {'min': 0, 'max': 10}
-        }
-
-        if not full_df.empty:
-            try:
-                thirty_days_ago = datetime.now() - timedelta(days=30)
-                recent_df = full_df[full_df['date'] >= pd.Timestamp(thirty_days_ago)].copy()
-
-                if not recent_df.empty and len(recent_df['worker'].unique()) > 0:
-                    # 작업자별 KPI 계산
-                    worker_stats = recent_df.groupby('worker').agg({
-                        'pcs_completed': 'sum',  # 총생산량
-                        'work_time': ['mean', 'std'],  # 평균 시간, 표준편차
-                        'first_pass_yield': 'mean',  # FPY
-                        'worker': 'count'  # 세션 수 (집중도)
-                    }).reset_index()
-
-                    # 컬럼명 정리
-                    worker_stats.columns = ['worker', 'total_pcs', 'avg_work_time', 'work_time_std', 'avg_fpy', 'session_count']
-
-                    # 각 KPI 계산
-                    worker_stats['hourly_eff'] = worker_stats.apply(
-                        lambda x: (x['total_pcs'] / x['session_count'] / x['avg_work_time'] * 3600) if x['avg_work_time'] > 0 else 0,
-                        axis=1
-                    )
-                    worker_stats['consistency'] = worker_stats.apply(
-                        lambda x: 100 - min((x['work_time_std'] / x['avg_work_time'] * 100) if x['avg_work_time'] > 0 else 0, 100),
-                        axis=1
-                    )
-                    worker_stats['fpy_pct'] = worker_stats['avg_fpy'] * 100
-
-                    # Min/Max 계산
-                    baseline_stats = {
-                        'daily_prod': {
-                            'min': float(worker_stats['total_pcs'].min()),
-                            'max': float(worker_stats['total_pcs'].max())
-                        },
-                        'hourly_eff': {
-                            'min': float(worker_stats['hourly_eff'].min()),
-                            'max': float(worker_stats['hourly_eff'].max())
-                        },
-                        'fpy': {
-                            'min': float(worker_stats['fpy_pct'].min()),
-                            'max': float(worker_stats['fpy_pct'].max())
-                        },
-                        'consistency': {
-                            'min': float(worker_stats['consistency'].min()),
-                            'max': float(worker_stats['consistency'].max())
-                        },
-                        'intensity': {
-                            'min': float(worker_stats['session_count'].min()),
-                            'max': float(worker_stats['session_count'].max())
-                        }
-                    }
-                    logger.debug(f"[API] 30일 기준 KPI 범위 계산 완료: {len(worker_stats)}명")
-            except Exception as e:
-                logger.warning(f"[API] 30일 기준 KPI 계산 오류: {e}")
-
-        # 응답 데이터
-        safe_sessions_data = json.loads(filtered_df.replace([np.inf, -np.inf], np.nan).fillna('').to_json(orient='records', date_format='iso'))
-
-        valid_dates = full_df['date'].dropna()
-        date_range = {
-            'min': valid_dates.min().strftime('%Y-%m-%d') if not valid_dates.empty else None,
-            'max': valid_dates.max().strftime('%Y-%m-%d') if not valid_dates.empty else None
+        # summary/sessions가 함께 요청되면 세션 로드/필터링은 한 번만 수행
+        frames = None
+        def analysis_frames():
+            nonlocal frames
+            if frames is None:
+                frames = load_analysis_frames(process_mode, start_date, end_date, selected_workers)
+            return frames
+
+        builders = {
+            'summary': lambda: build_summary_section(process_mode, *analysis_frames()),
+            'sessions': lambda: build_sessions_section(*analysis_frames()),
+            'history': lambda: build_history_section(process_mode, get_analysis_extended_start(start_date), end_date),
+            'comparison': lambda: build_comparison_section(process_mode, start_date, end_date),
+            'hr': lambda: build_hr_section(process_mode),
         }
 
-        # normalized_df JSON 변환
-        normalized_df_json = []
-        if normalized_df is not None and not normalized_df.empty:
-            normalized_df_json = json.loads(normalized_df.replace([np.inf, -np.inf], None).to_json(orient='records', date_format='iso'))
-
-        # 전체 비교 모드용 comparison_data 생성
-        comparison_data = None
-        if process_mode == '전체 비교':
-            logger.info("[API] 전체 비교 데이터 생성 중...")
-            try:
-                def calculate_process_kpis(df):
-                    """공정별 KPI 계산"""
-                    if df.empty:
-                        return {
-                            'total_trays': 0, 'total_pcs_completed': 0,
-                            'avg_tray_time': 0, 'avg_fpy': 0
-                        }
-                    return {
-                        'total_trays': int(len(df)),
-                        'total_pcs_completed': int(df['pcs_completed'].sum()),
-                        'avg_tray_time': float(df['work_time'].mean()),
-                        'avg_fpy': float(df['first_pass_yield'].mean())
-                    }
-
-                # 선택 기간 기준 데이터 (사용자가 선택한 날짜 범위)
-                period_inspection = db.get_sessions(start_date=start_date, end_date=end_date, process='검사실')
-                period_transfer = db.get_sessions(start_date=start_date, end_date=end_date, process='이적실')
-                period_packaging = db.get_sessions(start_date=start_date, end_date=end_date, process='포장실')
-
-                # 포장실 데이터: 트레이 단위로 PCS 추정 (1 트레이 = 60 PCS)
-                if not period_packaging.empty:
-                    period_packaging['pcs_completed'] = 60
-
-                period_inspection_kpis = calculate_process_kpis(period_inspection)
-                period_transfer_kpis = calculate_process_kpis(period_transfer)
-                period_packaging_kpis = calculate_process_kpis(period_packaging)
-
-                # 선택 기간 데이터로 통합 (날짜 필터 반영)
-                summary_period = {
-                    'inspection': period_inspection_kpis,
-                    'transfer': period_transfer_kpis,
-                    'packaging': period_packaging_kpis,
-                    'transfer_standby_trays': period_inspection_kpis['total_trays'] - period_transfer_kpis['total_trays'],
-                    'packaging_standby_trays': period_transfer_kpis['total_trays'] - period_packaging_kpis['total_trays'],
-                    'transfer_standby_pcs': period_inspection_kpis['total_pcs_completed'] - period_transfer_kpis['total_pcs_completed'],
-                    'packaging_standby_pcs': period_transfer_kpis['total_pcs_completed'] - period_packaging_kpis['total_pcs_completed'],
-                }
-
-                # 추세 그래프용 데이터 (선택 기간)
-                trends_data = {
-                    'inspection': json.loads(period_inspection.replace([np.inf, -np.inf], np.nan).fillna('').to_json(orient='records', date_format='iso')),
-                    'transfer': json.loads(period_transfer.replace([np.inf, -np.inf], np.nan).fillna('').to_json(orient='records', date_format='iso')),
-                    'packaging': json.loads(period_packaging.replace([np.inf, -np.inf], np.nan).fillna('').to_json(orient='records', date_format='iso')),
-                }
-
-                comparison_data = {
-                    'summary_period': summary_period,  # summary_today 제거 - 모든 데이터가 선택한 날짜 범위 사용
-                    'trends': trends_data
-                }
-
-                logger.info(f"[API] 전체 비교 데이터 생성 완료: 검사실:{period_inspection_kpis['total_trays']}, 이적실:{period_transfer_kpis['total_trays']}, 포장실:{period_packaging_kpis['total_trays']}")
-
-            except Exception as e:
-                logger.error(f"[API] 전체 비교 데이터 생성 오류: {e}")
-                import traceback
-                traceback.print_exc()
-
-        # HR용 전체 데이터 (날짜 필터 없이 모든 기록)
-        hr_sessions_data = []
-        try:
-            hr_df = db.get_sessions(process=process_mode)  # 날짜 필터 없이 전체 조회
-            if not hr_df.empty:
-                # 테스트 작업자 제외
-                hr_df = hr_df[~hr_df['worker'].isin(TEST_WORKERS)].copy()
-                # 작업자명 정규화
-                hr_df['worker'] = hr_df['worker'].apply(normalize_worker_name)
-                hr_sessions_data = json.loads(hr_df.replace([np.inf, -np.inf], np.nan).fillna('').to_json(orient='records', date_format='iso'))
-                logger.debug(f"[API] HR용 전체 데이터: {len(hr_sessions_data)}개 세션")
-        except Exception as e:
-            logger.warning(f"[API] HR 데이터 로드 오류: {e}")
-
-        response_data = {
-            'kpis': convert_to_json_serializable(kpis),
-            'worker_data': convert_to_json_serializable(worker_data_json),
-            'normalized_performance': convert_to_json_serializable(normalized_df_json),
-            'workers': all_workers,
-            'date_range': date_range,
-            'filtered_sessions_data': safe_sessions_data,
-            'hr_sessions_data': hr_sessions_data,  # HR용 전체 데이터 (날짜 필터 없음)
-            'historical_summary': safe_historical_summary,
-            'baseline_stats': baseline_stats,
-            'filtered_raw_events': [],
-            'comparison_data': convert_to_json_serializable(comparison_data)
-        }
+        # 섹션별 JSON 조각 (캐시 미스인 섹션만 계산)
+        fragments = []
+        for section in sections:
+            key = analysis_section_key(section, process_mode, start_date, end_date, selected_workers)
+            fragment = section_cache.get(key)
+            if fragment is None:
+                version = section_cache.version(process_mode)
+                fragment = json.dumps(builders[section](), ensure_ascii=False)
+                section_cache.set(key, fragment, version)
+            else:
+                logger.debug(f"[API] 섹션 캐시에서 로드: {section}")
+            fragments.append(fragment)
+        json_str = '{' + ', '.join(fragment[1:-1] for fragment in fragments if fragment != '{}') + '}'
 
         # GZIP 압축
-        json_str = json.dumps(response_data, ensure_ascii=False)
         gzip_buffer = BytesIO()
         with gzip.GzipFile(mode='wb', fileobj=gzip_buffer, compresslevel=6) as gz_file:
             gz_file.write(json_str.encode('utf-8'))
@@ -715,97 +994,39 @@ def search_barcode():
 
         logger.info(f"[API] 바코드 검색: {barcode}")
 
-        conn = db.get_connection()
-
         # 1. SCAN_OK 이벤트 검색 (부분 일치 허용)
-        # 먼저 정확히 일치하는 바코드를 찾고, 없으면 부분 일치 검색
-        scan_cursor = conn.execute("""
-            SELECT timestamp, worker_name, details, process, barcode
-            FROM raw_events
-            WHERE barcode = ? AND event = 'SCAN_OK'
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """, (barcode,))
-
-        scan_row = scan_cursor.fetchone()
-
-        # 정확히 일치하는 바코드가 없으면 부분 일치 검색 (LIKE 사용)
-        if not scan_row:
-            scan_cursor = conn.execute("""
-                SELECT timestamp, worker_name, details, process, barcode
-                FROM raw_events
-                WHERE barcode LIKE ? AND event = 'SCAN_OK'
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """, (f'%{barcode}%',))
-            scan_row = scan_cursor.fetchone()
-
-        if not scan_row:
-            conn.close()
+        # 먼저 정확히 일치하는 바코드를 찾고, 없으면 부분 일치 검색 (trigram 인덱스 사용)
+        scan_rows = db.search_raw_events_by_barcode(barcode, event='SCAN_OK', exact=True, limit=1)
+        if not scan_rows:
+            scan_rows = db.search_raw_events_by_barcode(barcode, event='SCAN_OK', limit=1)
+
+        if not scan_rows:
             return jsonify({"found": False, "message": "바코드를 찾을 수 없습니다."}), 404
 
         # 실제 찾은 바코드로 업데이트
-        actual_barcode = scan_row[4]
+        scan_row = scan_rows[0]
+        actual_barcode = scan_row['barcode']
         logger.debug(f"[API] 바코드 검색 결과: 입력={barcode}, 찾음={actual_barcode}")
 
-        # SCAN_OK 정보 파싱
-        try:
-            scan_details = json.loads(scan_row[2])
-            scan_info = {
-                'worker': scan_row[1],
-                'timestamp': scan_row[0],
-                'process': scan_row[3],
-                'interval_sec': scan_details.get('interval_sec', 'N/A')
-            }
-        except:
-            conn.close()
-            return jsonify({"found": False, "message": "바코드 데이터 파싱 오류"}), 500
-
-        # 2. TRAY_COMPLETE 이벤트 검색 (같은 작업자, 스캔 이후 시간)
-        # 실제 찾은 바코드로 검색
-        tray_cursor = conn.execute("""
-            SELECT timestamp, details
-            FROM raw_events
-            WHERE worker_name = ?
-              AND event = 'TRAY_COMPLETE'
-              AND timestamp >= ?
-              AND details LIKE ?
-            ORDER BY timestamp
-            LIMIT 1
-        """, (scan_info['worker'], scan_info['timestamp'], f'%{actual_barcode}%'))
-
-        tray_row = tray_cursor.fetchone()
-        conn.close()
+        # SCAN_OK 정보 (details 추출 컬럼 사용)
+        scan_info = {
+            'worker': scan_row['worker_name'],
+            'timestamp': scan_row['timestamp'],
+            'process': scan_row['process'],
+            'interval_sec': scan_row['interval_sec'] if scan_row['interval_sec'] is not None else 'N/A'
+        }
+
+        # 2. 바코드가 담긴 트레이 검색 (같은 작업자, 스캔 이후 완료) - 바코드-트레이 매핑 테이블 사용
+        tray_row = db.find_tray_for_barcode(actual_barcode, worker=scan_info['worker'], after_ts=scan_info['timestamp'])
 
         tray_info = None
         if tray_row:
-            try:
-                tray_details = json.loads(tray_row[1])
-                scanned_barcodes = tray_details.get('scanned_product_barcodes', [])
-                # 실제 바코드 또는 부분 일치하는 바코드 찾기
-                matching_barcode = None
-                barcode_idx = -1
-                for idx, bc in enumerate(scanned_barcodes):
-                    if bc == actual_barcode or actual_barcode in bc or barcode in bc:
-                        matching_barcode = bc
-                        barcode_idx = idx
-                        break
-
-                if matching_barcode:
-                    tray_info = {
-                        'complete_time': tray_row[0],
-                        'item_code': tray_details.get('item_code', 'N/A'),
-                        'item_name': tray_details.get('item_name', 'N/A'),
-                        'scan_count': tray_details.get('scan_count', 0),
-                        'tray_capacity': tray_details.get('tray_capacity', 0),
-                        'work_time_sec': tray_details.get('work_time_sec', 0),
-                        'error_count': tray_details.get('error_count', 0),
-                        'start_time': tray_details.get('start_time', 'N/A'),
-                        'end_time': tray_details.get('end_time', 'N/A'),
-                        'barcode_position': barcode_idx + 1
-                    }
-            except:
-                pass
+            # 트레이 정보 (details 추출 컬럼 사용, 값이 없으면 기본값)
+            defaults = {'item_code': 'N/A', 'item_name': 'N/A', 'scan_count': 0, 'tray_capacity': 0,
+                        'work_time_sec': 0, 'error_count': 0, 'start_time': 'N/A', 'end_time': 'N/A'}
+            tray_info = {key: tray_row[key] if tray_row[key] is not None else default for key, default in defaults.items()}
+            tray_info['complete_time'] = tray_row['complete_time']
+            tray_info['barcode_position'] = tray_row['position']
 
         # 응답 구성 (실제 찾은 바코드 정보 포함)
         response = {
@@ -848,110 +1069,45 @@ def search_barcode():
         traceback.print_exc()
         return jsonify({"error": f"바코드 검색 중 오류: {e}"}), 500
 
+def load_realtime_sessions(process_mode: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """실시간 집계 구성용 세션 조회 (시각은 동기화 세션과 같은 ISO 문자열로 맞춤)"""
+    sessions_df = db.get_sessions(start_date=start_date, end_date=end_date, process=process_mode,
+                                  columns=AGGREGATE_SESSION_COLUMNS)
+    for column in ('start_time_dt', 'end_time_dt'):
+        sessions_df[column] = sessions_df[column].map(lambda v: v.isoformat() if pd.notna(v) else None)
+    return sessions_df
+
+def find_latest_session_date(process_mode: str, start_date: str, end_date: str) -> Optional[str]:
+    """기간 내 세션이 있는 가장 최근 날짜"""
+    dates = db.get_sessions(start_date=start_date, end_date=end_date, process=process_mode, columns=['date'])['date']
+    return dates.max().strftime('%Y-%m-%d') if not dates.empty else None
+
+def load_realtime_baseline(process_mode: str, start_date: str, end_date: str) -> tuple:
+    """실시간 평균 기준선 - 날짜별 통계와 시간대별 PCS 합계 (일별/시간대별 롤업에서 병합)"""
+    rollups = load_rollups(start_date, end_date, process_mode)
+    if rollups.empty:
+        return pd.DataFrame(columns=['date', 'pcs_completed', 'session_count', 'work_time', 'worker_count']), \
+            pd.Series(dtype=float)
+
+    daily_stats = merge_rollups(rollups, 'date')
+    daily_stats['worker_count'] = daily_stats['date'].map(rollups.groupby('date')['worker'].nunique()).fillna(0)
+    hourly_rollups = load_rollups(start_date, end_date, process_mode, hourly=True)
+    hourly = hourly_rollups.groupby('hour')['pcs_sum'].sum() if not hourly_rollups.empty else pd.Series(dtype=float)
+    return daily_stats, hourly
+
+# 실시간 현황 메모리 집계 (공정 모드별, 동기화된 세션만큼 증분 갱신)
+realtime_aggregator = RealtimeAggregator(load_realtime_sessions, find_latest_session_date, load_realtime_baseline,
+                                         process_modes=VALID_PROCESSES)
+
 @app.route('/api/realtime', methods=['GET'])
 def get_realtime_data():
     try:
         process_mode = request.args.get('process_mode', '이적실')
-        today = datetime.now().date().isoformat()
-
-        logger.info(f"[API] 실시간 데이터 요청: {process_mode}, 날짜={today}")
-
-        # 오늘 날짜 세션 조회
-        today_sessions_df = db.get_sessions(start_date=today, end_date=today, process=process_mode)
-        logger.debug(f"[API] 오늘 세션: {len(today_sessions_df)}개")
-
-        # 포장실 데이터: 트레이 단위로 PCS 추정 (1 트레이 = 60 PCS)
-        if process_mode == '포장실' and not today_sessions_df.empty:
-            today_sessions_df['pcs_completed'] = 60
-
-        # 오늘 데이터가 없으면 최근 작업일 데이터 조회
-        display_date = today
-        if today_sessions_df.empty:
-            logger.debug("[API] 오늘 데이터 없음, 최근 작업일 조회 중...")
-            # 최근 7일 내 데이터 조회
-            seven_days_ago = (datetime.now() - timedelta(days=7)).date().isoformat()
-            recent_df = db.get_sessions(start_date=seven_days_ago, end_date=today, process=process_mode)
-
-            # 포장실 데이터: 트레이 단위로 PCS 추정
-            if process_mode == '포장실' and not recent_df.empty:
-                recent_df['pcs_completed'] = 60
-
-            if not recent_df.empty:
-                # 가장 최근 날짜 찾기
-                latest_date = recent_df['date'].max()
-                display_date = latest_date.strftime('%Y-%m-%d')
-                today_sessions_df = recent_df[recent_df['date'] == latest_date].copy()
-                logger.debug(f"[API] 최근 작업일 데이터 사용: {display_date}, {len(today_sessions_df)}개 세션")
-
-        # 작업자별 집계
-        worker_summary = pd.DataFrame()
-        item_summary = pd.DataFrame()
-        hourly_summary = pd.Series(dtype=float)
-        work_hours = range(6, 23)
-
-        if not today_sessions_df.empty:
-            worker_summary = today_sessions_df.groupby('worker').agg(
-                pcs_completed=('pcs_completed', 'sum'),
-                avg_work_time=('work_time', 'mean'),
-                session_count=('worker', 'size')
-            ).reset_index().sort_values(by='pcs_completed', ascending=False)
-
-            worker_summary = worker_summary[worker_summary['pcs_completed'] > 0]
-
-            item_summary = today_sessions_df.groupby('item_display').agg(
-                pcs_completed=('pcs_completed', 'sum'),
-                pallet_count=('item_display', 'size')
-            ).reset_index().sort_values(by='pcs_completed', ascending=False)
-            item_summary = item_summary[item_summary['pcs_completed'] > 0]
-
-            today_sessions_df['hour'] = pd.to_datetime(today_sessions_df['start_time_dt']).dt.hour
-            hourly_summary = today_sessions_df.groupby('hour')['pcs_completed'].sum().reindex(work_hours, fill_value=0)
-
-        # 최근 30일 평균
-        thirty_days_ago = (datetime.now() - timedelta(days=30)).date().isoformat()
-        recent_sessions_df = db.get_sessions(start_date=thirty_days_ago, end_date=today, process=process_mode)
-
-        # 포장실 데이터: 트레이 단위로 PCS 추정
-        if process_mode == '포장실' and not recent_sessions_df.empty:
-            recent_sessions_df['pcs_completed'] = 60
-
-        average_hourly_production = []
-        monthly_averages = {'daily_total_pcs': 0, 'daily_total_pallets': 0, 'daily_worker_count': 0, 'daily_avg_work_time': 0}
-
-        if not recent_sessions_df.empty:
-            num_days = recent_sessions_df['date'].nunique()
-            if num_days > 0:
-                recent_sessions_df['hour'] = pd.to_datetime(recent_sessions_df['start_time_dt']).dt.hour
-                total_hourly_summary = recent_sessions_df.groupby('hour')['pcs_completed'].sum().reindex(work_hours, fill_value=0)
-                average_hourly_production = (total_hourly_summary / num_days).values.tolist()
-
-                daily_stats = recent_sessions_df.groupby(recent_sessions_df['date'].dt.date).agg({
-                    'pcs_completed': 'sum',
-                    'worker': 'nunique',
-                    'work_time': 'mean',
-                    'date': 'size'
-                }).rename(columns={'date': 'pallet_count'})
-
-                if not daily_stats.empty:
-                    monthly_averages = {
-                        'daily_total_pcs': round(daily_stats['pcs_completed'].mean(), 1),
-                        'daily_total_pallets': round(daily_stats['pallet_count'].mean(), 1),
-                        'daily_worker_count': round(daily_stats['worker'].mean(), 1),
-                        'daily_avg_work_time': round(daily_stats['work_time'].mean(), 1)
-                    }
-
-        return jsonify({
-            'display_date': display_date,  # 실제 표시 날짜
-            'is_today': display_date == today,  # 오늘 데이터인지 여부
-            'worker_status': json.loads(worker_summary.to_json(orient='records')),
-            'item_status': json.loads(item_summary.to_json(orient='records')),
-            'hourly_production': {
-                'labels': [f"{h:02d}시" for h in work_hours],
-                'today': hourly_summary.values.tolist() if not hourly_summary.empty else [0]*len(work_hours),
-                'average': average_hourly_production
-            },
-            'monthly_averages': monthly_averages
-        })
+        if process_mode not in VALID_PROCESSES:
+            return jsonify({"error": f"Invalid process_mode. Must be one of: {VALID_PROCESSES}"}), 400
+        logger.debug(f"[API] 실시간 데이터 요청: {process_mode}")
+        # 메모리 집계 상태에서 바로 응답 (최초/자정 이후 첫 요청만 DB에서 구성)
+        return jsonify(realtime_aggregator.snapshot(process_mode))
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -979,29 +1135,15 @@ def trace_data():
 
         # 시나리오 1: 바코드 검색 (최적화: 인덱싱된 barcode 컬럼 사용)
         if barcode:
-            conn = db.get_connection()
-
-            # 바코드 컬럼 사용 (3.4배 빠름)
-            cursor = conn.execute("""
-                SELECT timestamp, worker_name as worker, event, details, process
-                FROM raw_events
-                WHERE barcode LIKE ?
-                AND timestamp >= ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (f'%{barcode}%', start_date, max_results))
-
-            results = []
-            for row in cursor.fetchall():
-                results.append({
-                    'timestamp': row[0],
-                    'worker': row[1],
-                    'event': row[2],
-                    'details': row[3],
-                    'process': row[4]
-                })
-
-            conn.close()
+            # 바코드 부분 일치 검색 (trigram 인덱스 사용)
+            rows = db.search_raw_events_by_barcode(barcode, start_ts=start_date, limit=max_results)
+            results = [{
+                'timestamp': row['timestamp'],
+                'worker': row['worker_name'],
+                'event': row['event'],
+                'details': row['details'],
+                'process': row['process']
+            } for row in rows]
 
             total_count = len(results)
             truncated = total_count >= max_results
@@ -1057,36 +1199,26 @@ def trace_data():
         traceback.print_exc()
         return jsonify({"error": f"이력 추적 중 오류: {e}"}), 500
 
+MAX_SESSION_BARCODE_BATCH = 500
+
 @app.route('/api/session_barcodes', methods=['POST'])
 def get_session_barcodes():
-    """세션별 바코드 목록 조회"""
+    """세션별 바코드 목록 조회 (세션 id 기본키 조회, id가 없는 요청은 시간 구간으로 조회)"""
     try:
-        session_info = request.json
+        session_info = request.json or {}
+        session_id = session_info.get('id')
+
+        if session_id is not None:
+            barcodes = db.get_session_barcodes([int(session_id)]).get(int(session_id))
+            if barcodes is not None:
+                return jsonify({"barcodes": barcodes})
+
         start_time = session_info['start_time_dt']
         end_time = session_info['end_time_dt']
         worker = session_info['worker']
         process = session_info['process']
 
-        conn = db.get_connection()
-        cursor = conn.execute("""
-            SELECT details FROM raw_events
-            WHERE timestamp >= ? AND timestamp <= ?
-            AND worker_name = ? AND process = ? AND event = 'SCAN_OK'
-            ORDER BY timestamp ASC
-        """, (start_time, end_time, worker, process))
-
-        barcodes = []
-        for row in cursor.fetchall():
-            detail_str = row[0]
-            try:
-                if detail_str and detail_str.strip().startswith('{'):
-                    detail_dict = json.loads(detail_str)
-                    if 'barcode' in detail_dict:
-                        barcodes.append(detail_dict['barcode'])
-            except (json.JSONDecodeError, TypeError):
-                continue
-
-        conn.close()
+        barcodes = db.get_scan_barcodes(worker, process, start_time, end_time)
         return jsonify({"barcodes": barcodes})
 
     except Exception as e:
@@ -1094,6 +1226,25 @@ def get_session_barcodes():
         traceback.print_exc()
         return jsonify({"error": f"바코드 조회 중 오류: {e}"}), 500
 
+@app.route('/api/session_barcodes/batch', methods=['POST'])
+def get_session_barcodes_batch():
+    """여러 세션의 바코드 목록 일괄 조회 (테이블 한 페이지 미리 불러오기용)"""
+    try:
+        query = request.json or {}
+        session_ids = query.get('session_ids') or []
+        if not isinstance(session_ids, list) or len(session_ids) > MAX_SESSION_BARCODE_BATCH:
+            return jsonify({"error": f"session_ids는 최대 {MAX_SESSION_BARCODE_BATCH}개의 목록이어야 합니다."}), 400
+
+        barcodes = db.get_session_barcodes([int(session_id) for session_id in session_ids])
+        return jsonify({"barcodes": {str(session_id): codes for session_id, codes in barcodes.items()}})
+
+    except (TypeError, ValueError):
+        return jsonify({"error": "유효하지 않은 세션 id입니다."}), 400
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"바코드 조회 중 오류: {e}"}), 500
+
 @app.route('/api/worker_hourly', methods=['POST'])
 @validate_date_params('start_date', 'end_date')
 def get_worker_hourly():
@@ -1113,18 +1264,14 @@ def get_worker_hourly():
             return jsonify({"error": "유효하지 않은 작업자명입니다."}), 400
 
         # 유효한 공정 모드 확인
-        VALID_PROCESSES = ['이적실', '검사실', '포장실', '전체 비교']
         if process_mode not in VALID_PROCESSES:
             return jsonify({"error": f"Invalid process_mode"}), 400
 
         logger.info(f"[API] 작업자 시간당 생산량: {worker}, {start_date}~{end_date}, {process_mode}")
 
-        # 세션 데이터 조회 (선택 기간용 - 시간대별 생산량, 요약 통계)
-        sessions_df = db.get_sessions(start_date=start_date, end_date=end_date, process=process_mode)
-
-        # 작업자명 정규화 적용 (메인 API와 동일하게)
-        if not sessions_df.empty and 'worker' in sessions_df.columns:
-            sessions_df['worker'] = sessions_df['worker'].apply(normalize_worker_name)
+        # 시간대별 생산량/요약 통계/일별 생산량/전체 작업일수는 롤업에서 계산 (메인 API와 동일하게 작업자명 정규화)
+        period_rollups = load_rollups(start_date, end_date, process_mode, normalize_workers=True)
+        period_hourly = load_rollups(start_date, end_date, process_mode, hourly=True, normalize_workers=True)
 
         # 일별 생산량용 1개월 데이터 조회
         if end_date:
@@ -1134,26 +1281,16 @@ def get_worker_hourly():
             daily_end = datetime.now().strftime('%Y-%m-%d')
             daily_start = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
 
-        daily_sessions_df = db.get_sessions(start_date=daily_start, end_date=daily_end, process=process_mode)
-
-        # 작업자명 정규화 적용 (일별 데이터)
-        if not daily_sessions_df.empty and 'worker' in daily_sessions_df.columns:
-            daily_sessions_df['worker'] = daily_sessions_df['worker'].apply(normalize_worker_name)
+        daily_rollups = load_rollups(daily_start, daily_end, process_mode, normalize_workers=True)
 
         # 전체 기간 작업일수 조회 (필터 무관)
-        all_time_df = db.get_sessions(start_date=None, end_date=None, process=process_mode)
-
-        # 작업자명 정규화 적용 (전체 기간)
-        if not all_time_df.empty and 'worker' in all_time_df.columns:
-            all_time_df['worker'] = all_time_df['worker'].apply(normalize_worker_name)
+        all_time_rollups = load_rollups(None, None, process_mode, normalize_workers=True)
 
         total_num_days = 0
-        if not all_time_df.empty:
-            worker_all_df = all_time_df[all_time_df['worker'] == worker]
-            if not worker_all_df.empty:
-                total_num_days = worker_all_df['date'].nunique()
+        if not all_time_rollups.empty:
+            total_num_days = all_time_rollups.loc[all_time_rollups['worker'] == worker, 'date'].nunique()
 
-        if sessions_df.empty and daily_sessions_df.empty:
+        if period_rollups.empty and daily_rollups.empty:
             return jsonify({
                 "worker": worker,
                 "hourly_data": [],
@@ -1161,18 +1298,12 @@ def get_worker_hourly():
                 "summary": {}
             })
 
-        # 포장실 데이터: 트레이 단위로 PCS 추정
-        if process_mode == '포장실':
-            if not sessions_df.empty:
-                sessions_df['pcs_completed'] = 60
-            if not daily_sessions_df.empty:
-                daily_sessions_df['pcs_completed'] = 60
-
         # 해당 작업자 필터링
-        worker_df = sessions_df[sessions_df['worker'] == worker].copy() if not sessions_df.empty else pd.DataFrame()
-        daily_worker_df = daily_sessions_df[daily_sessions_df['worker'] == worker].copy() if not daily_sessions_df.empty else pd.DataFrame()
+        worker_hourly = period_hourly[period_hourly['worker'] == worker] if not period_hourly.empty else pd.DataFrame()
+        worker_rollups = period_rollups[period_rollups['worker'] == worker] if not period_rollups.empty else pd.DataFrame()
+        daily_worker_rollups = daily_rollups[daily_rollups['worker'] == worker] if not daily_rollups.empty else pd.DataFrame()
 
-        if worker_df.empty and daily_worker_df.empty:
+        if worker_rollups.empty and daily_worker_rollups.empty:
             return jsonify({
                 "worker": worker,
                 "hourly_data": [],
@@ -1182,38 +1313,37 @@ def get_worker_hourly():
 
         # 시간대별 생산량 집계 (선택 기간 기준)
         hourly_avg = pd.Series([0.0] * 24)
-        num_days = 0
-        if not worker_df.empty:
-            worker_df['hour'] = pd.to_datetime(worker_df['start_time_dt']).dt.hour
-            hourly_sum = worker_df.groupby('hour')['pcs_completed'].sum()
-            num_days = worker_df['date'].nunique()
+        num_days = worker_rollups['date'].nunique() if not worker_rollups.empty else 0
+        if not worker_hourly.empty and num_days > 0:
+            hourly_sum = worker_hourly.groupby('hour')['pcs_sum'].sum()
             hourly_avg = (hourly_sum / num_days).reindex(range(0, 24), fill_value=0)
 
         # 일별 생산량 집계 (최근 1개월)
         daily_sum = pd.DataFrame()
-        if not daily_worker_df.empty:
-            daily_worker_df['date_str'] = pd.to_datetime(daily_worker_df['date']).dt.strftime('%Y-%m-%d')
-            daily_sum = daily_worker_df.groupby('date_str').agg({
-                'pcs_completed': 'sum',
-                'work_time': 'mean',
-                'latency': 'mean',
-                'worker': 'count'
-            }).reset_index()
-            daily_sum.columns = ['date', 'pcs', 'avg_work_time', 'avg_latency', 'session_count']
-            daily_sum = daily_sum.sort_values('date')
+        if not daily_worker_rollups.empty:
+            daily_sum = merge_rollups(daily_worker_rollups, 'date').sort_values('date')
+            daily_sum = pd.DataFrame({
+                'date': daily_sum['date'].dt.strftime('%Y-%m-%d'),
+                'pcs': daily_sum['pcs_completed'],
+                'avg_work_time': daily_sum['work_time'],
+                'avg_latency': daily_sum['latency'],
+                'session_count': daily_sum['session_count'],
+            })
 
         # 요약 통계 (선택 기간 기준)
         summary = {}
-        if not worker_df.empty:
+        if not worker_rollups.empty:
+            totals = merge_rollups(worker_rollups, 'worker').iloc[0]
+            total_sessions = int(totals['session_count'])
             summary = {
-                'total_pcs': int(worker_df['pcs_completed'].sum()),
-                'total_sessions': len(worker_df),
-                'avg_daily_pcs': round(worker_df.groupby('date')['pcs_completed'].sum().mean(), 1),
-                'avg_work_time': round(worker_df['work_time'].mean(), 1),
-                'avg_latency': round(worker_df['latency'].mean(), 1),
+                'total_pcs': int(totals['pcs_completed']),
+                'total_sessions': total_sessions,
+                'avg_daily_pcs': round(merge_rollups(worker_rollups, 'date')['pcs_completed'].mean(), 1),
+                'avg_work_time': round(totals['work_time'], 1),
+                'avg_latency': round(totals['latency'], 1),
                 'num_days': num_days,
                 'total_num_days': total_num_days,  # 전체 기간 작업일수
-                'first_pass_yield': round((worker_df['had_error'] == 0).sum() / len(worker_df) * 100, 1) if len(worker_df) > 0 else 0
+                'first_pass_yield': round(totals['no_error_sessions'] / total_sessions * 100, 1) if total_sessions > 0 else 0
             }
 
         return jsonify({
@@ -1343,21 +1473,39 @@ def export_error_log():
 def handle_connect():
     logger.debug('Client connected')
 
+@socketio.on('join_process')
+def handle_join_process(data):
+    """클라이언트가 보고 있는 공정 모드의 방으로 이동 (실시간 델타 수신용)"""
+    process_mode = (data or {}).get('process_mode')
+    if not isinstance(process_mode, str):
+        return
+    for room in rooms():
+        if room.startswith('process:'):
+            leave_room(room)
+    join_room(process_room(process_mode))
+
 @socketio.on('disconnect')
 def handle_disconnect():
     logger.debug('Client disconnected')
 
 # 애플리케이션 실행
 if __name__ == '__main__':
+    # 증분 동기화 엔진 시작 (기동 직후 밀린 파일부터 처리)
+    sync_engine.start()
+    run_incremental_sync()
+
     # 파일 감시 스레드 시작
     monitor_thread = threading.Thread(target=start_file_monitor, daemon=True)
     monitor_thread.start()
 
-    # 주기적 증분 동기화 (5분마다)
+    # 주기적 증분 동기화 점검, DB 유지보수 요청 및 파일 캐시 정리 (5분마다)
+    # DB 쓰기(raw_events 월별 보관 포함)는 모두 동기화 엔진의 작업 스레드에서 실행된다
     def periodic_sync():
         while True:
             time.sleep(300)  # 5분
             run_incremental_sync()
+            sync_engine.request_maintenance()
+            analyzer.data_manager.file_cache.clear_old_cache()
 
     sync_thread = threading.Thread(target=periodic_sync, daemon=True)
     sync_thread.start()
@@ -1369,4 +1517,10 @@ if __name__ == '__main__':
     logger.info("적용된 최적화: SQLite DB, 증분 동기화, GZIP 압축, 인덱싱")
     logger.info("=" * 50)
 
-    socketio.run(app, host='0.0.0.0', port=8089, debug=True, use_reloader=False)
+    try:
+        socketio.run(app, host='0.0.0.0', port=8089, debug=True, use_reloader=False)
+    finally:
+        # 종료 시 동기화 엔진(쓰기 연결 포함)을 멈추고 오프셋 저장, 풀의 유휴 연결 정리
+        sync_engine.stop(timeout=10)
+        tail_reader.save_state()
+        db.close_all()
@@ -1,22 +1,47 @@
 # -*- coding: utf-8 -*-
 import os
+import re
+import json
+import time
 import pickle
+import shutil
 import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, List
 import logging
 
+from log_catalog import LogFileCatalog, LOCATION_MAIN, LIVE_LOCATIONS
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CACHE_FORMAT_VERSION = 2  # 컬럼형 캐시 포맷 버전 (변경 시 기존 항목은 미스로 처리되어 재생성)
+CACHE_META_FILE = 'meta.json'
+CACHE_ENTRY_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+DEFAULT_FILE_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 파일 캐시 최대 1GB
+DEFAULT_SESSION_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 세션 캐시 최대 512MB
+DEFAULT_SECTION_CACHE_MAX_BYTES = 256 * 1024 * 1024  # API 섹션 캐시 최대 256MB
+
+
 class DataCache:
-    """파일 레벨 캐싱을 위한 클래스"""
+    """파일 레벨 캐싱을 위한 클래스
 
-    def __init__(self, cache_dir='cache'):
+    원본 로그 파일 하나당 캐시 디렉토리 하나({hash}/)를 두고, 컬럼별로 .npy 파일을 저장한다.
+    숫자/불린/시각 컬럼은 메모리 매핑으로 읽고, 문자열/카테고리 컬럼은 코드 배열 + 사전(meta.json)으로
+    저장하여 요청한 컬럼만 읽을 수 있다.
+
+    캐시 키에 원본 파일의 수정시각/크기가 포함되므로 나이 기반 만료는 두지 않고,
+    전체 용량이 max_bytes를 넘으면 마지막 접근 시각(항목 디렉토리 mtime) 기준 LRU로 제거한다.
+    """
+
+    def __init__(self, cache_dir='cache', max_bytes: int = DEFAULT_FILE_CACHE_MAX_BYTES):
         self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
         os.makedirs(cache_dir, exist_ok=True)
-        self.cache_expiry = timedelta(hours=24)  # 24시간 캐시 유효
 
     def get_file_hash(self, file_path: str) -> str:
         """파일의 해시값 생성 (경로 + 수정시간 + 크기)"""
@@ -28,161 +53,407 @@ class DataCache:
             return None
 
     def get_cache_file_path(self, file_path: str) -> str:
-        """캐시 파일 경로 생성"""
+        """캐시 항목 디렉토리 경로 생성"""
         hash_key = self.get_file_hash(file_path)
         if not hash_key:
             return None
-        return os.path.join(self.cache_dir, f"{hash_key}.pkl")
+        return os.path.join(self.cache_dir, hash_key)
 
     def is_cache_valid(self, cache_file_path: str) -> bool:
-        """캐시 파일이 유효한지 확인"""
-        if not os.path.exists(cache_file_path):
-            return False
-
-        cache_time = datetime.fromtimestamp(os.path.getmtime(cache_file_path))
-        return datetime.now() - cache_time < self.cache_expiry
+        """캐시 항목이 유효한지 확인 (키에 원본 수정시각/크기가 포함되므로 존재 여부만 확인)"""
+        return os.path.exists(os.path.join(cache_file_path, CACHE_META_FILE))
 
-    def get_cached_data(self, file_path: str) -> Optional[pd.DataFrame]:
-        """캐시된 데이터 로드"""
+    @staticmethod
+    def _touch(cache_file_path: str):
+        """LRU용 마지막 접근 시각 기록"""
+        try:
+            os.utime(cache_file_path)
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------------
+    # 컬럼 인코딩
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _is_date_column(values: pd.Series) -> bool:
+        non_null = values.dropna()
+        return not non_null.empty and all(type(v) is date for v in non_null)
+
+    @staticmethod
+    def _is_string_column(values: pd.Series) -> bool:
+        return all(isinstance(v, str) for v in values.dropna())
+
+    def _encode_column(self, values: pd.Series, entry_dir: str, file_name: str) -> dict:
+        """컬럼 하나를 파일로 저장하고 meta.json에 기록할 스키마 정보 반환"""
+        spec = {'name': values.name, 'file': f"{file_name}.npy"}
+        target = os.path.join(entry_dir, spec['file'])
+
+        if isinstance(values.dtype, pd.CategoricalDtype) and self._is_string_column(pd.Series(values.cat.categories)):
+            spec['kind'] = 'category'
+            spec['categories'] = values.cat.categories.tolist()
+            np.save(target, values.cat.codes.to_numpy())
+        elif values.dtype == object and self._is_date_column(values):
+            spec['kind'] = 'date'
+            np.save(target, pd.to_datetime(values).to_numpy().astype('datetime64[D]'))
+        elif values.dtype == object and self._is_string_column(values):
+            spec['kind'] = 'string'
+            codes, uniques = pd.factorize(values)
+            spec['categories'] = uniques.tolist()
+            np.save(target, codes.astype(np.int32))
+        elif values.dtype.kind in 'biufmM':
+            spec['kind'] = 'array'
+            np.save(target, values.to_numpy())
+        else:
+            # 임의 객체 컬럼(raw 이벤트 목록 등)은 pickle로 보관
+            spec['kind'] = 'pickle'
+            spec['file'] = f"{file_name}.pkl"
+            with open(os.path.join(entry_dir, spec['file']), 'wb') as f:
+                pickle.dump(values.to_numpy(dtype=object), f)
+        return spec
+
+    @staticmethod
+    def _decode_column(spec: dict, entry_dir: str):
+        """스키마 정보에 따라 컬럼 복원 (숫자 배열은 메모리 매핑)"""
+        path = os.path.join(entry_dir, spec['file'])
+        kind = spec['kind']
+        if kind == 'pickle':
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+
+        array = np.load(path, mmap_mode='c')  # copy-on-write 매핑 (수정해도 캐시 파일은 불변)
+        if kind == 'array':
+            return array
+        if kind == 'category':
+            return pd.Categorical.from_codes(np.asarray(array), categories=spec['categories'])
+        if kind == 'string':
+            uniques = np.array(spec['categories'] + [np.nan], dtype=object)
+            return uniques[np.asarray(array)]  # 코드 -1(결측)은 마지막 NaN을 가리킴
+        if kind == 'date':
+            result = np.full(len(array), None, dtype=object)
+            valid = ~np.isnat(array)
+            result[valid] = array[valid].astype(object)
+            return result
+        raise ValueError(f"알 수 없는 캐시 컬럼 형식: {kind}")
+
+    # ------------------------------------------------------------------
+    # 읽기/쓰기
+    # ------------------------------------------------------------------
+
+    def get_cached_data(self, file_path: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """캐시된 데이터 로드
+
+        Args:
+            columns: 읽을 컬럼 목록 (None이면 전체). 캐시에 없는 컬럼은 무시된다.
+        """
         cache_file_path = self.get_cache_file_path(file_path)
         if not cache_file_path or not self.is_cache_valid(cache_file_path):
             return None
 
         try:
-            with open(cache_file_path, 'rb') as f:
-                data = pickle.load(f)
-                logger.info(f"캐시에서 로드: {os.path.basename(file_path)}")
-                return data
+            with open(os.path.join(cache_file_path, CACHE_META_FILE), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('version') != CACHE_FORMAT_VERSION:
+                return None
+
+            specs = meta['columns']
+            if columns is not None:
+                wanted = set(columns)
+                specs = [spec for spec in specs if spec['name'] in wanted]
+
+            data = {spec['name']: self._decode_column(spec, cache_file_path) for spec in specs}
+            df = pd.DataFrame(data, index=pd.RangeIndex(meta['rows']), copy=False)
+            self._touch(cache_file_path)
+            logger.info(f"캐시에서 로드: {os.path.basename(file_path)}")
+            return df
         except Exception as e:
             logger.warning(f"캐시 로드 실패 {file_path}: {e}")
             return None
 
     def save_cached_data(self, file_path: str, data: pd.DataFrame):
-        """데이터를 캐시에 저장"""
+        """데이터를 컬럼형 캐시에 저장 (임시 디렉토리에 쓴 뒤 교체)"""
         cache_file_path = self.get_cache_file_path(file_path)
         if not cache_file_path:
             return
 
+        tmp_dir = f"{cache_file_path}.tmp-{os.getpid()}"
         try:
-            with open(cache_file_path, 'wb') as f:
-                pickle.dump(data, f)
-                logger.info(f"캐시에 저장: {os.path.basename(file_path)}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            data = data.reset_index(drop=True)
+            specs = [self._encode_column(data[column], tmp_dir, f"c{i}") for i, column in enumerate(data.columns)]
+            stat = os.stat(file_path)
+            entry_bytes = sum(entry.stat().st_size for entry in os.scandir(tmp_dir))
+            meta = {
+                'version': CACHE_FORMAT_VERSION, 'source': file_path,
+                'source_mtime': stat.st_mtime, 'source_size': stat.st_size,
+                'bytes': entry_bytes, 'rows': len(data), 'columns': specs,
+            }
+            with open(os.path.join(tmp_dir, CACHE_META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+
+            shutil.rmtree(cache_file_path, ignore_errors=True)
+            os.replace(tmp_dir, cache_file_path)
+            logger.info(f"캐시에 저장: {os.path.basename(file_path)}")
         except Exception as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
             logger.warning(f"캐시 저장 실패 {file_path}: {e}")
 
+    # ------------------------------------------------------------------
+    # 용량 관리
+    # ------------------------------------------------------------------
+
+    def _scan_entries(self) -> list:
+        """캐시 항목 목록 [(경로, meta 또는 None, 크기, 마지막 접근 시각)]"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_dir() or not CACHE_ENTRY_PATTERN.match(entry.name):
+                continue
+            meta = None
+            try:
+                with open(os.path.join(entry.path, CACHE_META_FILE), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                pass
+            try:
+                last_access = entry.stat().st_mtime
+                size = meta.get('bytes') if meta else None
+                if size is None:
+                    size = sum(f.stat().st_size for f in os.scandir(entry.path))
+            except OSError:
+                continue
+            entries.append((entry.path, meta, size, last_access))
+        return entries
+
+    @staticmethod
+    def _is_source_current(meta: dict) -> bool:
+        """원본 로그 파일이 캐시 생성 당시와 같은지 확인"""
+        try:
+            stat = os.stat(meta['source'])
+        except (OSError, KeyError, TypeError):
+            return False
+        return stat.st_mtime == meta.get('source_mtime') and stat.st_size == meta.get('source_size')
+
+    def collect_garbage(self) -> int:
+        """원본이 사라졌거나 변경된 항목, 이전 포맷 항목, 남은 임시 디렉토리 제거
+
+        Returns:
+            제거한 항목 수
+        """
+        removed = 0
+        now = time.time()
+        for entry in os.scandir(self.cache_dir):
+            try:
+                if entry.is_file() and entry.name.endswith('.pkl'):
+                    os.remove(entry.path)  # 이전 pickle 포맷
+                    removed += 1
+                elif entry.is_dir() and '.tmp-' in entry.name and now - entry.stat().st_mtime > 3600:
+                    shutil.rmtree(entry.path, ignore_errors=True)  # 중단된 저장
+                    removed += 1
+            except OSError:
+                continue
+
+        for path, meta, _, _ in self._scan_entries():
+            if meta is None or meta.get('version') != CACHE_FORMAT_VERSION or not self._is_source_current(meta):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+
+        if removed:
+            logger.info(f"캐시 정리: 무효 항목 {removed}개 삭제")
+        return removed
+
+    def enforce_budget(self) -> int:
+        """전체 캐시 크기가 max_bytes 이하가 되도록 오래 접근하지 않은 항목부터 제거
+
+        Returns:
+            제거한 항목 수
+        """
+        if not self.max_bytes:
+            return 0
+        entries = self._scan_entries()
+        total = sum(size for _, _, size, _ in entries)
+        if total <= self.max_bytes:
+            return 0
+
+        removed = 0
+        for path, _, size, _ in sorted(entries, key=lambda e: e[3]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+
+        logger.info(f"캐시 용량 제한: {removed}개 항목 제거 (현재 {total / 1024 / 1024:.1f}MB)")
+        return removed
+
     def clear_old_cache(self):
-        """오래된 캐시 파일 정리"""
+        """무효 항목 정리 후 용량 제한 적용"""
         try:
-            current_time = datetime.now()
-            for filename in os.listdir(self.cache_dir):
-                if filename.endswith('.pkl'):
-                    file_path = os.path.join(self.cache_dir, filename)
-                    file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                    if current_time - file_time > self.cache_expiry:
-                        os.remove(file_path)
-                        logger.info(f"오래된 캐시 파일 삭제: {filename}")
+            self.collect_garbage()
+            self.enforce_budget()
         except Exception as e:
             logger.warning(f"캐시 정리 실패: {e}")
 
 class SessionCache:
-    """세션 레벨 캐싱을 위한 클래스"""
+    """세션 레벨 캐싱을 위한 클래스
+
+    메모리 예산(max_bytes, DataFrame.memory_usage(deep=True) 기준) 안에서 LRU로 유지한다.
+    캐시 키에 데이터 세대(generation)가 포함되어, 새 세션이 동기화되어 bump_generation()이
+    호출되면 이전 세대 항목은 즉시 무효화된다. 시간 기반 만료는 없다.
+    """
 
-    def __init__(self):
-        self.session_cache: Dict[str, tuple] = {}
-        self.cache_expiry = timedelta(minutes=30)
+    def __init__(self, max_bytes: int = DEFAULT_SESSION_CACHE_MAX_BYTES):
+        self.session_cache: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (data, nbytes)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.generation = 0
+        self._lock = threading.Lock()
 
     def generate_cache_key(self, process_mode: str, start_date: str, end_date: str, workers: list) -> str:
-        """캐시 키 생성"""
+        """캐시 키 생성 (현재 데이터 세대 포함)"""
         workers_str = ','.join(sorted(workers)) if workers else 'all'
-        return f"{process_mode}_{start_date}_{end_date}_{workers_str}"
+        return f"g{self.generation}_{process_mode}_{start_date}_{end_date}_{workers_str}"
+
+    def bump_generation(self):
+        """데이터 변경(새 세션 동기화) 시 세대 증가 - 이전 세대 항목 모두 폐기"""
+        with self._lock:
+            self.generation += 1
+            self.session_cache.clear()
+            self.total_bytes = 0
+        logger.info(f"세션 캐시 세대 증가: {self.generation}")
 
     def get_sessions(self, cache_key: str) -> Optional[pd.DataFrame]:
-        """캐시된 세션 데이터 로드"""
-        if cache_key in self.session_cache:
-            cached_data, timestamp = self.session_cache[cache_key]
-            if datetime.now() - timestamp < self.cache_expiry:
-                logger.info(f"세션 캐시에서 로드: {cache_key}")
-                return cached_data
-            else:
-                # 만료된 캐시 제거
-                del self.session_cache[cache_key]
-        return None
-
-    def set_sessions(self, cache_key: str, data: pd.DataFrame):
-        """세션 데이터를 캐시에 저장"""
-        self.session_cache[cache_key] = (data.copy(), datetime.now())
+        """캐시된 세션 데이터 로드 (호출측 수정이 캐시에 반영되지 않도록 복사본 반환)"""
+        with self._lock:
+            entry = self.session_cache.get(cache_key)
+            if entry is None:
+                return None
+            self.session_cache.move_to_end(cache_key)
+        logger.info(f"세션 캐시에서 로드: {cache_key}")
+        return entry[0].copy()
+
+    def set_sessions(self, cache_key: str, data: pd.DataFrame, copy: bool = True):
+        """세션 데이터를 캐시에 저장
+
+        Args:
+            copy: False이면 복사 없이 저장 (호출측이 이후 data를 수정하지 않는 경우)
+        """
+        if not cache_key.startswith(f"g{self.generation}_"):
+            return  # 조회 도중 세대가 바뀐 결과는 저장하지 않음
+        nbytes = int(data.memory_usage(deep=True).sum())
+        if self.max_bytes and nbytes > self.max_bytes:
+            logger.info(f"세션 캐시 저장 생략 (예산 초과 {nbytes / 1024 / 1024:.1f}MB): {cache_key}")
+            return
+
+        stored = data.copy() if copy else data
+        with self._lock:
+            previous = self.session_cache.pop(cache_key, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+            self.session_cache[cache_key] = (stored, nbytes)
+            self.total_bytes += nbytes
+            self._evict_locked()
         logger.info(f"세션 캐시에 저장: {cache_key}")
 
+    def _evict_locked(self):
+        """메모리 예산을 넘으면 가장 오래 사용하지 않은 항목부터 제거"""
+        while self.max_bytes and self.total_bytes > self.max_bytes and self.session_cache:
+            key, (_, nbytes) = self.session_cache.popitem(last=False)
+            self.total_bytes -= nbytes
+            logger.info(f"세션 캐시 제거 (LRU): {key}")
+
     def clear_expired_cache(self):
-        """만료된 캐시 정리"""
-        current_time = datetime.now()
-        expired_keys = []
-        for key, (data, timestamp) in self.session_cache.items():
-            if current_time - timestamp > self.cache_expiry:
-                expired_keys.append(key)
+        """메모리 예산 재적용 (세대 기반 무효화를 사용하므로 시간 만료 항목은 없음)"""
+        with self._lock:
+            self._evict_locked()
+
+class SectionCache:
+    """API 응답 섹션 캐싱을 위한 클래스
+
+    (공정, 섹션, 조회 조건) 튜플 키로 직렬화된 JSON 조각을 메모리 예산(max_bytes, 문자열 길이 기준) 안에서
+    LRU로 유지한다. 공정별 버전을 두어 해당 공정의 세션이 바뀌면 invalidate()로 그 공정 항목만 폐기하고,
+    조회 도중 버전이 바뀐 결과는 저장하지 않는다. 키의 첫 요소는 항상 공정이어야 한다.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_SECTION_CACHE_MAX_BYTES):
+        self.entries: "OrderedDict[tuple, str]" = OrderedDict()
+        self.versions: Dict[str, int] = {}
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+
+    def version(self, process_mode: str) -> int:
+        """공정의 현재 데이터 버전 (조회 시작 전에 읽어 set()에 전달)"""
+        with self._lock:
+            return self.versions.get(process_mode, 0)
+
+    def get(self, key: tuple) -> Optional[str]:
+        """캐시된 섹션 JSON 조각 로드"""
+        with self._lock:
+            payload = self.entries.get(key)
+            if payload is not None:
+                self.entries.move_to_end(key)
+            return payload
+
+    def set(self, key: tuple, payload: str, version: int):
+        """섹션 JSON 조각 저장 (version이 현재 공정 버전과 다르면 저장하지 않음)"""
+        nbytes = len(payload)
+        if self.max_bytes and nbytes > self.max_bytes:
+            logger.info(f"섹션 캐시 저장 생략 (예산 초과 {nbytes / 1024 / 1024:.1f}MB): {key[:2]}")
+            return
 
-        for key in expired_keys:
-            del self.session_cache[key]
-            logger.info(f"만료된 세션 캐시 삭제: {key}")
+        with self._lock:
+            if self.versions.get(key[0], 0) != version:
+                return  # 조회 도중 데이터가 바뀐 결과
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= len(previous)
+            self.entries[key] = payload
+            self.total_bytes += nbytes
+            while self.max_bytes and self.total_bytes > self.max_bytes and self.entries:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def invalidate(self, process_modes: List[str]):
+        """지정 공정의 버전을 올리고 해당 항목 폐기"""
+        targets = set(process_modes)
+        with self._lock:
+            for process_mode in targets:
+                self.versions[process_mode] = self.versions.get(process_mode, 0) + 1
+            for key in [key for key in self.entries if key[0] in targets]:
+                self.total_bytes -= len(self.entries.pop(key))
+        logger.info(f"섹션 캐시 무효화: {sorted(targets)}")
 
 class OptimizedDataManager:
     """최적화된 데이터 관리자"""
 
-    def __init__(self):
-        self.file_cache = DataCache()
+    def __init__(self, cache_dir='cache'):
+        self.file_cache = DataCache(cache_dir)
         self.session_cache = SessionCache()
+        self.catalog = LogFileCatalog(os.path.join(cache_dir, 'log_catalog.db'))
 
     def get_files_by_date_range(self, folder_path: str, start_date: str, end_date: str) -> list:
-        """날짜 범위에 해당하는 파일만 필터링"""
-        import glob
-        from datetime import datetime
+        """날짜 범위에 해당하는 파일만 필터링 (로그 카탈로그 색인 조회)"""
+        self.catalog.refresh(folder_path)
 
         # 날짜 범위 파싱
         try:
             start_dt = datetime.strptime(start_date, '%Y-%m-%d').date()
             end_dt = datetime.strptime(end_date, '%Y-%m-%d').date()
         except ValueError:
-            # 날짜 파싱 실패 시 모든 파일 반환
-            return glob.glob(os.path.join(folder_path, '*작업이벤트로그*.csv'))
-
-        all_files = []
-
-        # 메인 폴더 파일들
-        main_files = glob.glob(os.path.join(folder_path, '*작업이벤트로그*.csv'))
-
-        # 아카이브 폴더 파일들
-        archive_files = glob.glob(os.path.join(folder_path, '2025-*', '*작업이벤트로그*.csv'))
-
-        all_files = main_files + archive_files
-
-        # 날짜 범위에 해당하는 파일만 필터링
-        filtered_files = []
-
-        for file_path in all_files:
-            filename = os.path.basename(file_path)
-
-            # 파일명에서 날짜 추출 (예: _20250929.csv)
-            import re
-            date_match = re.search(r'_(\d{8})\.csv$', filename)
-            if date_match:
-                file_date_str = date_match.group(1)
-                try:
-                    file_date = datetime.strptime(file_date_str, '%Y%m%d').date()
-
-                    # 날짜 범위 확장 (하루 전후 포함)
-                    extended_start = start_dt - timedelta(days=1)
-                    extended_end = end_dt + timedelta(days=1)
-
-                    if extended_start <= file_date <= extended_end:
-                        filtered_files.append(file_path)
-                except ValueError:
-                    # 날짜 파싱 실패 시 포함
-                    filtered_files.append(file_path)
-            else:
-                # 날짜 형식이 없는 파일은 포함
-                filtered_files.append(file_path)
-
-        logger.info(f"날짜 필터링: {len(all_files)}개 → {len(filtered_files)}개 파일")
+            # 날짜 파싱 실패 시 메인 폴더의 모든 파일 반환
+            return self.catalog.get_files(folder_path, locations=(LOCATION_MAIN,))
+
+        # 날짜 범위 확장 (하루 전후 포함), 날짜 형식이 없는 파일은 포함
+        filtered_files = self.catalog.get_files(
+            folder_path,
+            start_date=start_dt - timedelta(days=1),
+            end_date=end_dt + timedelta(days=1),
+            locations=LIVE_LOCATIONS,
+            include_undated=True,
+        )
+
+        logger.info(f"날짜 필터링: {self.catalog.count(folder_path)}개 중 {len(filtered_files)}개 파일")
         return filtered_files
 
     def optimize_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -38,6 +38,9 @@ class PerformanceConfig:
     """성능 관련 설정"""
     # 캐싱
     CACHE_EXPIRY_MINUTES: int = 30
+    FILE_CACHE_MAX_MB: int = 1024  # 파일 캐시(cache/) 최대 용량, 초과 시 LRU 제거
+    SESSION_CACHE_MAX_MB: int = 512  # 세션 캐시 메모리 예산, 초과 시 LRU 제거
+    SECTION_CACHE_MAX_MB: int = 256  # /api/data 섹션 응답 캐시 메모리 예산, 초과 시 LRU 제거
 
     # 쿼리 제한
     MAX_RECORDS_PER_QUERY: int = 100000
@@ -47,6 +50,13 @@ class PerformanceConfig:
     # GZIP 압축
     GZIP_COMPRESSION_LEVEL: int = 6
 
+    # raw_events 월별 파티션 (이번 달 포함 메인 DB에 남길 개월 수, 이전 월은 보관 파일로 이동)
+    RAW_EVENT_HOT_MONTHS: int = 2
+
+    # 로그 파일 변경 동기화 (파일별 디바운스, 계속 수정 중인 파일도 최대 지연 시간 안에 처리)
+    SYNC_DEBOUNCE_SECONDS: float = 0.2
+    SYNC_MAX_LATENCY_SECONDS: float = 1.0
+
 
 @dataclass
 class SecurityConfig:
@@ -178,8 +188,14 @@ class AppConfig:
             },
             'performance': {
                 'CACHE_EXPIRY_MINUTES': self.performance.CACHE_EXPIRY_MINUTES,
+                'FILE_CACHE_MAX_MB': self.performance.FILE_CACHE_MAX_MB,
+                'SESSION_CACHE_MAX_MB': self.performance.SESSION_CACHE_MAX_MB,
+                'SECTION_CACHE_MAX_MB': self.performance.SECTION_CACHE_MAX_MB,
                 'MAX_RECORDS_PER_QUERY': self.performance.MAX_RECORDS_PER_QUERY,
                 'GZIP_COMPRESSION_LEVEL': self.performance.GZIP_COMPRESSION_LEVEL,
+                'RAW_EVENT_HOT_MONTHS': self.performance.RAW_EVENT_HOT_MONTHS,
+                'SYNC_DEBOUNCE_SECONDS': self.performance.SYNC_DEBOUNCE_SECONDS,
+                'SYNC_MAX_LATENCY_SECONDS': self.performance.SYNC_MAX_LATENCY_SECONDS,
             },
             'security': {
                 'SESSION_TIMEOUT_DAYS': self.security.SESSION_TIMEOUT_DAYS,
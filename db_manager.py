@@ -6,21 +6,303 @@ SQLite 데이터베이스 관리 및 쿼리 인터페이스
 
 import sqlite3
 import os
+import re
 import json
+import hashlib
+import threading
+import numpy as np
 import pandas as pd
 from datetime import datetime, date, timedelta
-from typing import Optional, Dict, List, Tuple
+from typing import Callable, Optional, Dict, List, Tuple
 import logging
 
+from details_decoder import parse_details_records, parse_timestamps
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# 연결 생성 시 적용할 PRAGMA (WAL: 동기화 쓰기 중에도 읽기가 막히지 않음)
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",      # 64MB 페이지 캐시
+    "PRAGMA mmap_size=268435456",    # 256MB 메모리 맵 I/O
+    "PRAGMA temp_store=MEMORY",
+)
+# raw_events 자연 키 (동일 파일의 같은 이벤트가 다시 동기화되어도 한 번만 저장)
+# details 전문 대신 정규화한 details의 64비트 해시를 키에 넣어 인덱스 크기/비교 비용을 줄이고,
+# 저장 형식(원문 JSON / 재직렬화 JSON)이 달라도 같은 이벤트로 판단한다
+RAW_EVENT_KEY_COLUMNS = ('timestamp', 'worker_name', 'event', 'source_file', 'details_hash')
+RAW_EVENT_UNIQUE_INDEX_SQL = (
+    f"CREATE UNIQUE INDEX IF NOT EXISTS idx_raw_events_event_key ON raw_events ({', '.join(RAW_EVENT_KEY_COLUMNS)})"
+)
+LEGACY_RAW_EVENT_KEY_INDEX = 'idx_raw_events_natural_key'  # details 전문을 포함하던 이전 자연 키 인덱스
+RAW_EVENT_BATCH_SIZE = 5000
+
+# raw_events 월별 파티션: 최근 월은 메인 DB(hot), 지난 월은 DB 옆 raw_events_archive/YYYY-MM.db로 이동
+RAW_EVENT_PARTITION_DIRNAME = 'raw_events_archive'
+RAW_EVENT_PARTITION_PATTERN = re.compile(r'^(\d{4}-\d{2})\.db$')
+DEFAULT_RAW_EVENT_HOT_MONTHS = 2  # 이번 달 포함 메인 DB에 남길 개월 수
+VACUUM_MIN_FREE_RATIO = 0.25  # 빈 페이지가 이 비율 이상일 때만 메인 DB VACUUM
+
+# details에서 자주 쓰는 키를 삽입 시 타입 컬럼으로 추출 (조회 시 JSON 파싱 불필요)
+# NUMERIC은 정수 값을 정수로 유지한다 (35 → 35, 35.5 → 35.5)
+RAW_EVENT_DETAIL_COLUMNS = {
+    'interval_sec': 'NUMERIC',
+    'item_code': 'TEXT',
+    'item_name': 'TEXT',
+    'scan_count': 'INTEGER',
+    'tray_capacity': 'INTEGER',
+    'error_count': 'INTEGER',
+    'work_time_sec': 'NUMERIC',
+    'start_time': 'TEXT',
+    'end_time': 'TEXT',
+}
+# 추출 컬럼 없이 삽입된 행(외부 동기화)은 삽입 직후 details JSON에서 채움
+RAW_EVENT_DETAIL_TRIGGER_SQL = f"""
+    CREATE TRIGGER IF NOT EXISTS raw_events_detail_columns_ai AFTER INSERT ON raw_events
+    WHEN {' AND '.join(f'new.{c} IS NULL' for c in RAW_EVENT_DETAIL_COLUMNS)} AND json_valid(new.details) BEGIN
+        UPDATE raw_events SET
+            {', '.join(f"{c} = json_extract(new.details, '$.{c}')" for c in RAW_EVENT_DETAIL_COLUMNS)}
+        WHERE id = new.id;
+    END;
+"""
+
+# 바코드 부분 일치 검색용 FTS5 trigram 인덱스 (raw_events를 원본으로 하는 external content 테이블)
+BARCODE_FTS_TABLE = 'raw_events_barcode_fts'
+BARCODE_FTS_SCHEMA_SQL = f"""
+    CREATE VIRTUAL TABLE {BARCODE_FTS_TABLE} USING fts5(
+        barcode, content='raw_events', content_rowid='id', tokenize='trigram'
+    );
+    CREATE TRIGGER IF NOT EXISTS raw_events_barcode_fts_ai AFTER INSERT ON raw_events
+    WHEN new.barcode IS NOT NULL BEGIN
+        INSERT INTO {BARCODE_FTS_TABLE}(rowid, barcode) VALUES (new.id, new.barcode);
+    END;
+    CREATE TRIGGER IF NOT EXISTS raw_events_barcode_fts_ad AFTER DELETE ON raw_events
+    WHEN old.barcode IS NOT NULL BEGIN
+        INSERT INTO {BARCODE_FTS_TABLE}({BARCODE_FTS_TABLE}, rowid, barcode) VALUES ('delete', old.id, old.barcode);
+    END;
+    CREATE TRIGGER IF NOT EXISTS raw_events_barcode_fts_au AFTER UPDATE OF barcode ON raw_events BEGIN
+        INSERT INTO {BARCODE_FTS_TABLE}({BARCODE_FTS_TABLE}, rowid, barcode)
+            SELECT 'delete', old.id, old.barcode WHERE old.barcode IS NOT NULL;
+        INSERT INTO {BARCODE_FTS_TABLE}(rowid, barcode)
+            SELECT new.id, new.barcode WHERE new.barcode IS NOT NULL;
+    END;
+    INSERT INTO {BARCODE_FTS_TABLE}(rowid, barcode) SELECT id, barcode FROM raw_events WHERE barcode IS NOT NULL;
+"""
+BARCODE_FTS_MIN_LENGTH = 3  # trigram 인덱스는 3글자 이상 검색어에만 사용 가능
+
+# 바코드 → 트레이 매핑 (TRAY_COMPLETE details의 scanned_product_barcodes를 행 단위로 펼침)
+# JSON이 아닌 details에서 json_* 함수가 오류를 내지 않도록 json_valid를 먼저 확인한다.
+TRAY_BARCODE_CONDITION = (
+    "{row}.event = 'TRAY_COMPLETE' AND CASE WHEN json_valid({row}.details) "
+    "THEN json_type({row}.details, '$.scanned_product_barcodes') = 'array' ELSE 0 END"
+)
+TRAY_BARCODE_SCHEMA_SQL = f"""
+    CREATE TABLE tray_barcodes (
+        barcode TEXT NOT NULL,
+        tray_event_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        worker TEXT,
+        process TEXT,
+        complete_time TEXT NOT NULL,
+        PRIMARY KEY (tray_event_id, position)
+    ) WITHOUT ROWID;
+    CREATE INDEX idx_tray_barcodes_barcode ON tray_barcodes(barcode, complete_time);
+    CREATE TRIGGER IF NOT EXISTS raw_events_tray_barcodes_ai AFTER INSERT ON raw_events
+    WHEN {TRAY_BARCODE_CONDITION.format(row='new')} BEGIN
+        INSERT OR IGNORE INTO tray_barcodes (barcode, tray_event_id, position, worker, process, complete_time)
+        SELECT value, new.id, key + 1, new.worker_name, new.process, new.timestamp
+        FROM json_each(new.details, '$.scanned_product_barcodes') WHERE type = 'text';
+    END;
+    CREATE TRIGGER IF NOT EXISTS raw_events_tray_barcodes_ad AFTER DELETE ON raw_events
+    WHEN old.event = 'TRAY_COMPLETE' BEGIN
+        DELETE FROM tray_barcodes WHERE tray_event_id = old.id;
+    END;
+    INSERT OR IGNORE INTO tray_barcodes (barcode, tray_event_id, position, worker, process, complete_time)
+    WITH trays AS MATERIALIZED (
+        SELECT id, worker_name, process, timestamp, details FROM raw_events r
+        WHERE {TRAY_BARCODE_CONDITION.format(row='r')}
+    )
+    SELECT j.value, trays.id, j.key + 1, trays.worker_name, trays.process, trays.timestamp
+    FROM trays, json_each(trays.details, '$.scanned_product_barcodes') AS j
+    WHERE j.type = 'text';
+"""
+
+# sessions 자연 키 (NULL도 같은 값으로 비교되도록 COALESCE 식 인덱스 사용)
+SESSION_KEY_COLUMNS = ('worker', 'process', 'start_time_dt', 'end_time_dt', 'item_code')
+SESSION_KEY_SQL = "worker, process, COALESCE(start_time_dt, ''), COALESCE(end_time_dt, ''), COALESCE(item_code, 'N/A')"
+SESSION_UNIQUE_INDEX_SQL = f"CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_natural_key ON sessions ({SESSION_KEY_SQL})"
+SESSION_COLUMNS = (
+    'worker', 'process', 'date', 'start_time_dt', 'end_time_dt',
+    'work_time', 'latency', 'pcs_completed', 'item_code', 'item_name',
+    'item_display', 'work_order_id', 'product_batch', 'phase',
+    'had_error', 'process_errors', 'first_pass_yield', 'shipping_date',
+    'tray_capacity', 'scan_count',
+)
+SESSION_BATCH_SIZE = 2000
+SESSION_FETCH_BATCH_SIZE = 10000
+
+# 일별 롤업: (날짜, 공정, 작업자, 빈 레코드 여부)별 병합 가능한 부분 집계 (개수/합/제곱합/최소/최대)
+ROLLUP_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS daily_rollups (
+        date TEXT NOT NULL,
+        process TEXT NOT NULL,
+        worker TEXT NOT NULL,
+        empty_record INTEGER NOT NULL,
+        session_count INTEGER NOT NULL,
+        pcs_sum INTEGER NOT NULL,
+        no_error_sessions INTEGER NOT NULL,
+        process_errors_sum INTEGER NOT NULL,
+        work_time_count INTEGER NOT NULL,
+        work_time_sum REAL NOT NULL,
+        work_time_sumsq REAL NOT NULL,
+        work_time_min REAL,
+        work_time_max REAL,
+        latency_count INTEGER NOT NULL,
+        latency_sum REAL NOT NULL,
+        latency_sumsq REAL NOT NULL,
+        latency_min REAL,
+        latency_max REAL,
+        fpy_count INTEGER NOT NULL,
+        fpy_sum REAL NOT NULL,
+        PRIMARY KEY (date, process, worker, empty_record)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_daily_rollups_process ON daily_rollups(process, date);
+
+    CREATE TABLE IF NOT EXISTS hourly_rollups (
+        date TEXT NOT NULL,
+        process TEXT NOT NULL,
+        worker TEXT NOT NULL,
+        empty_record INTEGER NOT NULL,
+        hour INTEGER NOT NULL,
+        session_count INTEGER NOT NULL,
+        pcs_sum INTEGER NOT NULL,
+        work_time_count INTEGER NOT NULL,
+        work_time_sum REAL NOT NULL,
+        PRIMARY KEY (date, process, worker, empty_record, hour)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_hourly_rollups_process ON hourly_rollups(process, date);
+
+    CREATE TABLE IF NOT EXISTS rollup_dirty_dates (
+        date TEXT NOT NULL,
+        process TEXT NOT NULL,
+        PRIMARY KEY (date, process)
+    ) WITHOUT ROWID;
+"""
+
+ROLLUP_REFRESH_SQL = (
+    "DELETE FROM daily_rollups WHERE date = ?1 AND process = ?2",
+    """
+    INSERT INTO daily_rollups
+    SELECT
+        date, COALESCE(process, ''), COALESCE(worker, ''),
+        COALESCE(work_time = 0 AND item_code = 'N/A', 0) AS empty_record,
+        COUNT(*),
+        COALESCE(SUM(pcs_completed), 0),
+        COALESCE(SUM(had_error = 0), 0),
+        COALESCE(SUM(process_errors), 0),
+        COUNT(work_time), COALESCE(SUM(work_time), 0), COALESCE(SUM(work_time * work_time), 0),
+        MIN(work_time), MAX(work_time),
+        COUNT(latency), COALESCE(SUM(latency), 0), COALESCE(SUM(latency * latency), 0),
+        MIN(latency), MAX(latency),
+        COUNT(first_pass_yield), COALESCE(SUM(first_pass_yield), 0)
+    FROM sessions
+    WHERE date = ?1 AND COALESCE(process, '') = ?2
+    GROUP BY date, COALESCE(process, ''), COALESCE(worker, ''), empty_record
+    """,
+    "DELETE FROM hourly_rollups WHERE date = ?1 AND process = ?2",
+    # 시각은 start_time_dt에 기록된 현지 시각의 시(hour) 그대로 사용 (시작 시각 없는 세션 제외)
+    """
+    INSERT INTO hourly_rollups
+    SELECT
+        date, COALESCE(process, ''), COALESCE(worker, ''),
+        COALESCE(work_time = 0 AND item_code = 'N/A', 0) AS empty_record,
+        CAST(substr(start_time_dt, 12, 2) AS INTEGER) AS hour,
+        COUNT(*),
+        COALESCE(SUM(pcs_completed), 0),
+        COUNT(work_time), COALESCE(SUM(work_time), 0)
+    FROM sessions
+    WHERE date = ?1 AND COALESCE(process, '') = ?2 AND length(start_time_dt) >= 13
+    GROUP BY date, COALESCE(process, ''), COALESCE(worker, ''), empty_record, hour
+    """,
+)
+
+# 세션별 바코드 목록 (세션 구간의 SCAN_OK 바코드를 JSON 배열로 미리 저장, 세션 id로 조회)
+SESSION_BARCODE_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS session_barcodes (
+        session_id INTEGER PRIMARY KEY,
+        barcodes TEXT NOT NULL
+    );
+    CREATE TRIGGER IF NOT EXISTS sessions_barcodes_ad AFTER DELETE ON sessions BEGIN
+        DELETE FROM session_barcodes WHERE session_id = old.id;
+    END;
+"""
+# barcode 컬럼이 비어 있는 외부 동기화 행은 details JSON의 barcode 키를 사용
+# {sources}: 세션 구간 SCAN_OK를 읽을 raw_events 목록 (보관된 월은 메인 DB + 해당 월 파티션)
+SESSION_BARCODE_SOURCE_SQL = """
+            SELECT r.timestamp, COALESCE(r.barcode, CASE WHEN json_valid(r.details) THEN json_extract(r.details, '$.barcode') END) AS b
+            FROM {table} r
+            WHERE r.worker_name = s.worker AND r.timestamp >= s.start_time_dt AND r.timestamp <= s.end_time_dt
+              AND r.process = s.process AND r.event = 'SCAN_OK'
+"""
+SESSION_BARCODE_FILL_SQL = """
+    INSERT OR REPLACE INTO session_barcodes (session_id, barcodes)
+    SELECT s.id, (
+        SELECT json_group_array(b) FROM ({sources} ORDER BY 1) WHERE b IS NOT NULL
+    )
+    FROM sessions s
+    WHERE s.id IN (
+        SELECT s2.id FROM sessions s2 LEFT JOIN session_barcodes sb ON sb.session_id = s2.id
+        WHERE sb.session_id IS NULL AND s2.start_time_dt >= ? AND s2.start_time_dt < ? LIMIT ?
+    )
+"""
+SESSION_BARCODE_BATCH_SIZE = 5000
+
+# get_sessions 컬럼 변환 형식 (그 외 컬럼은 문자열/object)
+SESSION_COLUMN_KINDS = {
+    'id': 'int', 'pcs_completed': 'int', 'had_error': 'int', 'process_errors': 'int',
+    'tray_capacity': 'int', 'scan_count': 'int',
+    'work_time': 'float', 'latency': 'float', 'first_pass_yield': 'float',
+    'date': 'date', 'start_time_dt': 'datetime', 'end_time_dt': 'datetime',
+}
+CONNECTION_TIMEOUT = 30  # 잠금 대기 시간 (초)
+MAX_IDLE_CONNECTIONS = 8
+
+
+class PooledConnection(sqlite3.Connection):
+    """풀에서 대여한 연결 - close() 시 실제로 닫지 않고 풀에 반환"""
+
+    def close(self):
+        pool = getattr(self, '_pool', None)
+        if pool is None or not pool._release(self):
+            super().close()
+
+    def close_physical(self):
+        super().close()
+
+
 class DatabaseManager:
     def __init__(self, db_path: str = '/root/WorkerAnalysisGUI-web/data/worker_analysis.db'):
         """데이터베이스 매니저 초기화"""
         self.db_path = db_path
+        self._pool_lock = threading.Lock()
+        self._idle: List[PooledConnection] = []
+        self._db_inode = None
+        # 쓰기 전용 연결 (open_writer_connection을 호출한 스레드에 고정, 풀과 별개)
+        self._writer: Optional[PooledConnection] = None
+        self._writer_thread: Optional[int] = None
+        self._writer_inode = None
+        self._writer_depth = 0
         self.ensure_database_exists()
+        self.ensure_raw_event_constraints()
+        self.ensure_raw_event_detail_columns()
+        self.barcode_fts_enabled = self.ensure_barcode_index()
+        self.tray_barcodes_enabled = self.ensure_tray_barcode_table()
+        self.ensure_session_constraints()
+        self.ensure_rollup_tables()
+        self.ensure_session_barcode_table()
         logger.info(f"데이터베이스 연결: {self.db_path}")
 
     def ensure_database_exists(self):
@@ -41,86 +323,695 @@ class DatabaseManager:
             conn.close()
             logger.info("데이터베이스 스키마 생성 완료")
 
-    def get_connection(self) -> sqlite3.Connection:
-        """데이터베이스 연결 반환"""
-        conn = sqlite3.connect(self.db_path)
+    # ========================================================================
+    # 연결 풀
+    # 스레드(그린렛)별 연결이 아니라 모든 스레드가 공유하는 유휴 연결 스택이다 (LIFO, 최대
+    # MAX_IDLE_CONNECTIONS개). eventlet 요청마다 연결을 붙잡아 두지 않고 최근 반환된 연결부터
+    # 재사용하므로 열린 연결 수가 동시 요청 수를 넘지 않는다. 쓰기 스레드는 별도의 전용 연결을 쓴다.
+    # ========================================================================
+
+    def _current_inode(self) -> Optional[int]:
+        try:
+            return os.stat(self.db_path).st_ino
+        except OSError:
+            return None
+
+    def _connect(self) -> PooledConnection:
+        conn = sqlite3.connect(self.db_path, timeout=CONNECTION_TIMEOUT, check_same_thread=False,
+                               factory=PooledConnection)
         conn.row_factory = sqlite3.Row  # 딕셔너리처럼 접근 가능
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn._pool = self
+        return conn
+
+    def _release(self, conn: PooledConnection) -> bool:
+        """연결을 풀에 반환 (미완료 트랜잭션은 롤백). 반환하지 못하면 False"""
+        if conn is self._writer:
+            # 쓰기 연결은 계속 열어 두고, 가장 바깥 대여가 끝날 때만 미완료 트랜잭션을 롤백
+            self._writer_depth -= 1
+            if self._writer_depth == 0 and conn.in_transaction:
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    pass
+            return True
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            return False
+        with self._pool_lock:
+            if len(self._idle) >= MAX_IDLE_CONNECTIONS or conn in self._idle:
+                return conn in self._idle
+            self._idle.append(conn)
+        return True
+
+    def get_connection(self) -> sqlite3.Connection:
+        """데이터베이스 연결 대여 (close() 시 풀로 반환)
+
+        유휴 연결을 재사용하여 페이지 캐시를 유지한다. DB 파일이 교체되었거나
+        연결이 끊긴 경우 풀을 비우고 새로 연결한다. 쓰기 연결을 연 스레드에는 확인 없이
+        항상 그 쓰기 연결을 반환한다.
+        """
+        if self._writer is not None and threading.get_ident() == self._writer_thread:
+            self._writer_depth += 1
+            return self._writer
+
+        inode = self._current_inode()
+        with self._pool_lock:
+            if inode != self._db_inode:
+                stale, self._idle = self._idle, []
+                self._db_inode = inode
+            else:
+                stale = []
+            conn = self._idle.pop() if self._idle else None
+
+        for old in stale:
+            self._close_quietly(old)
+
+        if conn is not None:
+            try:
+                conn.execute("SELECT 1")
+                return conn
+            except sqlite3.Error:
+                logger.warning("끊어진 DB 연결 감지, 재연결합니다.")
+                self._close_quietly(conn)
+
+        conn = self._connect()
+        if self._db_inode is None:
+            self._db_inode = self._current_inode()
         return conn
 
+    @staticmethod
+    def _close_quietly(conn: PooledConnection):
+        try:
+            conn.close_physical()
+        except sqlite3.Error:
+            pass
+
+    def open_writer_connection(self):
+        """호출한 스레드 전용 쓰기 연결을 열어 둠 (동기화 엔진 작업 스레드에서 호출)
+
+        이후 이 스레드의 모든 DB 작업은 같은 연결 하나로 처리된다. 이미 열려 있으면 DB 파일이
+        교체된 경우에만 다시 연다.
+        """
+        inode = self._current_inode()
+        if self._writer is not None and self._writer_thread == threading.get_ident() and inode == self._writer_inode:
+            return
+        self.close_writer_connection()
+        self._writer = self._connect()
+        self._writer_inode = self._current_inode()
+        self._writer_depth = 0
+        self._writer_thread = threading.get_ident()
+
+    def close_writer_connection(self):
+        """쓰기 전용 연결 닫기 (동기화 엔진 종료 시)"""
+        writer, self._writer, self._writer_thread = self._writer, None, None
+        if writer is not None:
+            self._close_quietly(writer)
+
+    def close_all(self):
+        """유휴 연결 모두 닫기 (서버 종료 시 호출, 대여 중인 연결은 반환될 때 다시 풀에 들어감)"""
+        with self._pool_lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close_quietly(conn)
+
     # ========================================================================
     # Raw Events 관련 메서드
     # ========================================================================
 
-    def insert_raw_events(self, events: List[Dict]) -> int:
-        """원본 이벤트 데이터 삽입 (바코드 자동 추출 포함)"""
-        if not events:
-            return 0
+    def ensure_raw_event_constraints(self):
+        """raw_events 중복 방지용 유니크 인덱스 생성 (기존 중복 행이 있으면 정리 후 생성)"""
+        conn = self.get_connection()
+        try:
+            self._ensure_raw_event_key(conn)
+        except sqlite3.OperationalError as e:
+            logger.debug(f"raw_events 인덱스 생성 생략: {e}")  # 테이블 미생성 등
+        finally:
+            conn.close()
+
+    def _ensure_raw_event_key(self, conn: sqlite3.Connection):
+        """details_hash 컬럼 추가/채움 후 자연 키 유니크 인덱스 생성 (메인 DB와 파티션 공용)
 
+        details_hash가 비어 있는 행(이전 버전 또는 외부 동기화로 삽입된 행)은 여기서 채운다.
+        details 전문을 포함하던 이전 인덱스는 삭제한다.
+        """
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(raw_events)")}
+        if not existing:
+            raise sqlite3.OperationalError("no such table: raw_events")
+        if 'details_hash' not in existing:
+            with conn:
+                conn.execute("ALTER TABLE raw_events ADD COLUMN details_hash INTEGER")
+        self._fill_details_hashes(conn)
+
+        with conn:
+            conn.execute(f"DROP INDEX IF EXISTS {LEGACY_RAW_EVENT_KEY_INDEX}")
+        try:
+            conn.execute(RAW_EVENT_UNIQUE_INDEX_SQL)
+        except sqlite3.IntegrityError:
+            logger.warning("raw_events 중복 행 정리 후 유니크 인덱스 생성")
+            with conn:
+                conn.execute(f"""
+                    DELETE FROM raw_events WHERE rowid NOT IN (
+                        SELECT MIN(rowid) FROM raw_events GROUP BY {', '.join(RAW_EVENT_KEY_COLUMNS)}
+                    )
+                """)
+            conn.execute(RAW_EVENT_UNIQUE_INDEX_SQL)
+        conn.commit()
+
+    def _fill_details_hashes(self, conn: sqlite3.Connection, batch_size: int = RAW_EVENT_BATCH_SIZE * 10):
+        """details_hash가 없는 행의 해시를 삽입 경로와 같은 정규화로 계산해 채움"""
+        last_id, filled = 0, 0
+        while True:
+            rows = conn.execute(
+                "SELECT id, details FROM raw_events WHERE details_hash IS NULL AND id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            ids = [row[0] for row in rows]
+            _, hashes, _, _ = self._serialize_details(pd.Series([row[1] for row in rows], dtype=object))
+            with conn:
+                conn.executemany("UPDATE raw_events SET details_hash = ? WHERE id = ?", zip(hashes, ids))
+            last_id, filled = ids[-1], filled + len(ids)
+        if filled:
+            logger.info(f"raw_events details_hash 채움: {filled}개 행")
+
+    def ensure_raw_event_detail_columns(self):
+        """details 추출 컬럼 추가 (새로 추가된 컬럼은 기존 행의 details JSON에서 채움)"""
         conn = self.get_connection()
-        cursor = conn.cursor()
+        try:
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(raw_events)")}
+            if not existing:
+                return  # 테이블 미생성
+            added = [c for c in RAW_EVENT_DETAIL_COLUMNS if c not in existing]
+            if added:
+                logger.info(f"raw_events details 추출 컬럼 추가: {', '.join(added)}")
+                with conn:
+                    for column in added:
+                        conn.execute(f"ALTER TABLE raw_events ADD COLUMN {column} {RAW_EVENT_DETAIL_COLUMNS[column]}")
+                    conn.execute(f"""
+                        UPDATE raw_events SET {', '.join(f"{c} = json_extract(details, '$.{c}')" for c in added)}
+                        WHERE json_valid(details)
+                    """)
+            conn.executescript(RAW_EVENT_DETAIL_TRIGGER_SQL)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"raw_events details 추출 컬럼 생성 실패: {e}")
+        finally:
+            conn.close()
 
-        inserted_count = 0
-        for event in events:
-            try:
-                # Pandas Timestamp를 문자열로 변환
-                timestamp = event['timestamp']
-                if hasattr(timestamp, 'isoformat'):
-                    timestamp = timestamp.isoformat()
-                elif pd.notna(timestamp):
-                    timestamp = str(timestamp)
-                else:
-                    continue  # Invalid timestamp, skip
-
-                # details 처리 및 바코드 추출
-                details_dict = event.get('details', {})
-                if isinstance(details_dict, dict):
-                    details_str = json.dumps(details_dict, ensure_ascii=False)
-                    barcode = details_dict.get('barcode', None)
-                else:
-                    details_str = details_dict
-                    barcode = None
-
-                cursor.execute("""
-                    INSERT INTO raw_events (timestamp, worker_name, event, details, process, source_file, barcode)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    timestamp,
-                    event['worker_name'],
-                    event['event'],
-                    details_str,
-                    event['process'],
-                    event['source_file'],
-                    barcode
-                ))
-                inserted_count += 1
-            except sqlite3.IntegrityError as e:
-                logger.debug(f"이벤트 삽입 중복 무시: {e}")
-                continue
-            except Exception as e:
-                logger.error(f"이벤트 삽입 오류: {e}")
+    def ensure_barcode_index(self) -> bool:
+        """바코드 부분 일치 검색용 FTS5 trigram 인덱스 생성 (최초 생성 시 기존 바코드 색인)
+
+        Returns:
+            인덱스 사용 가능 여부 (FTS5/trigram 미지원 SQLite면 False, 검색은 LIKE로 대체)
+        """
+        conn = self.get_connection()
+        try:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (BARCODE_FTS_TABLE,)
+            ).fetchone()
+            if not exists:
+                conn.execute("SELECT 1 FROM raw_events LIMIT 1")  # 테이블 미생성 시 생략
+                logger.info("바코드 검색 인덱스 생성 중...")
+                conn.executescript(f"BEGIN; {BARCODE_FTS_SCHEMA_SQL} COMMIT;")
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"바코드 검색 인덱스 사용 불가, LIKE 검색으로 대체: {e}")
+            if conn.in_transaction:
+                conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+    def ensure_tray_barcode_table(self) -> bool:
+        """바코드 → 트레이 매핑 테이블 생성 (최초 생성 시 기존 TRAY_COMPLETE 이벤트로 채움)
+
+        이후에는 raw_events 삽입/삭제 트리거로 유지되므로 외부 동기화로 들어온 트레이도 반영된다.
+
+        Returns:
+            매핑 테이블 사용 가능 여부 (JSON 함수 미지원 SQLite면 False)
+        """
+        conn = self.get_connection()
+        try:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tray_barcodes'"
+            ).fetchone()
+            if not exists:
+                conn.execute("SELECT 1 FROM raw_events LIMIT 1")  # 테이블 미생성 시 생략
+                logger.info("바코드-트레이 매핑 테이블 생성 중...")
+                conn.executescript(f"BEGIN; {TRAY_BARCODE_SCHEMA_SQL} COMMIT;")
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"바코드-트레이 매핑 테이블 사용 불가, details 검색으로 대체: {e}")
+            if conn.in_transaction:
+                conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+    def find_tray_for_barcode(self, barcode: str, worker: Optional[str] = None,
+                              after_ts: Optional[str] = None) -> Optional[Dict]:
+        """바코드가 담긴 트레이(TRAY_COMPLETE) 조회 - 조건에 맞는 가장 이른 트레이
+
+        Args:
+            barcode: 제품 바코드 (정확히 일치)
+            worker: 트레이 완료 작업자
+            after_ts: 이 시각 이후 완료된 트레이만 (ISO 문자열, 보통 스캔 시각)
+
+        Returns:
+            {'tray_event_id', 'barcode', 'position'(1부터), 'worker', 'process', 'complete_time',
+             'details'(TRAY_COMPLETE 원문), RAW_EVENT_DETAIL_COLUMNS 추출 컬럼} 또는 None
+        """
+        if not self.tray_barcodes_enabled:
+            return self._find_tray_by_details(barcode, worker, after_ts)
+
+        query = f"""
+            SELECT tb.tray_event_id, tb.barcode, tb.position, tb.worker, tb.process, tb.complete_time, r.details,
+                   {', '.join(f'r.{c}' for c in RAW_EVENT_DETAIL_COLUMNS)}
+            FROM tray_barcodes tb JOIN raw_events r ON r.id = tb.tray_event_id
+            WHERE tb.barcode = ?
+        """
+        params = [barcode]
+        if worker:
+            query += " AND tb.worker = ?"
+            params.append(worker)
+        if after_ts:
+            query += " AND tb.complete_time >= ?"
+            params.append(after_ts)
+        query += " ORDER BY tb.complete_time LIMIT 1"
+
+        rows = self._collect_raw_event_sources(
+            lambda conn: [dict(row) for row in conn.execute(query, params).fetchall()], lower=after_ts
+        )
+        return min(rows, key=lambda row: row['complete_time']) if rows else None
+
+    def _find_tray_by_details(self, barcode: str, worker: Optional[str], after_ts: Optional[str]) -> Optional[Dict]:
+        """매핑 테이블을 쓸 수 없을 때 TRAY_COMPLETE details 텍스트 검색으로 트레이 조회"""
+        query = f"""
+            SELECT id, timestamp, worker_name, process, details, {', '.join(RAW_EVENT_DETAIL_COLUMNS)}
+            FROM raw_events WHERE event = 'TRAY_COMPLETE' AND details LIKE ?
+        """
+        params = [f'%{barcode}%']
+        if worker:
+            query += " AND worker_name = ?"
+            params.append(worker)
+        if after_ts:
+            query += " AND timestamp >= ?"
+            params.append(after_ts)
+        query += " ORDER BY timestamp"
+
+        def first_tray(conn: sqlite3.Connection) -> List[Dict]:
+            for row in conn.execute(query, params):
+                try:
+                    scanned = json.loads(row['details']).get('scanned_product_barcodes', [])
+                except (json.JSONDecodeError, TypeError, AttributeError):
+                    continue
+                if isinstance(scanned, list) and barcode in scanned:
+                    return [{
+                        'tray_event_id': row['id'], 'barcode': barcode, 'position': scanned.index(barcode) + 1,
+                        'worker': row['worker_name'], 'process': row['process'],
+                        'complete_time': row['timestamp'], 'details': row['details'],
+                        **{column: row[column] for column in RAW_EVENT_DETAIL_COLUMNS},
+                    }]
+            return []
+
+        rows = self._collect_raw_event_sources(first_tray, lower=after_ts)
+        return min(rows, key=lambda row: row['complete_time']) if rows else None
+
+    def search_raw_events_by_barcode(self, barcode: str, event: Optional[str] = None,
+                                     start_ts: Optional[str] = None, exact: bool = False,
+                                     limit: int = 1000) -> List[Dict]:
+        """바코드로 raw_events 검색 (최신순)
+
+        Args:
+            barcode: 검색할 바코드 (exact=False면 부분 일치)
+            event: 이벤트 종류 필터 (예: 'SCAN_OK')
+            start_ts: 이 시각 이후 이벤트만 (ISO 문자열)
+            exact: 정확히 일치하는 바코드만 검색 (idx_raw_events_barcode 사용)
+            limit: 최대 결과 수
+
+        부분 일치는 trigram 인덱스에서 후보 id를 찾은 뒤 원본 행을 조회한다.
+        검색어가 3글자 미만이거나 인덱스를 쓸 수 없으면 LIKE로 검색한다.
+        """
+        if exact:
+            condition, params = "barcode = ?", [barcode]
+        elif self.barcode_fts_enabled and len(barcode) >= BARCODE_FTS_MIN_LENGTH:
+            phrase = '"' + barcode.replace('"', '""') + '"'
+            condition = f"id IN (SELECT rowid FROM {BARCODE_FTS_TABLE} WHERE {BARCODE_FTS_TABLE} MATCH ?)"
+            params = [phrase]
+        else:
+            escaped = barcode.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            condition, params = "barcode LIKE ? ESCAPE '\\'", [f'%{escaped}%']
+
+        query = f"""
+            SELECT id, timestamp, worker_name, event, details, process, barcode, {', '.join(RAW_EVENT_DETAIL_COLUMNS)}
+            FROM raw_events WHERE {condition}
+        """
+        if event:
+            query += " AND event = ?"
+            params.append(event)
+        if start_ts:
+            query += " AND timestamp >= ?"
+            params.append(start_ts)
+        query += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(limit)
+
+        rows = self._collect_raw_event_sources(
+            lambda conn: [dict(row) for row in conn.execute(query, params).fetchall()],
+            lower=start_ts, newest_limit=limit
+        )
+        rows.sort(key=lambda row: row['timestamp'], reverse=True)
+        return rows[:limit]
+
+    def get_scan_barcodes(self, worker: str, process: str, start_ts: str, end_ts: str) -> List[str]:
+        """작업자/공정의 [start_ts, end_ts] 구간 SCAN_OK 바코드 목록 (시간순)"""
+        query = """
+            SELECT timestamp, barcode FROM raw_events
+            WHERE timestamp >= ? AND timestamp <= ?
+            AND worker_name = ? AND process = ? AND event = 'SCAN_OK' AND barcode IS NOT NULL
+            ORDER BY timestamp ASC
+        """
+        params = (start_ts, end_ts, worker, process)
+        rows = self._collect_raw_event_sources(
+            lambda conn: conn.execute(query, params).fetchall(), lower=start_ts, upper=end_ts
+        )
+        rows.sort(key=lambda row: row[0])
+        return [row[1] for row in rows]
+
+    # ========================================================================
+    # raw_events 월별 파티션
+    # ========================================================================
+
+    @property
+    def partition_dir(self) -> str:
+        return os.path.join(os.path.dirname(self.db_path), RAW_EVENT_PARTITION_DIRNAME)
+
+    def list_raw_event_partitions(self) -> List[str]:
+        """보관 파티션 월 목록 ('YYYY-MM', 오래된 순)"""
+        if not os.path.isdir(self.partition_dir):
+            return []
+        months = [m.group(1) for m in map(RAW_EVENT_PARTITION_PATTERN.match, os.listdir(self.partition_dir)) if m]
+        return sorted(months)
+
+    @staticmethod
+    def _month_bounds(month: str) -> Tuple[str, str]:
+        """'YYYY-MM' → (해당 월 1일, 다음 월 1일) 'YYYY-MM-DD'"""
+        year, mon = map(int, month.split('-'))
+        next_year, next_mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+        return f"{year:04d}-{mon:02d}-01", f"{next_year:04d}-{next_mon:02d}-01"
+
+    def _partitions_for_range(self, lower: Optional[str] = None, upper: Optional[str] = None) -> List[str]:
+        """[lower, upper] 범위와 겹치는 파티션 월 목록 (최신 월부터)"""
+        months = []
+        for month in reversed(self.list_raw_event_partitions()):
+            month_start, month_end = self._month_bounds(month)
+            if (lower and month_end <= lower) or (upper and month_start > upper):
                 continue
+            months.append(month)
+        return months
+
+    def _open_partition(self, month: str) -> sqlite3.Connection:
+        """보관 파티션 읽기 전용 연결"""
+        path = os.path.join(self.partition_dir, f"{month}.db")
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=CONNECTION_TIMEOUT, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
 
-        conn.commit()
-        conn.close()
+    def _collect_raw_event_sources(self, run: Callable[[sqlite3.Connection], list],
+                                   lower: Optional[str] = None, upper: Optional[str] = None,
+                                   newest_limit: Optional[int] = None) -> list:
+        """메인 DB와 범위에 겹치는 파티션에서 같은 조회를 실행하여 결과를 합침 (쿼리 라우터)
+
+        Args:
+            run: 연결을 받아 결과 행 목록을 반환하는 함수 (raw_events 등 테이블명은 그대로 사용)
+            lower, upper: 조회 타임스탬프 범위 (ISO 문자열, 없으면 전체 파티션)
+            newest_limit: 최신순 상위 N개 조회일 때 N - 이미 N개 이상 모였고 N번째 행이
+                다음 파티션 월보다 새로우면 나머지(더 오래된) 파티션은 열지 않는다.
+                행은 'timestamp' 키를 가져야 한다.
+        """
+        conn = self.get_connection()
+        try:
+            results = list(run(conn))
+        finally:
+            conn.close()
 
-        logger.info(f"{inserted_count}개 이벤트 삽입 완료 (바코드 자동 추출)")
-        return inserted_count
+        for month in self._partitions_for_range(lower, upper):
+            if newest_limit and len(results) >= newest_limit:
+                nth_newest = sorted((row['timestamp'] for row in results), reverse=True)[newest_limit - 1]
+                if nth_newest >= self._month_bounds(month)[1]:
+                    break
+            try:
+                part = self._open_partition(month)
+                try:
+                    results.extend(run(part))
+                finally:
+                    part.close()
+            except sqlite3.Error as e:
+                logger.warning(f"raw_events 파티션 {month} 조회 실패: {e}")
+        return results
+
+    def _create_partition(self, month: str) -> str:
+        """파티션 파일 생성 (메인 DB와 같은 raw_events 스키마/인덱스, 바코드 색인/트레이 매핑 포함)"""
+        os.makedirs(self.partition_dir, exist_ok=True)
+        path = os.path.join(self.partition_dir, f"{month}.db")
 
-    def get_raw_events(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
-                      process: Optional[str] = None, worker: Optional[str] = None) -> pd.DataFrame:
-        """원본 이벤트 조회"""
         conn = self.get_connection()
+        try:
+            schema = [row[0] for row in conn.execute(
+                "SELECT sql FROM sqlite_master WHERE tbl_name = 'raw_events' AND type IN ('table', 'index') "
+                "AND sql IS NOT NULL ORDER BY type DESC"
+            )]
+        finally:
+            conn.close()
 
-        query = "SELECT * FROM raw_events WHERE 1=1"
-        params = []
+        part = sqlite3.connect(path)
+        try:
+            if part.execute("SELECT 1 FROM sqlite_master WHERE name = 'raw_events'").fetchone() is None:
+                script = ';\n'.join(schema) + ';'
+                if self.barcode_fts_enabled:
+                    script += BARCODE_FTS_SCHEMA_SQL
+                if self.tray_barcodes_enabled:
+                    script += TRAY_BARCODE_SCHEMA_SQL
+                part.executescript(f"BEGIN; {script} COMMIT;")
+            else:
+                self._ensure_raw_event_key(part)  # 이전 버전에서 만든 파티션의 자연 키 전환
+        finally:
+            part.close()
+        return path
+
+    def archive_raw_events(self, hot_months: int = DEFAULT_RAW_EVENT_HOT_MONTHS) -> List[str]:
+        """메인 DB에서 hot_months 이전 월의 raw_events를 월별 파티션으로 이동
+
+        옮기는 월의 세션 바코드 목록은 이동 전에 계산해 두므로 세션 조회는 메인 DB만으로 처리된다.
+        이미 보관된 월에 뒤늦게 들어온 이벤트도 다음 실행 때 같은 파티션으로 옮겨진다
+        (자연 키 유니크 인덱스로 중복은 무시). 메인 DB의 빈 공간 회수는 vacuum_if_fragmented()로 따로 한다.
+
+        Returns:
+            이동한 월 목록
+        """
+        today = date.today()
+        cutoff_month = today.year * 12 + today.month - 1 - (hot_months - 1)
+        cutoff = f"{cutoff_month // 12:04d}-{cutoff_month % 12 + 1:02d}-01"
+
+        conn = self.get_connection()
+        try:
+            months = [row[0] for row in conn.execute(
+                "SELECT DISTINCT substr(timestamp, 1, 7) FROM raw_events WHERE timestamp < ?", (cutoff,)
+            )]
+        finally:
+            conn.close()
+        if not months:
+            return []
+
+        for month in months:
+            self._archive_month(month)
+        return months
+
+    def _archive_month(self, month: str):
+        """한 달치 raw_events를 파티션으로 이동 (세션 바코드 계산 → 복사 → 삭제, 새 파티션이면 VACUUM)"""
+        is_new = not os.path.exists(os.path.join(self.partition_dir, f"{month}.db"))
+        path = self._create_partition(month)
+        month_start, month_end = self._month_bounds(month)
+
+        conn = self.get_connection()
+        try:
+            # 이 달에 시작한 세션 중 바코드 목록이 없는 세션만 메인 DB+파티션에서 계산
+            self._fill_session_barcodes(conn, month_start, month_end, month, SESSION_BARCODE_BATCH_SIZE)
+            columns = ', '.join(row[1] for row in conn.execute("PRAGMA table_info(raw_events)"))
+            conn.execute("ATTACH DATABASE ? AS partition", (path,))
+            try:
+                # WAL 모드에서는 두 파일에 걸친 커밋이 원자적이지 않으나, 복사가 INSERT OR IGNORE라 재실행해도 안전
+                with conn:
+                    moved = conn.execute(f"""
+                        INSERT OR IGNORE INTO partition.raw_events ({columns})
+                        SELECT {columns} FROM main.raw_events WHERE timestamp >= ? AND timestamp < ?
+                    """, (month_start, month_end)).rowcount
+                    conn.execute("DELETE FROM main.raw_events WHERE timestamp >= ? AND timestamp < ?",
+                                 (month_start, month_end))
+            finally:
+                conn.execute("DETACH DATABASE partition")
+        finally:
+            conn.close()
+
+        if is_new:
+            # 처음 대량 복사한 파티션만 압축 (뒤늦은 이벤트 추가는 빈 페이지를 만들지 않음)
+            part = sqlite3.connect(path)
+            try:
+                part.execute("VACUUM")
+            finally:
+                part.close()
+        logger.info(f"raw_events {month} 파티션 보관: {moved}개 이벤트 이동")
+
+    @staticmethod
+    def _format_timestamps(values: pd.Series) -> pd.Series:
+        """타임스탬프를 isoformat()과 같은 문자열로 일괄 변환 (변환 불가 값은 None)"""
+        parsed = values if pd.api.types.is_datetime64_any_dtype(values) else parse_timestamps(values)
+        text = parsed.dt.strftime('%Y-%m-%dT%H:%M:%S')
+        micro = parsed.dt.microsecond
+        text = text.where(micro.fillna(0) == 0, text + '.' + micro.fillna(0).astype(int).astype(str).str.zfill(6))
+        return text.where(parsed.notna(), None)
+
+    @staticmethod
+    def _details_hash(canonical: str) -> int:
+        """정규화된 details 문자열의 64비트 해시 (SQLite INTEGER 범위의 부호 있는 정수)"""
+        return int.from_bytes(hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+    @staticmethod
+    def _serialize_details(details: pd.Series) -> Tuple[list, list, list, list]:
+        """details 값을 저장용 문자열, 자연 키 해시, 바코드, 추출 컬럼 값으로 변환 (JSON은 일괄 파싱 후 한 번만 직렬화)
+
+        dict와 JSON 문자열은 ensure_ascii=False JSON으로 정규화하고 barcode 키와
+        RAW_EVENT_DETAIL_COLUMNS 키를 추출한다 (dict/list 값은 추출하지 않음).
+        파싱할 수 없는 JSON이나 QR 형식 등 그 외 문자열은 원문 그대로 저장한다.
+        해시는 JSON이면 키 정렬/공백 제거한 직렬화, 그 외에는 원문(없으면 빈 문자열) 기준이라
+        같은 이벤트는 원문 그대로 저장된 행과 정규화되어 저장된 행이 같은 해시를 가진다.
+        """
+        values = details.tolist()
+        details_out = [None] * len(values)
+        hashes = [None] * len(values)
+        barcodes = [None] * len(values)
+        empty_fields = (None,) * len(RAW_EVENT_DETAIL_COLUMNS)
+        fields = [empty_fields] * len(values)
+
+        json_positions = [pos for pos, v in enumerate(values) if isinstance(v, str) and v.lstrip().startswith('{')]
+        parsed_json = parse_details_records(details.iloc[json_positions]) if json_positions else []
+        parsed_by_pos = dict(zip(json_positions, parsed_json))
+
+        for pos, value in enumerate(values):
+            if isinstance(value, dict):
+                parsed = value
+            elif pos in parsed_by_pos and (parsed_by_pos[pos] or value.strip() == '{}'):
+                parsed = parsed_by_pos[pos]
+            else:
+                if isinstance(value, str) or pd.notna(value):
+                    details_out[pos] = str(value)
+                hashes[pos] = DatabaseManager._details_hash(details_out[pos] or '')
+                continue
+            details_out[pos] = json.dumps(parsed, ensure_ascii=False)
+            hashes[pos] = DatabaseManager._details_hash(
+                json.dumps(parsed, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str))
+            barcodes[pos] = parsed.get('barcode')
+            fields[pos] = tuple(
+                None if isinstance(v, (dict, list)) else v
+                for v in (parsed.get(column) for column in RAW_EVENT_DETAIL_COLUMNS)
+            )
+        return details_out, hashes, barcodes, fields
+
+    def insert_raw_event_frame(self, events_df: pd.DataFrame, batch_size: int = RAW_EVENT_BATCH_SIZE) -> Dict[str, int]:
+        """원본 이벤트 DataFrame 일괄 삽입 (바코드/details 주요 키 자동 추출, 중복은 유니크 인덱스로 무시)
+
+        Args:
+            events_df: timestamp, worker_name(또는 worker), event, details, process, source_file 컬럼
+
+        Returns:
+            {'inserted': 삽입 수, 'skipped': 중복으로 무시된 수, 'invalid': 타임스탬프 오류로 제외된 수}
+        """
+        result = {'inserted': 0, 'skipped': 0, 'invalid': 0}
+        if events_df.empty:
+            return result
+
+        worker_column = 'worker_name' if 'worker_name' in events_df.columns else 'worker'
+        timestamps = self._format_timestamps(events_df['timestamp'])
+        valid = timestamps.notna().to_numpy()
+        result['invalid'] = int((~valid).sum())
+
+        frame = events_df.loc[valid]
+        details_str, details_hashes, barcodes, detail_fields = self._serialize_details(frame['details'])
+        rows = [base + fields for base, fields in zip(zip(
+            timestamps[valid].tolist(),
+            frame[worker_column].tolist(),
+            frame['event'].tolist(),
+            details_str,
+            details_hashes,
+            frame['process'].tolist(),
+            frame['source_file'].tolist(),
+            barcodes,
+        ), detail_fields)]
+
+        columns = ['timestamp', 'worker_name', 'event', 'details', 'details_hash', 'process', 'source_file', 'barcode',
+                   *RAW_EVENT_DETAIL_COLUMNS]
+        sql = f"INSERT OR IGNORE INTO raw_events ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+        conn = self.get_connection()
+        try:
+            for begin in range(0, len(rows), batch_size):
+                batch = rows[begin:begin + batch_size]
+                with conn:  # 배치 단위 트랜잭션
+                    cursor = conn.executemany(sql, batch)
+                inserted = cursor.rowcount  # 트리거(바코드 색인)로 인한 변경은 제외된 삽입 수
+                result['inserted'] += inserted
+                result['skipped'] += len(batch) - inserted
+        finally:
+            conn.close()
+
+        logger.info(f"{result['inserted']}개 이벤트 삽입 완료, {result['skipped']}개 중복 스킵 (바코드 자동 추출)")
+        return result
+
+    def insert_raw_events(self, events: List[Dict]) -> int:
+        """원본 이벤트 데이터 삽입 (바코드 자동 추출 포함) - 삽입된 수 반환"""
+        if not events:
+            return 0
+        return self.insert_raw_event_frame(pd.DataFrame(events))['inserted']
 
+    @staticmethod
+    def _raw_events_bounds(start_date: Optional[str] = None, end_date: Optional[str] = None,
+                           start_ts: Optional[str] = None, end_ts: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """날짜/타임스탬프 조건을 timestamp 반개구간 [lower, upper)로 변환"""
+        lower = start_ts
         if start_date:
-            query += " AND date(timestamp) >= ?"
-            params.append(start_date)
+            lower = max(lower, start_date) if lower else start_date
 
+        upper = end_ts
         if end_date:
-            query += " AND date(timestamp) <= ?"
-            params.append(end_date)
+            next_day = (datetime.strptime(end_date, '%Y-%m-%d').date() + timedelta(days=1)).isoformat()
+            upper = min(upper, next_day) if upper else next_day
+        return lower, upper
+
+    @staticmethod
+    def _build_raw_events_query(start_date: Optional[str] = None, end_date: Optional[str] = None,
+                                process: Optional[str] = None, worker: Optional[str] = None,
+                                start_ts: Optional[str] = None, end_ts: Optional[str] = None) -> Tuple[str, list]:
+        """raw_events 조회 쿼리 생성
+
+        날짜 조건은 timestamp 컬럼을 함수로 감싸지 않는 반개구간 [start, end) 비교로 변환하여
+        idx_raw_events_timestamp 인덱스 범위 탐색이 가능하게 한다.
+        ISO 문자열('YYYY-MM-DDTHH:MM:SS' / 'YYYY-MM-DD HH:MM:SS')은 사전순 비교가 시간순과 같다.
+        """
+        lower, upper = DatabaseManager._raw_events_bounds(start_date, end_date, start_ts, end_ts)
+
+        query = "SELECT * FROM raw_events WHERE 1=1"
+        params = []
+
+        if lower:
+            query += " AND timestamp >= ?"
+            params.append(lower)
+
+        if upper:
+            query += " AND timestamp < ?"
+            params.append(upper)
 
         if process:
             query += " AND process = ?"
@@ -131,112 +1022,246 @@ class DatabaseManager:
             params.append(worker)
 
         query += " ORDER BY timestamp"
+        return query, params
 
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
+    def get_raw_events(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                      process: Optional[str] = None, worker: Optional[str] = None,
+                      start_ts: Optional[str] = None, end_ts: Optional[str] = None) -> pd.DataFrame:
+        """원본 이벤트 조회 (범위에 겹치는 월별 파티션 포함)
 
-        return df
+        Args:
+            start_date, end_date: 날짜 범위 'YYYY-MM-DD' (양 끝 포함)
+            start_ts, end_ts: 타임스탬프 반개구간 [start_ts, end_ts) ISO 문자열
+        """
+        query, params = self._build_raw_events_query(start_date, end_date, process, worker, start_ts, end_ts)
+        lower, upper = self._raw_events_bounds(start_date, end_date, start_ts, end_ts)
+
+        frames = self._collect_raw_event_sources(
+            lambda conn: [pd.read_sql_query(query, conn, params=params)], lower=lower, upper=upper
+        )
+        if len(frames) == 1:
+            return frames[0]
+        frames = [frame for frame in frames if not frame.empty] or frames[:1]
+        df = pd.concat(frames, ignore_index=True)
+        return df.sort_values('timestamp', kind='stable', ignore_index=True)
+
+    def explain_raw_events_query(self, **filters) -> List[str]:
+        """get_raw_events와 같은 조건의 쿼리 실행 계획 (인덱스 사용 여부 확인용)"""
+        query, params = self._build_raw_events_query(**filters)
+        conn = self.get_connection()
+        try:
+            return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+        finally:
+            conn.close()
+
+    def check_raw_events_index_usage(self) -> bool:
+        """날짜 범위 raw_events 조회가 전체 스캔 없이 인덱스로 처리되는지 확인"""
+        today = date.today().isoformat()
+        plan = self.explain_raw_events_query(start_date=today, end_date=today)
+        uses_index = any('USING INDEX' in step or 'USING COVERING INDEX' in step for step in plan)
+        full_scan = any(step.startswith('SCAN raw_events') and 'INDEX' not in step for step in plan)
+        if not uses_index or full_scan:
+            logger.warning(f"raw_events 날짜 조회가 인덱스를 사용하지 않음: {plan}")
+            return False
+        return True
 
     # ========================================================================
     # Sessions 관련 메서드
     # ========================================================================
 
-    def insert_sessions(self, sessions: List[Dict]) -> int:
-        """세션 데이터 삽입 (중복 방지)"""
+    def ensure_session_constraints(self):
+        """sessions 자연 키 유니크 인덱스 생성 (기존 중복 행이 있으면 정리 후 생성)"""
+        conn = self.get_connection()
+        try:
+            try:
+                conn.execute(SESSION_UNIQUE_INDEX_SQL)
+            except sqlite3.IntegrityError:
+                logger.warning("sessions 중복 행 정리 후 유니크 인덱스 생성")
+                with conn:
+                    conn.execute(f"""
+                        DELETE FROM sessions WHERE id NOT IN (
+                            SELECT MIN(id) FROM sessions GROUP BY {SESSION_KEY_SQL}
+                        )
+                    """)
+                conn.execute(SESSION_UNIQUE_INDEX_SQL)
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            logger.debug(f"sessions 인덱스 생성 생략: {e}")  # 테이블 미생성 등
+        finally:
+            conn.close()
+
+    def upsert_sessions(self, sessions: List[Dict], batch_size: int = SESSION_BATCH_SIZE) -> Dict[str, int]:
+        """세션 데이터 일괄 저장 (자연 키 기준 중복은 값이 바뀐 경우만 갱신)
+
+        자연 키: worker, process, start_time_dt, end_time_dt, item_code
+
+        Returns:
+            {'inserted': 신규 삽입 수, 'updated': 값이 바뀌어 갱신된 수, 'skipped': 동일하여 무시된 수}
+        """
+        result = {'inserted': 0, 'updated': 0, 'skipped': 0}
         if not sessions:
-            return 0
+            return result
+
+        defaults = {'had_error': 0, 'process_errors': 0}
+        rows = [tuple(session.get(column, defaults.get(column)) for column in SESSION_COLUMNS) for session in sessions]
+        value_columns = [c for c in SESSION_COLUMNS if c not in SESSION_KEY_COLUMNS]
+
+        sql = f"""
+            INSERT INTO sessions ({', '.join(SESSION_COLUMNS)})
+            VALUES ({', '.join('?' * len(SESSION_COLUMNS))})
+            ON CONFLICT({SESSION_KEY_SQL}) DO UPDATE SET
+                {', '.join(f'{c} = excluded.{c}' for c in value_columns)}
+            WHERE {' OR '.join(f'{c} IS NOT excluded.{c}' for c in value_columns)}
+        """
 
         conn = self.get_connection()
-        cursor = conn.cursor()
+        try:
+            for begin in range(0, len(rows), batch_size):
+                batch = rows[begin:begin + batch_size]
+                last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM sessions").fetchone()[0]
+                with conn:  # 배치 단위 트랜잭션 (롤업 재계산 표시 포함)
+                    changed = conn.executemany(sql, batch).rowcount
+                    if changed:
+                        self._mark_rollups_dirty(conn, sessions[begin:begin + batch_size])
+                inserted = conn.execute("SELECT COUNT(*) FROM sessions WHERE id > ?", (last_id,)).fetchone()[0]
+                result['inserted'] += inserted
+                result['updated'] += changed - inserted
+                result['skipped'] += len(batch) - changed
+        finally:
+            conn.close()
 
-        inserted_count = 0
-        skipped_count = 0
+        logger.info(f"{result['inserted']}개 세션 삽입, {result['updated']}개 갱신, {result['skipped']}개 중복 스킵")
+        return result
 
-        for session in sessions:
-            try:
-                # 중복 체크: worker, date, process, start_time_dt, end_time_dt, work_time, pcs_completed가 모두 동일한 세션
-                # NULL 값도 올바르게 처리 (COALESCE로 NULL을 기본값으로 치환)
-                worker = session.get('worker')
-                date = session.get('date')
-                process = session.get('process')
-                start_time = session.get('start_time_dt') or ''  # NULL -> 빈 문자열
-                end_time = session.get('end_time_dt') or ''
-                work_time = session.get('work_time') or 0
-                pcs = session.get('pcs_completed') or 0
-                item_code = session.get('item_code') or 'N/A'
-
-                cursor.execute("""
-                    SELECT COUNT(*) FROM sessions
-                    WHERE worker = ?
-                    AND date = ?
-                    AND process = ?
-                    AND COALESCE(start_time_dt, '') = ?
-                    AND COALESCE(end_time_dt, '') = ?
-                    AND COALESCE(work_time, 0) = ?
-                    AND COALESCE(pcs_completed, 0) = ?
-                    AND COALESCE(item_code, 'N/A') = ?
-                """, (
-                    worker, date, process,
-                    start_time, end_time,
-                    work_time, pcs, item_code
-                ))
-
-                if cursor.fetchone()[0] > 0:
-                    # 이미 존재하는 세션, 스킵
-                    skipped_count += 1
-                    continue
+    def insert_sessions(self, sessions: List[Dict]) -> int:
+        """세션 데이터 삽입 (중복 방지) - 삽입된 수 반환"""
+        return self.upsert_sessions(sessions)['inserted']
 
-                # 중복이 아니면 삽입
-                cursor.execute("""
-                    INSERT INTO sessions (
-                        worker, process, date, start_time_dt, end_time_dt,
-                        work_time, latency, pcs_completed, item_code, item_name,
-                        item_display, work_order_id, product_batch, phase,
-                        had_error, process_errors, first_pass_yield, shipping_date,
-                        tray_capacity, scan_count
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    session.get('worker'),
-                    session.get('process'),
-                    session.get('date'),
-                    session.get('start_time_dt'),
-                    session.get('end_time_dt'),
-                    session.get('work_time'),
-                    session.get('latency'),
-                    session.get('pcs_completed'),
-                    session.get('item_code'),
-                    session.get('item_name'),
-                    session.get('item_display'),
-                    session.get('work_order_id'),
-                    session.get('product_batch'),
-                    session.get('phase'),
-                    session.get('had_error', 0),
-                    session.get('process_errors', 0),
-                    session.get('first_pass_yield'),
-                    session.get('shipping_date'),
-                    session.get('tray_capacity'),
-                    session.get('scan_count')
-                ))
-                inserted_count += 1
-            except Exception as e:
-                logger.error(f"세션 삽입 오류: {e}")
-                continue
+    def ensure_session_barcode_table(self):
+        """세션별 바코드 목록 테이블 생성"""
+        conn = self.get_connection()
+        try:
+            conn.executescript(SESSION_BARCODE_SCHEMA_SQL)
+        except sqlite3.OperationalError as e:
+            logger.debug(f"세션 바코드 테이블 생성 생략: {e}")  # sessions 테이블 미생성 등
+        finally:
+            conn.close()
 
-        conn.commit()
-        conn.close()
+    def refresh_session_barcodes(self, batch_size: int = SESSION_BARCODE_BATCH_SIZE) -> int:
+        """바코드 목록이 아직 없는 세션의 목록을 raw_events SCAN_OK에서 계산하여 저장
 
-        if skipped_count > 0:
-            logger.info(f"{inserted_count}개 세션 삽입 완료, {skipped_count}개 중복 스킵")
-        else:
-            logger.info(f"{inserted_count}개 세션 삽입 완료")
-        return inserted_count
+        세션 id는 자연 키 upsert에서 유지되므로 한 번 계산한 목록은 id로 계속 조회할 수 있다.
+        가장 최근 보관 월 이전에 시작한 세션(뒤늦게 동기화된 과거 로그 등)은 월별로 메인 DB와
+        해당 월 파티션을 함께 읽어 계산한다 (보관된 이벤트가 빠진 빈 목록을 저장하지 않도록).
 
-    def get_sessions(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
-                    process: Optional[str] = None, workers: Optional[List[str]] = None) -> pd.DataFrame:
-        """세션 데이터 조회"""
+        Returns:
+            새로 계산한 세션 수
+        """
+        partitions = set(self.list_raw_event_partitions())
+        cutoff = self._month_bounds(max(partitions))[1] if partitions else ''
+
+        total = 0
         conn = self.get_connection()
+        try:
+            total += self._fill_session_barcodes(conn, cutoff, '9999', None, batch_size)
+            if cutoff:
+                pending_months = [row[0] for row in conn.execute("""
+                    SELECT DISTINCT substr(s.start_time_dt, 1, 7) FROM sessions s
+                    LEFT JOIN session_barcodes sb ON sb.session_id = s.id
+                    WHERE sb.session_id IS NULL AND s.start_time_dt < ?
+                """, (cutoff,))]
+                for month in pending_months:
+                    if not RAW_EVENT_PARTITION_PATTERN.match(f"{month}.db"):
+                        continue  # 시각 형식이 잘못된 세션
+                    month_start, month_end = self._month_bounds(month)
+                    total += self._fill_session_barcodes(conn, month_start, month_end,
+                                                         month if month in partitions else None, batch_size)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"세션 바코드 목록 갱신 실패: {e}")
+        finally:
+            conn.close()
+
+        if total:
+            logger.info(f"세션 바코드 목록 갱신: {total}개 세션")
+        return total
+
+    def _fill_session_barcodes(self, conn: sqlite3.Connection, lower: str, upper: str,
+                               partition_month: Optional[str], batch_size: int) -> int:
+        """[lower, upper)에 시작한 세션의 바코드 목록 계산 (partition_month가 있으면 해당 파티션도 함께 조회)"""
+        tables = ['main.raw_events']
+        if partition_month:
+            conn.execute("ATTACH DATABASE ? AS partition", (os.path.join(self.partition_dir, f"{partition_month}.db"),))
+            tables.append('partition.raw_events')
+        sources = ' UNION ALL '.join(SESSION_BARCODE_SOURCE_SQL.format(table=table) for table in tables)
+        sql = SESSION_BARCODE_FILL_SQL.format(sources=sources)
+
+        total = 0
+        try:
+            while True:
+                with conn:
+                    filled = conn.execute(sql, (lower, upper, batch_size)).rowcount
+                total += filled
+                if filled < batch_size:
+                    break
+        finally:
+            if partition_month:
+                conn.execute("DETACH DATABASE partition")
+        return total
+
+    def get_session_barcodes(self, session_ids: List[int]) -> Dict[int, List[str]]:
+        """세션 id별 바코드 목록 조회 (목록이 아직 계산되지 않은 세션은 결과에 없음)"""
+        if not session_ids:
+            return {}
+        placeholders = ','.join('?' * len(session_ids))
+        conn = self.get_connection()
+        try:
+            rows = conn.execute(
+                f"SELECT session_id, barcodes FROM session_barcodes WHERE session_id IN ({placeholders})",
+                list(session_ids)
+            ).fetchall()
+        finally:
+            conn.close()
+        return {row[0]: json.loads(row[1]) for row in rows}
+
+    def refresh_derived_tables(self):
+        """세션 변경 후 파생 테이블(일별/시간대별 롤업, 세션 바코드 목록) 갱신"""
+        self.refresh_dirty_rollups()
+        self.refresh_session_barcodes()
+
+    @staticmethod
+    def _column_to_array(values: list, kind: str):
+        """커서에서 읽은 컬럼 값 목록을 선언된 형식의 NumPy 배열로 변환"""
+        count = len(values)
+        try:
+            if kind == 'int' and None not in values:
+                return np.fromiter(values, dtype=np.int64, count=count)
+            if kind in ('int', 'float'):
+                return np.fromiter((np.nan if v is None else v for v in values), dtype=np.float64, count=count)
+        except (TypeError, ValueError):
+            # 숫자 컬럼에 문자열이 섞인 경우 (SQLite 타입 친화성)
+            return pd.to_numeric(np.array(values, dtype=object), errors='coerce')
+
+        array = np.array(values, dtype=object)
+        if kind == 'date':
+            return pd.to_datetime(array, format='%Y-%m-%d', errors='coerce')
+        if kind == 'datetime':
+            return pd.to_datetime(array, format='ISO8601', errors='coerce')
+        return array
+
+    def get_sessions(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                    process: Optional[str] = None, workers: Optional[List[str]] = None,
+                    columns: Optional[List[str]] = None, dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """세션 데이터 조회
 
-        query = "SELECT * FROM sessions WHERE 1=1"
+        Args:
+            columns: 조회할 컬럼 목록 (None이면 전체)
+            dtypes: 컬럼별 최종 dtype 지정 (예: {'worker': 'category'})
+
+        커서에서 배치 단위로 읽은 값을 컬럼별 NumPy 배열로 바로 변환한다.
+        date/start_time_dt/end_time_dt는 고정 형식(ISO)으로 datetime 변환된다.
+        """
+        select = ', '.join(columns) if columns else '*'
+        query = f"SELECT {select} FROM sessions WHERE 1=1"
         params = []
 
         if start_date:
@@ -258,16 +1283,29 @@ class DatabaseManager:
 
         query += " ORDER BY start_time_dt"
 
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.row_factory = None  # sqlite3.Row 생성 비용 없이 튜플로 읽음
+            cursor.execute(query, params)
+            names = [d[0] for d in cursor.description]
+            column_values: List[list] = [[] for _ in names]
+            while True:
+                batch = cursor.fetchmany(SESSION_FETCH_BATCH_SIZE)
+                if not batch:
+                    break
+                for target, values in zip(column_values, zip(*batch)):
+                    target.extend(values)
+        finally:
+            conn.close()
 
-        # 날짜 컬럼을 datetime으로 변환
-        if not df.empty:
-            df['date'] = pd.to_datetime(df['date'])
-            df['start_time_dt'] = pd.to_datetime(df['start_time_dt'])
-            if 'end_time_dt' in df.columns:
-                df['end_time_dt'] = pd.to_datetime(df['end_time_dt'])
+        df = pd.DataFrame({
+            name: self._column_to_array(values, SESSION_COLUMN_KINDS.get(name, 'text'))
+            for name, values in zip(names, column_values)
+        }, columns=names)
 
+        if dtypes:
+            df = df.astype({c: t for c, t in dtypes.items() if c in df.columns})
         return df
 
     def get_all_workers(self, process: Optional[str] = None) -> List[str]:
@@ -370,6 +1408,97 @@ class DatabaseManager:
 
         return unsynced
 
+    # ========================================================================
+    # 일별 롤업 (병합 가능한 부분 집계)
+    # ========================================================================
+
+    def ensure_rollup_tables(self):
+        """일별/시간대별 롤업과 변경 날짜 테이블 생성 (롤업이 비어 있으면 전체 날짜를 재계산 대상으로 표시)"""
+        conn = self.get_connection()
+        try:
+            conn.executescript(ROLLUP_SCHEMA_SQL)
+            if (conn.execute("SELECT 1 FROM daily_rollups LIMIT 1").fetchone() is None
+                    or conn.execute("SELECT 1 FROM hourly_rollups LIMIT 1").fetchone() is None):
+                conn.execute("""
+                    INSERT OR IGNORE INTO rollup_dirty_dates (date, process)
+                    SELECT DISTINCT date, COALESCE(process, '') FROM sessions WHERE date IS NOT NULL
+                """)
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            logger.debug(f"롤업 테이블 생성 생략: {e}")  # sessions 테이블 미생성 등
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _mark_rollups_dirty(conn: sqlite3.Connection, sessions: List[Dict]):
+        """세션이 바뀐 (날짜, 공정)을 롤업 재계산 대상으로 표시"""
+        touched = {(s.get('date'), s.get('process') or '') for s in sessions if s.get('date')}
+        conn.executemany("INSERT OR IGNORE INTO rollup_dirty_dates (date, process) VALUES (?, ?)", touched)
+
+    def refresh_dirty_rollups(self) -> int:
+        """변경 표시된 (날짜, 공정)의 롤업만 sessions에서 다시 계산
+
+        Returns:
+            재계산한 (날짜, 공정) 수
+        """
+        conn = self.get_connection()
+        try:
+            dirty = conn.execute("SELECT date, process FROM rollup_dirty_dates").fetchall()
+            for target_date, process in dirty:
+                with conn:
+                    for statement in ROLLUP_REFRESH_SQL:
+                        conn.execute(statement, (target_date, process))
+                    conn.execute("DELETE FROM rollup_dirty_dates WHERE date = ? AND process = ?", (target_date, process))
+        except sqlite3.OperationalError as e:
+            logger.warning(f"롤업 갱신 실패: {e}")
+            return 0
+        finally:
+            conn.close()
+
+        if dirty:
+            logger.info(f"일별 롤업 갱신: {len(dirty)}개 (날짜, 공정)")
+        return len(dirty)
+
+    def _read_rollups(self, table: str, start_date: Optional[str], end_date: Optional[str],
+                      process: Optional[str]) -> pd.DataFrame:
+        query = f"SELECT * FROM {table} WHERE 1=1"
+        params = []
+
+        if start_date:
+            query += " AND date >= ?"
+            params.append(start_date)
+
+        if end_date:
+            query += " AND date <= ?"
+            params.append(end_date)
+
+        if process and process != '전체 비교':
+            query += " AND process = ?"
+            params.append(process)
+
+        conn = self.get_connection()
+        df = pd.read_sql_query(query, conn, params=params)
+        conn.close()
+
+        if not df.empty:
+            df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
+            df['worker'] = df['worker'].replace('', None)
+        return df
+
+    def get_daily_rollups(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                          process: Optional[str] = None) -> pd.DataFrame:
+        """일별 롤업 조회 - (date, process, worker, empty_record)별 부분 집계
+
+        empty_record는 작업시간 0 + 품목 'N/A'인 빈 레코드 여부이며, 합계/제곱합/최소/최대는
+        여러 행을 합쳐도(merge_rollups) 원본 세션으로 계산한 값과 같다.
+        """
+        return self._read_rollups('daily_rollups', start_date, end_date, process)
+
+    def get_hourly_rollups(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                           process: Optional[str] = None) -> pd.DataFrame:
+        """시간대별 롤업 조회 - (date, process, worker, empty_record, hour)별 트레이 수/PCS/작업시간 합계"""
+        return self._read_rollups('hourly_rollups', start_date, end_date, process)
+
     # ========================================================================
     # Daily KPIs 관련 메서드
     # ========================================================================
@@ -480,3 +1609,23 @@ class DatabaseManager:
         conn.execute("VACUUM")
         conn.close()
         logger.info("데이터베이스 VACUUM 완료")
+
+    def vacuum_if_fragmented(self, min_free_ratio: float = VACUUM_MIN_FREE_RATIO) -> bool:
+        """빈 페이지 비율이 min_free_ratio 이상일 때만 VACUUM (월별 보관으로 삭제된 공간 회수)
+
+        VACUUM은 파일 전체를 다시 쓰므로 빈 공간이 조금 생긴 정도로는 실행하지 않는다
+        (빈 페이지는 이후 삽입에 재사용됨).
+
+        Returns:
+            VACUUM 실행 여부
+        """
+        conn = self.get_connection()
+        try:
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        finally:
+            conn.close()
+        if not page_count or free_pages / page_count < min_free_ratio:
+            return False
+        self.vacuum()
+        return True
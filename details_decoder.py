@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+details_decoder.py - TRAY_COMPLETE details 컬럼형 디코더
+details 페이로드(JSON / QR key=value|...)를 한 번만 파싱하여
+세션 필드를 타입이 지정된 NumPy 기반 컬럼으로 일괄 변환
+"""
+
+import json
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# 세션 생성에 사용되는 details 키 목록 (이 외의 키는 버림)
+SESSION_DETAIL_KEYS = [
+    'start_time', 'OBD', 'shipping_date', 'CLC', 'item_code',
+    'WID', 'PHS', 'SPC', 'FPB', 'IG', 'item_name',
+    'work_time', 'work_time_sec', 'idle_time', 'total_idle_seconds',
+    'process_errors', 'error_count', 'had_error', 'has_error_or_reset',
+    'is_partial', 'is_partial_submission', 'is_restored_session',
+    'is_test', 'is_test_tray',
+    'good_count', 'defective_count', 'scan_count',
+    'master_label_scanned_time', 'master_label_scanned_old_time',
+]
+
+_TRUE_STRINGS = ['true', 'y', 'yes']  # 숫자가 아닌 값 중 참으로 보는 문자열
+
+# QR 형식의 'key=value' 항목 ('|' 구분, 값에는 '='가 포함될 수 있음)
+_QR_PAIR_PATTERN = r'(?:^|\|)(?P<key>[^|=]*)=(?P<value>[^|]*)'
+
+
+def _parse_one(detail_data) -> dict:
+    """단일 details 값을 dict로 변환 (JSON / QR 형식 / dict 모두 처리)"""
+    if isinstance(detail_data, dict):
+        return detail_data
+    if not isinstance(detail_data, str):
+        return {}
+
+    # 1. JSON 파싱 시도
+    text = detail_data.strip()
+    if text.startswith('{'):
+        try:
+            parsed = json.loads(text)
+            if isinstance(parsed, dict):
+                return parsed
+        except (json.JSONDecodeError, TypeError):
+            pass
+
+    # 2. QR 형식 파싱 시도 ('PHS=1|CLC=...')
+    if '|' in detail_data and '=' in detail_data:
+        return dict(item.split('=', 1) for item in detail_data.split('|') if '=' in item)
+
+    return {}
+
+
+def _parse_json_batch(texts: List[str]) -> Optional[List[dict]]:
+    """JSON 문자열 목록을 하나의 배열로 묶어 json.loads 한 번으로 파싱
+
+    하나라도 깨진 페이로드가 있거나 개수가 맞지 않으면 None을 반환하고
+    호출측에서 행 단위 파싱으로 대체한다.
+    """
+    if not texts:
+        return []
+    try:
+        parsed = json.loads('[' + ','.join(texts) + ']')
+    except (json.JSONDecodeError, TypeError):
+        return None
+    if len(parsed) != len(texts) or not all(isinstance(d, dict) for d in parsed):
+        return None
+    return parsed
+
+
+def parse_qr_details(details: pd.Series, keys: Optional[List[str]] = None) -> pd.DataFrame:
+    """QR 형식('PHS=1|CLC=...|WID=...') details Series를 문자열 연산으로 일괄 분해
+
+    각 항목은 첫 번째 '='를 기준으로 키/값으로 나뉘며, 같은 키가 반복되면 마지막 값을 사용한다.
+    반환 프레임은 입력 Series와 같은 인덱스와 keys 순서의 컬럼을 가진다.
+    """
+    keys = keys or SESSION_DETAIL_KEYS
+    if details.empty:
+        return pd.DataFrame(index=details.index, columns=keys, dtype=object)
+
+    pairs = details.astype(str).str.extractall(_QR_PAIR_PATTERN)
+    pairs = pairs[pairs['key'].isin(keys)]
+    if pairs.empty:
+        return pd.DataFrame(index=details.index, columns=keys, dtype=object)
+
+    # (행, 키) 단위로 마지막 값만 남긴 뒤 넓은 형태로 변환
+    pairs = pairs.reset_index(level='match', drop=True).reset_index()
+    row_column = pairs.columns[0]
+    pairs = pairs.drop_duplicates(subset=[row_column, 'key'], keep='last')
+    wide = pairs.pivot(index=row_column, columns='key', values='value')
+
+    return wide.reindex(index=details.index, columns=keys).astype(object)
+
+
+def _is_qr_text(value) -> bool:
+    """JSON이 아닌 QR 형식('key=value|...') 문자열 여부"""
+    return isinstance(value, str) and not value.strip().startswith('{') and '|' in value and '=' in value
+
+
+def parse_details_records(details: pd.Series) -> List[dict]:
+    """details Series를 dict 목록으로 변환 (JSON은 일괄 파싱, 나머지는 개별 처리)"""
+    values = details.tolist()
+    records: List[Optional[dict]] = [None] * len(values)
+
+    json_positions, json_texts = [], []
+    for pos, value in enumerate(values):
+        if isinstance(value, str):
+            text = value.strip()
+            if text.startswith('{'):
+                json_positions.append(pos)
+                json_texts.append(text)
+                continue
+        records[pos] = _parse_one(value)
+
+    batch = _parse_json_batch(json_texts)
+    if batch is None:
+        batch = [_parse_one(text) for text in json_texts]
+    for pos, parsed in zip(json_positions, batch):
+        records[pos] = parsed
+
+    return records
+
+
+def parse_details_series(details: pd.Series, keys: Optional[List[str]] = None) -> pd.DataFrame:
+    """details Series 전체를 한 번에 파싱하여 키별 컬럼을 가진 DataFrame 반환
+
+    반환 프레임은 입력 Series와 같은 인덱스를 가지며, 값이 없는 키는 NaN으로 채워진다.
+    """
+    keys = keys or SESSION_DETAIL_KEYS
+    if details.empty:
+        return pd.DataFrame(index=details.index, columns=keys, dtype=object)
+
+    # QR 문자열은 문자열 연산으로 일괄 분해, 나머지(JSON/dict/기타)는 parse_details_records로 파싱
+    is_qr = [_is_qr_text(value) for value in details.tolist()]
+    qr_positions = [pos for pos, flag in enumerate(is_qr) if flag]
+    other_positions = [pos for pos, flag in enumerate(is_qr) if not flag]
+
+    records: List[dict] = [{}] * len(is_qr)
+    for pos, parsed in zip(other_positions, parse_details_records(details.iloc[other_positions])):
+        records[pos] = parsed
+
+    frame = pd.DataFrame.from_records(records, columns=keys, index=details.index)
+
+    if qr_positions:
+        qr_frame = parse_qr_details(details.iloc[qr_positions], keys)
+        frame = frame.astype(object)
+        frame.iloc[qr_positions] = qr_frame.to_numpy(dtype=object)
+
+    return frame
+
+
+def _coalesce(frame: pd.DataFrame, *columns: str) -> pd.Series:
+    """앞 컬럼의 값이 없으면 다음 컬럼 값으로 채움"""
+    result = frame[columns[0]]
+    for column in columns[1:]:
+        result = result.where(result.notna(), frame[column])
+    return result
+
+
+def _as_float(values: pd.Series) -> np.ndarray:
+    return pd.to_numeric(values, errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+
+
+def _as_int(values: pd.Series) -> np.ndarray:
+    return pd.to_numeric(values, errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+
+
+def _as_bool(values: pd.Series) -> np.ndarray:
+    """bool/숫자/문자열이 섞인 값을 bool 배열로 변환
+
+    숫자(숫자 문자열 포함)는 0이 아니면 참 (기존 int() 변환과 같은 기준),
+    그 외 문자열은 'true'/'yes' 등 _TRUE_STRINGS만 참으로 본다.
+    """
+    if values.dtype == bool:
+        return values.to_numpy()
+    numeric = pd.to_numeric(values, errors='coerce')
+    textual = values.astype(str).str.strip().str.lower().isin(_TRUE_STRINGS)
+    return np.where(numeric.notna(), numeric.fillna(0) != 0, textual).astype(bool)
+
+
+def _as_text(values: pd.Series, default: str) -> np.ndarray:
+    return values.where(values.notna(), default).astype(str).to_numpy(dtype=object)
+
+
+def parse_timestamps(values: pd.Series) -> pd.Series:
+    """ISO8601 형식으로 일괄 파싱하고, 실패한 값만 형식 추론으로 재시도"""
+    parsed = pd.to_datetime(values, errors='coerce', format='ISO8601')
+    retry = parsed.isna() & values.notna() & (values.astype(str).str.strip() != '')
+    if retry.any():
+        parsed.loc[retry] = pd.to_datetime(values[retry], errors='coerce', format='mixed')
+    return parsed
+
+
+def decode_tray_details(details: pd.Series, process: pd.Series) -> pd.DataFrame:
+    """TRAY_COMPLETE details를 한 번만 파싱하여 세션 필드 컬럼 DataFrame으로 변환
+
+    Args:
+        details: TRAY_COMPLETE 이벤트의 details 컬럼 (JSON 문자열, QR 문자열 또는 dict)
+        process: 같은 인덱스의 공정 컬럼 (PCS 계산용)
+
+    Returns:
+        입력과 같은 인덱스를 가진 DataFrame. start_time/마스터 라벨 스캔 시각은 datetime으로,
+        나머지 필드는 float64/int64/bool/object 컬럼으로 반환된다.
+    """
+    raw = parse_details_series(details)
+    process = process.reindex(raw.index)
+
+    good_count = _as_int(raw['good_count'])
+    defective_count = _as_int(raw['defective_count'])
+    scan_count = _as_int(raw['scan_count'])
+    pcs_completed = np.select(
+        [process.eq('포장실').to_numpy(), process.eq('검사실').to_numpy()],
+        [np.full(len(raw), 60, dtype=np.int64), good_count + defective_count],
+        default=scan_count,
+    )
+
+    decoded = pd.DataFrame({
+        'start_time': parse_timestamps(raw['start_time']),
+        'shipping_date': pd.to_datetime(_coalesce(raw, 'OBD', 'shipping_date'), errors='coerce'),
+        'item_code': _as_text(_coalesce(raw, 'CLC', 'item_code'), 'N/A'),
+        'work_order_id': _as_text(raw['WID'], 'N/A'),
+        'phase': _as_text(raw['PHS'], 'N/A'),
+        'supplier_code': _as_text(raw['SPC'], 'N/A'),
+        'product_batch': _as_text(raw['FPB'], 'N/A'),
+        'item_group': _as_text(raw['IG'], 'N/A'),
+        'item_name': _as_text(raw['item_name'], ''),
+        'work_time': _as_float(_coalesce(raw, 'work_time', 'work_time_sec')),
+        'work_time_sec': _as_float(_coalesce(raw, 'work_time_sec', 'work_time')),
+        'idle_time': _as_float(_coalesce(raw, 'idle_time', 'total_idle_seconds')),
+        'process_errors': _as_int(_coalesce(raw, 'process_errors', 'error_count')),
+        'had_error': _as_bool(_coalesce(raw, 'had_error', 'has_error_or_reset')).astype(np.int64),
+        'is_partial': _as_bool(_coalesce(raw, 'is_partial', 'is_partial_submission')),
+        'is_restored': _as_bool(raw['is_restored_session']),
+        'is_test': _as_bool(_coalesce(raw, 'is_test', 'is_test_tray')),
+        'pcs_completed': pcs_completed,
+        'defective_count': defective_count,
+        'master_label_scanned_time': parse_timestamps(raw['master_label_scanned_time']),
+        'master_label_scanned_old_time': parse_timestamps(raw['master_label_scanned_old_time']),
+    }, index=raw.index)
+
+    return decoded
@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+"""
+log_catalog.py - 작업 이벤트 로그 파일 카탈로그
+메인 폴더, 날짜별 아카이브, quarterly_backup, log 폴더의 로그 파일을
+공정/작업자/날짜/크기/수정시각과 함께 SQLite에 색인하여 glob 재검색 없이 조회
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Tuple
+
+import logging
+
+from log_tail_reader import process_from_filename, WORKER_FROM_FILENAME_PATTERN
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LOG_FILE_MARKER = '작업이벤트로그'
+FILE_DATE_PATTERN = re.compile(r'_(\d{8})\.csv$')
+ARCHIVE_DIR_PATTERN = re.compile(r'^20\d{2}-')  # 날짜별 아카이브 폴더 (2025-XX-XX 형태)
+
+# 위치 구분
+LOCATION_MAIN = 'main'
+LOCATION_ARCHIVE = 'archive'
+LOCATION_QUARTERLY = 'quarterly'
+LOCATION_LOG = 'log'
+LIVE_LOCATIONS = (LOCATION_MAIN, LOCATION_ARCHIVE)
+
+
+def is_log_file(file_name: str) -> bool:
+    return LOG_FILE_MARKER in file_name and file_name.endswith('.csv')
+
+
+def parse_log_file_name(file_name: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """파일명에서 (공정, 작업자, 날짜 'YYYY-MM-DD') 추출"""
+    process = process_from_filename(file_name)
+    worker_match = WORKER_FROM_FILENAME_PATTERN.search(file_name)
+    worker = worker_match.group(1) if worker_match else None
+
+    file_date = None
+    date_match = FILE_DATE_PATTERN.search(file_name)
+    if date_match:
+        try:
+            file_date = datetime.strptime(date_match.group(1), '%Y%m%d').date().isoformat()
+        except ValueError:
+            file_date = None
+    return process, worker, file_date
+
+
+class LogFileCatalog:
+    """로그 파일 영구 카탈로그
+
+    폴더별 수정시각을 함께 저장하여, refresh() 시 수정시각이 바뀐 폴더만 다시 나열한다.
+    메인 폴더는 오늘 파일이 계속 커지므로 refresh() 때마다 다시 나열한다.
+    파일 추가/크기·수정시각 변경/삭제를 반영할 때마다 changes가 증가한다.
+    """
+
+    def __init__(self, db_path: str = 'cache/log_catalog.db'):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.changes = 0  # 이 인스턴스가 반영한 파일 추가/변경/삭제 횟수 (데이터 세대 판별용)
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._ensure_schema()
+
+    def get_connection(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _ensure_schema(self):
+        conn = self.get_connection()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS log_files (
+                file_path TEXT PRIMARY KEY,
+                root TEXT NOT NULL,
+                location TEXT NOT NULL,
+                dir_path TEXT NOT NULL,
+                file_name TEXT NOT NULL,
+                process TEXT,
+                worker TEXT,
+                file_date TEXT,
+                size INTEGER,
+                mtime REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_log_files_lookup ON log_files(root, process, file_date);
+            CREATE INDEX IF NOT EXISTS idx_log_files_dir ON log_files(dir_path);
+
+            CREATE TABLE IF NOT EXISTS log_dirs (
+                dir_path TEXT PRIMARY KEY,
+                root TEXT NOT NULL,
+                location TEXT NOT NULL,
+                recursive INTEGER NOT NULL,
+                mtime REAL
+            );
+        """)
+        conn.commit()
+        conn.close()
+
+    # ------------------------------------------------------------------
+    # 스캔
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize_root(folder_path: str) -> str:
+        return os.path.abspath(folder_path)
+
+    @staticmethod
+    def quarterly_path(root: str) -> str:
+        return os.path.join(os.path.dirname(root), 'quarterly_backup')
+
+    def _scan_dir(self, conn: sqlite3.Connection, root: str, dir_path: str, location: str,
+                  recursive: bool, rescan_known_subdirs: bool = True):
+        """폴더 하나를 나열하여 로그 파일/하위 폴더를 카탈로그에 반영"""
+        try:
+            dir_mtime = os.stat(dir_path).st_mtime
+            entries = list(os.scandir(dir_path))
+        except OSError:
+            self._drop_dir(conn, dir_path)
+            return
+
+        present_files = set()
+        rows = []
+        for entry in entries:
+            try:
+                if entry.is_file() and is_log_file(entry.name):
+                    stat = entry.stat()
+                    process, worker, file_date = parse_log_file_name(entry.name)
+                    rows.append((entry.path, root, location, dir_path, entry.name, process, worker,
+                                 file_date, stat.st_size, stat.st_mtime))
+                    present_files.add(entry.path)
+                elif entry.is_dir():
+                    child_location = None
+                    child_recursive = recursive
+                    if location == LOCATION_MAIN:
+                        if ARCHIVE_DIR_PATTERN.match(entry.name):
+                            child_location, child_recursive = LOCATION_ARCHIVE, False
+                        elif entry.name == 'log':
+                            child_location, child_recursive = LOCATION_LOG, True
+                    elif recursive:
+                        child_location = location
+                    if child_location is None:
+                        continue
+                    known = conn.execute("SELECT 1 FROM log_dirs WHERE dir_path = ?", (entry.path,)).fetchone()
+                    if rescan_known_subdirs or not known:
+                        self._scan_dir(conn, root, entry.path, child_location, child_recursive)
+            except OSError:
+                continue
+
+        known_files = {row[0]: (row[1], row[2]) for row in conn.execute(
+            "SELECT file_path, size, mtime FROM log_files WHERE dir_path = ?", (dir_path,))}
+        self.changes += sum(1 for row in rows if known_files.get(row[0]) != (row[8], row[9]))
+
+        conn.executemany("""
+            INSERT INTO log_files (file_path, root, location, dir_path, file_name, process, worker, file_date, size, mtime)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(file_path) DO UPDATE SET
+                size = excluded.size, mtime = excluded.mtime, location = excluded.location
+        """, rows)
+
+        # 폴더에서 사라진 파일 제거
+        removed = [(path,) for path in known_files if path not in present_files]
+        if removed:
+            conn.executemany("DELETE FROM log_files WHERE file_path = ?", removed)
+            self.changes += len(removed)
+
+        conn.execute("""
+            INSERT INTO log_dirs (dir_path, root, location, recursive, mtime) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(dir_path) DO UPDATE SET mtime = excluded.mtime
+        """, (dir_path, root, location, int(recursive), dir_mtime))
+
+    def _drop_dir(self, conn: sqlite3.Connection, dir_path: str):
+        """사라진 폴더와 그 하위 항목 제거"""
+        prefix = dir_path.rstrip(os.sep) + os.sep + '%'
+        cursor = conn.execute("DELETE FROM log_files WHERE dir_path = ? OR dir_path LIKE ?", (dir_path, prefix))
+        self.changes += max(cursor.rowcount, 0)
+        conn.execute("DELETE FROM log_dirs WHERE dir_path = ? OR dir_path LIKE ?", (dir_path, prefix))
+
+    def scan(self, folder_path: str):
+        """루트 폴더 전체 재색인 (메인, 날짜별 아카이브, log, quarterly_backup)"""
+        root = self._normalize_root(folder_path)
+        with self._lock:
+            conn = self.get_connection()
+            try:
+                self._scan_dir(conn, root, root, LOCATION_MAIN, False)
+                quarterly = self.quarterly_path(root)
+                if os.path.isdir(quarterly):
+                    self._scan_dir(conn, root, quarterly, LOCATION_QUARTERLY, True)
+                conn.commit()
+            finally:
+                conn.close()
+        logger.info(f"로그 카탈로그 전체 색인 완료: {root} ({self.count(root)}개 파일)")
+
+    def refresh(self, folder_path: str):
+        """카탈로그 갱신 - 메인 폴더와 수정시각이 바뀐 폴더만 다시 나열 (최초 호출 시 전체 색인)"""
+        root = self._normalize_root(folder_path)
+        with self._lock:
+            conn = self.get_connection()
+            try:
+                known_dirs = conn.execute(
+                    "SELECT dir_path, location, recursive, mtime FROM log_dirs WHERE root = ?", (root,)).fetchall()
+            finally:
+                conn.close()
+        if not known_dirs:
+            self.scan(root)
+            return
+
+        with self._lock:
+            conn = self.get_connection()
+            try:
+                known_paths = {row[0] for row in known_dirs}
+                for dir_path, location, recursive, mtime in known_dirs:
+                    try:
+                        current_mtime = os.stat(dir_path).st_mtime
+                    except OSError:
+                        self._drop_dir(conn, dir_path)
+                        continue
+                    if location == LOCATION_MAIN or current_mtime != mtime:
+                        self._scan_dir(conn, root, dir_path, location, bool(recursive), rescan_known_subdirs=False)
+
+                quarterly = self.quarterly_path(root)
+                if quarterly not in known_paths and os.path.isdir(quarterly):
+                    self._scan_dir(conn, root, quarterly, LOCATION_QUARTERLY, True)
+                conn.commit()
+            finally:
+                conn.close()
+
+    # ------------------------------------------------------------------
+    # 파일 단위 갱신 (watchdog)
+    # ------------------------------------------------------------------
+
+    def update_file(self, file_path: str) -> bool:
+        """파일 생성/수정 이벤트 반영. 카탈로그 루트 밖이거나 로그 파일이 아니면 False"""
+        file_path = os.path.abspath(file_path)
+        file_name = os.path.basename(file_path)
+        if not is_log_file(file_name):
+            return False
+        dir_path = os.path.dirname(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return self.remove_file(file_path)
+
+        with self._lock:
+            conn = self.get_connection()
+            try:
+                dir_row = conn.execute("SELECT root, location FROM log_dirs WHERE dir_path = ?", (dir_path,)).fetchone()
+                if not dir_row:
+                    return False
+                known = conn.execute("SELECT size, mtime FROM log_files WHERE file_path = ?", (file_path,)).fetchone()
+                if known != (stat.st_size, stat.st_mtime):
+                    self.changes += 1
+                process, worker, file_date = parse_log_file_name(file_name)
+                conn.execute("""
+                    INSERT INTO log_files (file_path, root, location, dir_path, file_name, process, worker, file_date, size, mtime)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(file_path) DO UPDATE SET size = excluded.size, mtime = excluded.mtime
+                """, (file_path, dir_row[0], dir_row[1], dir_path, file_name, process, worker, file_date,
+                      stat.st_size, stat.st_mtime))
+                conn.commit()
+            finally:
+                conn.close()
+        return True
+
+    def remove_file(self, file_path: str) -> bool:
+        """파일 삭제/이동 이벤트 반영"""
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            conn = self.get_connection()
+            try:
+                cursor = conn.execute("DELETE FROM log_files WHERE file_path = ?", (file_path,))
+                conn.commit()
+                if cursor.rowcount > 0:
+                    self.changes += 1
+                return cursor.rowcount > 0
+            finally:
+                conn.close()
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def get_files(self, folder_path: str, process_mode: Optional[str] = None,
+                  start_date: Optional[date] = None, end_date: Optional[date] = None,
+                  locations: Optional[Iterable[str]] = None, include_undated: bool = True) -> List[str]:
+        """조건에 맞는 로그 파일 경로 목록 (색인 조회)
+
+        Args:
+            process_mode: '이적실'/'검사실'/'포장실'이면 해당 공정만, 그 외('전체', '전체 비교' 등)는 전체
+            start_date, end_date: 파일명 날짜 기준 범위 (양 끝 포함)
+            locations: 포함할 위치 (None이면 전체)
+            include_undated: 파일명에 날짜가 없는 파일 포함 여부
+        """
+        root = self._normalize_root(folder_path)
+        query = "SELECT file_path FROM log_files WHERE root = ?"
+        params: list = [root]
+
+        if process_mode in ('이적실', '검사실', '포장실'):
+            query += " AND process = ?"
+            params.append(process_mode)
+
+        if locations:
+            locations = list(locations)
+            query += f" AND location IN ({','.join('?' * len(locations))})"
+            params.extend(locations)
+
+        if start_date or end_date:
+            date_clause = "file_date BETWEEN ? AND ?"
+            params.extend([
+                start_date.isoformat() if start_date else '0000-00-00',
+                end_date.isoformat() if end_date else '9999-99-99',
+            ])
+            if include_undated:
+                date_clause = f"({date_clause} OR file_date IS NULL)"
+            query += f" AND {date_clause}"
+
+        query += " ORDER BY location, file_path"
+
+        conn = self.get_connection()
+        try:
+            return [row[0] for row in conn.execute(query, params)]
+        finally:
+            conn.close()
+
+    def get_file_info(self, file_path: str) -> Optional[dict]:
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute("SELECT * FROM log_files WHERE file_path = ?",
+                               (os.path.abspath(file_path),)).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+
+    def count(self, folder_path: str) -> int:
+        conn = self.get_connection()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM log_files WHERE root = ?",
+                                (self._normalize_root(folder_path),)).fetchone()[0]
+        finally:
+            conn.close()
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+log_tail_reader.py - 작업 이벤트 로그 증분(tail) 리더
+하루 동안 뒤에만 추가되는 이벤트 로그 CSV를 파일별 바이트 오프셋과
+미완성 줄 버퍼로 추적하여 새로 추가된 행만 파싱
+"""
+
+import io
+import os
+import json
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+import pandas as pd
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ENCODINGS = ['utf-8-sig', 'utf-8', 'cp949']
+
+# 파일명 패턴: {공정}작업이벤트로그_{작업자}_{날짜}.csv
+WORKER_FROM_FILENAME_PATTERN = re.compile(r'작업이벤트로그_([^_]+)_\d{8}')
+VERSION_LIKE_WORKER_PATTERN = re.compile(r'^\d+\.\d+\.\d+$')
+
+MAX_DETACHED_STATES = 256  # 삭제 이벤트로 떼어 둔 상태 보관 개수 (이동으로 다시 나타날 경우 대비)
+
+
+def process_from_filename(filename: str) -> str:
+    """파일명으로 공정 판별"""
+    if '이적작업이벤트로그' in filename:
+        return '이적실'
+    elif '포장실작업이벤트로그' in filename:
+        return '포장실'
+    elif '검사작업이벤트로그' in filename:
+        return '검사실'
+    return '기타'
+
+
+@dataclass
+class TailState:
+    """파일별 tail 상태"""
+    offset: int = 0          # 다음에 읽을 바이트 위치
+    partial: str = ''        # 아직 줄바꿈이 오지 않은 마지막 줄 (latin-1로 보존한 원본 바이트)
+    header: str = ''         # CSV 헤더 줄 (latin-1로 보존한 원본 바이트)
+    inode: int = 0
+    size: int = 0
+
+
+class LogTailReader:
+    """이벤트 로그 파일별 오프셋을 기억하고 새로 추가된 행만 읽는 리더
+
+    CSV 한 행이 한 줄이라는 전제(따옴표 안 줄바꿈 없음)에서 동작한다.
+    파일이 잘리거나 교체되면(크기 감소, inode 변경) 처음부터 다시 읽는다.
+    이동이 삭제 이벤트로만 전달된 경우에도 같은 이름/inode의 파일이 나타나면 오프셋을 이어받는다.
+    """
+
+    def __init__(self, state_path: Optional[str] = None):
+        self.state_path = state_path
+        self._states: Dict[str, TailState] = {}
+        self._reset_files = set()  # 교체/절단으로 처음부터 다시 읽게 된 파일
+        self._detached: 'OrderedDict[tuple, TailState]' = OrderedDict()  # (파일명, inode) -> 삭제된 경로의 상태
+        self._lock = threading.Lock()
+        self._load_state()
+
+    # ------------------------------------------------------------------
+    # 상태 저장/복원
+    # ------------------------------------------------------------------
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            self._states = {path: TailState(**state) for path, state in raw.items()}
+            logger.info(f"tail 상태 복원: {len(self._states)}개 파일")
+        except (json.JSONDecodeError, TypeError, OSError) as e:
+            logger.warning(f"tail 상태 복원 실패: {e}")
+            self._states = {}
+
+    def save_state(self):
+        """현재 오프셋 상태를 파일로 저장"""
+        if not self.state_path:
+            return
+        with self._lock:
+            snapshot = {path: asdict(state) for path, state in self._states.items()}
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"tail 상태 저장 실패: {e}")
+
+    def forget(self, file_path: str):
+        """파일 상태 제거 (아카이브 이동/삭제 시)"""
+        with self._lock:
+            self._states.pop(file_path, None)
+
+    def detach(self, file_path: str):
+        """삭제 이벤트 시 상태를 (파일명, inode) 기준으로 떼어 둠
+
+        감시 폴더 사이의 이동이 삭제+생성 이벤트로 나뉘어 오면 새 경로에서 오프셋을 이어받는다.
+        """
+        with self._lock:
+            state = self._states.pop(file_path, None)
+            if state is None or not state.inode:
+                return
+            self._detached[(os.path.basename(file_path), state.inode)] = state
+            while len(self._detached) > MAX_DETACHED_STATES:
+                self._detached.popitem(last=False)
+
+    def rename(self, src_path: str, dest_path: str):
+        """파일 이동(자정 아카이브 등) 시 오프셋 상태를 새 경로로 옮김 (같은 inode면 이어서 읽음)"""
+        with self._lock:
+            state = self._states.pop(src_path, None)
+            if state is not None:
+                self._states[dest_path] = state
+
+    def consume_reset(self, file_path: str) -> bool:
+        """마지막 읽기에서 파일이 교체/절단되어 처음부터 다시 읽었는지 여부 (한 번만 True)"""
+        with self._lock:
+            if file_path in self._reset_files:
+                self._reset_files.discard(file_path)
+                return True
+            return False
+
+    # ------------------------------------------------------------------
+    # 증분 읽기
+    # ------------------------------------------------------------------
+
+    def read_new_bytes(self, file_path: str) -> bytes:
+        """마지막으로 읽은 위치 이후에 추가된 '완성된 줄'의 바이트를 반환 (헤더 제외)"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self.forget(file_path)
+            return b''
+
+        with self._lock:
+            state = self._states.get(file_path)
+            if state is None:
+                state = self._detached.pop((os.path.basename(file_path), stat.st_ino), None)
+                if state is not None:
+                    self._states[file_path] = state
+            if state is None or stat.st_size < state.size or (state.inode and stat.st_ino != state.inode):
+                if state is not None:
+                    logger.info(f"로그 파일 교체/절단 감지, 처음부터 다시 읽음: {os.path.basename(file_path)}")
+                    self._reset_files.add(file_path)
+                state = TailState(inode=stat.st_ino)
+                self._states[file_path] = state
+
+            if stat.st_size == state.offset:
+                return b''
+
+            with open(file_path, 'rb') as f:
+                f.seek(state.offset)
+                chunk = f.read(stat.st_size - state.offset)
+
+            state.offset += len(chunk)
+            state.size = stat.st_size
+            data = state.partial.encode('latin-1') + chunk
+
+            # 마지막 줄바꿈 이후는 아직 쓰는 중인 줄이므로 버퍼에 보관
+            last_newline = data.rfind(b'\n')
+            if last_newline < 0:
+                state.partial = data.decode('latin-1')
+                return b''
+            state.partial = data[last_newline + 1:].decode('latin-1')
+            complete = data[:last_newline + 1]
+
+            # 첫 줄은 CSV 헤더
+            if not state.header:
+                header_end = complete.find(b'\n')
+                state.header = complete[:header_end + 1].decode('latin-1')
+                complete = complete[header_end + 1:]
+
+            return complete
+
+    def read_new_rows(self, file_path: str) -> pd.DataFrame:
+        """새로 추가된 행만 DataFrame으로 파싱 (CSV 원본 컬럼 그대로)
+
+        새 행이 없으면 빈 DataFrame을 반환한다. worker/process/timestamp 정규화는
+        호출측에서 수행한다 (normalize_event_frame 참고).
+        """
+        body = self.read_new_bytes(file_path)
+        if not body.strip():
+            return pd.DataFrame()
+
+        header = self._states[file_path].header.encode('latin-1')
+        df = None
+        for encoding in ENCODINGS:
+            try:
+                df = pd.read_csv(io.BytesIO(header + body), encoding=encoding, on_bad_lines='warn')
+                break
+            except Exception:
+                continue
+
+        if df is None or df.empty:
+            return pd.DataFrame()
+        return df
+
+
+def normalize_event_frame(df: pd.DataFrame, filename: str) -> pd.DataFrame:
+    """이벤트 로그 DataFrame의 worker/process/timestamp 컬럼 정규화"""
+    if 'worker_name' in df.columns and 'worker' not in df.columns:
+        df = df.rename(columns={'worker_name': 'worker'})
+
+    match = WORKER_FROM_FILENAME_PATTERN.search(filename)
+    worker_from_file = match.group(1) if match else 'UNKNOWN_WORKER'
+    if 'worker' not in df.columns:
+        df['worker'] = worker_from_file
+    elif match:
+        # CSV 내부의 worker 값이 버전 번호 형식(1.0.5 등)이거나 호스트명이면 파일명의 작업자로 대체
+        worker = df['worker'].astype(str)
+        invalid = df['worker'].notna() & (worker.str.match(VERSION_LIKE_WORKER_PATTERN) | worker.str.startswith('BOOK-'))
+        df['worker'] = worker.where(~invalid, worker_from_file)
+
+    df['process'] = process_from_filename(filename)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+    return df.dropna(subset=['timestamp'])
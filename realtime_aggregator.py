@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+realtime_aggregator.py - 실시간 현황(오늘) 메모리 집계
+공정 모드별로 표시 날짜의 작업자/품목/시간대 합계와 최근 30일 기준선을 메모리에 유지하고,
+동기화로 반영된 세션만큼만(O(새 세션)) 갱신한다. /api/realtime은 계산된 응답을 그대로 읽는다.
+"""
+
+import math
+import threading
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REALTIME_WORK_HOURS = range(6, 23)
+BASELINE_DAYS = 30   # 평균 기준선 기간 (오늘 포함)
+FALLBACK_DAYS = 7    # 오늘 데이터가 없을 때 최근 작업일을 찾는 기간
+ALL_PROCESSES_MODE = '전체 비교'
+PACKAGING_PROCESS = '포장실'
+PACKAGING_PCS_PER_TRAY = 60
+
+# 세션 집계에 필요한 컬럼 (자연 키 + 집계 값)
+AGGREGATE_SESSION_COLUMNS = ['worker', 'process', 'date', 'start_time_dt', 'end_time_dt',
+                             'item_code', 'item_display', 'pcs_completed', 'work_time']
+
+
+def _number(value) -> Optional[float]:
+    """None/NaN이면 None, 아니면 숫자 그대로"""
+    if value is None:
+        return None
+    try:
+        return None if math.isnan(value) else value
+    except TypeError:
+        return None
+
+
+def _session_key(record: dict) -> tuple:
+    """sessions 자연 키와 같은 기준 (NULL은 DB 인덱스의 COALESCE 값으로 비교, 시각 구분자는 'T'로 통일)"""
+    start, end = (str(record.get(column) or '').replace(' ', 'T') for column in ('start_time_dt', 'end_time_dt'))
+    return (record.get('worker'), record.get('process'), start, end, record.get('item_code') or 'N/A')
+
+
+def _session_hour(start_time_dt) -> Optional[int]:
+    """시간대별 롤업과 같은 기준의 시(hour) - start_time_dt 문자열의 12~13번째 문자"""
+    if isinstance(start_time_dt, str) and len(start_time_dt) >= 13:
+        try:
+            return int(start_time_dt[11:13])
+        except ValueError:
+            return None
+    return None
+
+
+class _DayTotals:
+    """하루치 세션 합계 (세션 자연 키별 기여분을 기억하여 갱신된 세션은 이전 값을 빼고 다시 더함)"""
+
+    def __init__(self):
+        self.contributions: Dict[tuple, tuple] = {}
+        self.workers: Dict[Optional[str], list] = {}  # worker → [pcs, work_time 합, work_time 개수, 세션 수]
+        self.items: Dict[str, list] = {}              # item_display → [pcs, 세션 수]
+        self.hours: Dict[int, float] = {}             # hour → pcs
+        self.pcs = 0
+        self.session_count = 0
+        self.work_time_sum = 0.0
+        self.work_time_count = 0
+
+    def add(self, key: tuple, worker, item, hour, pcs, work_time):
+        old = self.contributions.pop(key, None)
+        if old is not None:
+            self._apply(old, -1)
+        contribution = (worker, item, hour, pcs, work_time)
+        self.contributions[key] = contribution
+        self._apply(contribution, 1)
+
+    def _apply(self, contribution: tuple, sign: int):
+        worker, item, hour, pcs, work_time = contribution
+        has_work_time = work_time is not None
+
+        self.pcs += sign * pcs
+        self.session_count += sign
+        if has_work_time:
+            self.work_time_sum += sign * work_time
+            self.work_time_count += sign
+
+        totals = self.workers.setdefault(worker, [0, 0.0, 0, 0])
+        totals[0] += sign * pcs
+        totals[3] += sign
+        if has_work_time:
+            totals[1] += sign * work_time
+            totals[2] += sign
+        if totals[3] == 0:
+            del self.workers[worker]
+
+        if item is not None:
+            totals = self.items.setdefault(item, [0, 0])
+            totals[0] += sign * pcs
+            totals[1] += sign
+            if totals[1] == 0:
+                del self.items[item]
+
+        if hour is not None:
+            self.hours[hour] = self.hours.get(hour, 0) + sign * pcs
+
+    def day_stats(self) -> Tuple[float, int, Optional[float], int]:
+        """(PCS 합, 세션 수, 평균 작업시간, 작업자 수) - 일별 롤업 병합과 같은 기준"""
+        work_time = self.work_time_sum / self.work_time_count if self.work_time_count else None
+        worker_count = len({worker or '' for worker in self.workers})
+        return self.pcs, self.session_count, work_time, worker_count
+
+
+class _ProcessState:
+    """공정 모드 하나의 실시간 상태"""
+
+    def __init__(self, process_mode: str, today: str, display_date: str):
+        self.process_mode = process_mode
+        self.today = today
+        self.display_date = display_date
+        self.baseline_start = (date.fromisoformat(today) - timedelta(days=BASELINE_DAYS)).isoformat()
+        self.totals = _DayTotals()
+        self.past_days: List[Tuple[float, int, Optional[float], int]] = []  # 오늘 이전 기준선 날짜별 통계
+        self.past_hourly: Dict[int, float] = {}
+        self.stale = False
+        self.payload: Optional[dict] = None
+
+
+class RealtimeAggregator:
+    """공정 모드별 실시간 현황 메모리 집계
+
+    - 처음 조회(또는 자정 이후 첫 조회) 시 DB에서 한 번 구성한다.
+    - apply()로 동기화된 세션을 받아 표시 날짜 세션은 증분 반영하고,
+      기준선 기간의 다른 날짜가 바뀌었으면 다음 조회 때 다시 구성한다.
+    - snapshot()은 마지막 변경 이후 계산해 둔 응답을 그대로 반환한다 (호출측은 수정하지 않아야 함).
+    """
+
+    def __init__(self, load_sessions: Callable[[str, str, str], pd.DataFrame],
+                 find_latest_date: Callable[[str, str, str], Optional[str]],
+                 load_baseline: Callable[[str, str, str], Tuple[pd.DataFrame, pd.Series]],
+                 process_modes: Iterable[str]):
+        """
+        Args:
+            load_sessions: (공정 모드, 시작일, 종료일) → AGGREGATE_SESSION_COLUMNS 세션 DataFrame
+            find_latest_date: (공정 모드, 시작일, 종료일) → 세션이 있는 가장 최근 날짜 (없으면 None)
+            load_baseline: (공정 모드, 시작일, 종료일) →
+                (날짜별 [date, pcs_completed, session_count, work_time, worker_count] DataFrame,
+                 시간대별 PCS 합계 Series)
+            process_modes: 집계 상태를 만들 수 있는 공정 모드 (그 외 모드는 snapshot에서 ValueError)
+        """
+        self.load_sessions = load_sessions
+        self.find_latest_date = find_latest_date
+        self.load_baseline = load_baseline
+        self.process_modes = frozenset(process_modes)
+        self._states: Dict[str, _ProcessState] = {}
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def snapshot(self, process_mode: str) -> dict:
+        """/api/realtime 응답 (메모리 상태에서 계산, 변경이 없으면 이전 계산 결과 재사용)"""
+        if process_mode not in self.process_modes:
+            raise ValueError(f"알 수 없는 공정 모드: {process_mode}")
+        today = date.today().isoformat()
+        with self._lock:
+            state = self._states.get(process_mode)
+            if state is None or state.stale or state.today != today:
+                state = self._build(process_mode, today)
+                self._states[process_mode] = state
+            if state.payload is None:
+                state.payload = self._render(state)
+            return state.payload
+
+    def invalidate(self, process_mode: Optional[str] = None):
+        """상태 폐기 (다음 조회 때 DB에서 다시 구성)"""
+        with self._lock:
+            if process_mode is None:
+                self._states.clear()
+            else:
+                self._states.pop(process_mode, None)
+
+    # ------------------------------------------------------------------
+    # 증분 반영
+    # ------------------------------------------------------------------
+
+    def apply(self, sessions: List[dict]):
+        """동기화로 삽입/갱신된 세션 반영 (세션 dict는 AGGREGATE_SESSION_COLUMNS 키를 가짐)"""
+        if not sessions:
+            return
+        with self._lock:
+            for state in self._states.values():
+                for record in sessions:
+                    if state.process_mode != ALL_PROCESSES_MODE and record.get('process') != state.process_mode:
+                        continue
+                    record_date = record.get('date')
+                    if record_date == state.display_date:
+                        self._add(state, record)
+                        state.payload = None
+                    elif record_date and state.baseline_start <= record_date <= state.today:
+                        # 오늘 첫 데이터(어제를 표시 중) 또는 기준선의 지난 날짜 변경: 다음 조회 때 재구성
+                        state.stale = True
+
+    @staticmethod
+    def _add(state: _ProcessState, record: dict):
+        pcs = PACKAGING_PCS_PER_TRAY if state.process_mode == PACKAGING_PROCESS else (_number(record.get('pcs_completed')) or 0)
+        state.totals.add(_session_key(record), record.get('worker'), record.get('item_display'),
+                         _session_hour(record.get('start_time_dt')), pcs, _number(record.get('work_time')))
+
+    # ------------------------------------------------------------------
+    # 구성/렌더링
+    # ------------------------------------------------------------------
+
+    def _build(self, process_mode: str, today: str) -> _ProcessState:
+        """DB에서 표시 날짜 세션과 지난 기준선 통계를 읽어 상태 구성"""
+        display_date = today
+        sessions = self.load_sessions(process_mode, today, today)
+        if sessions.empty:
+            fallback_start = (date.fromisoformat(today) - timedelta(days=FALLBACK_DAYS)).isoformat()
+            latest = self.find_latest_date(process_mode, fallback_start, today)
+            if latest:
+                display_date = latest
+                sessions = self.load_sessions(process_mode, latest, latest)
+
+        state = _ProcessState(process_mode, today, display_date)
+        for record in sessions.to_dict('records'):
+            self._add(state, record)
+
+        yesterday = (date.fromisoformat(today) - timedelta(days=1)).isoformat()
+        daily, hourly = self.load_baseline(process_mode, state.baseline_start, yesterday)
+        state.past_days = [
+            (row['pcs_completed'], row['session_count'], _number(row['work_time']), row['worker_count'])
+            for row in daily.to_dict('records')
+        ]
+        state.past_hourly = {int(hour): pcs for hour, pcs in hourly.items()}
+        logger.info(f"실시간 집계 구성: {process_mode} {display_date} (세션 {state.totals.session_count}개)")
+        return state
+
+    @staticmethod
+    def _render(state: _ProcessState) -> dict:
+        totals = state.totals
+        is_today = state.display_date == state.today
+
+        # 이름순으로 나열한 뒤 PCS 내림차순 안정 정렬 (groupby 후 sort_values와 같은 순서)
+        worker_status = [
+            {'worker': worker, 'pcs_completed': pcs,
+             'avg_work_time': work_time_sum / work_time_count if work_time_count else None,
+             'session_count': count}
+            for worker, (pcs, work_time_sum, work_time_count, count)
+            in sorted((worker, values) for worker, values in totals.workers.items() if worker is not None)
+            if pcs > 0
+        ]
+        worker_status.sort(key=lambda row: row['pcs_completed'], reverse=True)
+
+        item_status = [
+            {'item_display': item, 'pcs_completed': pcs, 'pallet_count': count}
+            for item, (pcs, count) in sorted(totals.items.items()) if pcs > 0
+        ]
+        item_status.sort(key=lambda row: row['pcs_completed'], reverse=True)
+
+        # 기준선: 지난 날짜 통계 + (오늘을 표시 중이면) 오늘 합계
+        days = list(state.past_days)
+        hourly_sum = dict(state.past_hourly)
+        if is_today and totals.session_count:
+            days.append(totals.day_stats())
+            for hour, pcs in totals.hours.items():
+                hourly_sum[hour] = hourly_sum.get(hour, 0) + pcs
+
+        average_hourly_production = []
+        monthly_averages = {'daily_total_pcs': 0, 'daily_total_pallets': 0, 'daily_worker_count': 0, 'daily_avg_work_time': 0}
+        if days:
+            num_days = len(days)
+            average_hourly_production = [hourly_sum.get(hour, 0) / num_days for hour in REALTIME_WORK_HOURS]
+            frame = pd.DataFrame(days, columns=['pcs_completed', 'session_count', 'work_time', 'worker_count'], dtype=float)
+            monthly_averages = {
+                'daily_total_pcs': round(frame['pcs_completed'].mean(), 1),
+                'daily_total_pallets': round(frame['session_count'].mean(), 1),
+                'daily_worker_count': round(frame['worker_count'].mean(), 1),
+                'daily_avg_work_time': round(frame['work_time'].mean(), 1),
+            }
+
+        return {
+            'display_date': state.display_date,  # 실제 표시 날짜
+            'is_today': is_today,  # 오늘 데이터인지 여부
+            'worker_status': worker_status,
+            'item_status': item_status,
+            'hourly_production': {
+                'labels': [f"{hour:02d}시" for hour in REALTIME_WORK_HOURS],
+                'today': [totals.hours.get(hour, 0) for hour in REALTIME_WORK_HOURS],
+                'average': average_hourly_production,
+            },
+            'monthly_averages': monthly_averages,
+        }
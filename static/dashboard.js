@@ -86,6 +86,10 @@ document.addEventListener('DOMContentLoaded', () => {
         selected_workers: [],
         active_tab: '',
         full_data: null,
+        loaded_sections: new Set(), // full_data에 받아 둔 /api/data 섹션
+        data_request_id: 0, // 필터 변경 시 증가 (이전 조건의 늦은 응답 무시)
+        realtime_data: null, // 실시간 현황 마지막 응답 (서버 델타로 갱신)
+        realtime_patched: false, // true면 다음 실시간 탭 렌더링 시 재조회 없이 realtime_data 사용
         charts: {}, // 생성된 차트 인스턴스 저장
         worker_detail: { // 작업자별 분석 탭 상태
             sort_key: '종합 점수 높은 순',
@@ -119,6 +123,27 @@ document.addEventListener('DOMContentLoaded', () => {
         },
     };
 
+    // 탭별로 필요한 /api/data 섹션 (정규화된 탭 이름 기준, 없는 탭은 sessions)
+    // summary: KPI/작업자별 성과/작업자 목록, sessions: 선택 기간 세션, history: 최근 30일 요약,
+    // comparison: 공정 비교 데이터, hr: 전체 기간 세션
+    const TAB_SECTIONS = {
+        '현황': [],
+        '생산량분석': ['sessions', 'history'],
+        '검사량분석': ['sessions', 'history'],
+        '생산량추이분석': ['sessions', 'history'],
+        '작업자별분석': ['summary', 'sessions'],
+        '오류로그': ['sessions'],
+        '생산이력추적': [],
+        '상세데이터': ['sessions'],
+        '공정비교분석': ['sessions', 'comparison'],
+        '출고일자별분석': ['sessions'],
+    };
+
+    function getMissingSections(tabName) {
+        const needed = TAB_SECTIONS[normalizeTabName(tabName || '')] || ['sessions'];
+        return needed.filter(section => !state.loaded_sections.has(section));
+    }
+
     // 동적 탭 생성 함수
     function getTabsForProcess(processMode, dateRange = null) {
         const isRealTime = isDateRangeRealTime(dateRange);
@@ -322,17 +347,75 @@ document.addEventListener('DOMContentLoaded', () => {
     // ### 초기화 ###
     // ########################
     const socket = io();
-    socket.on('connect', () => console.log('Socket.IO 서버에 연결되었습니다.'));
+    socket.on('connect', () => {
+        console.log('Socket.IO 서버에 연결되었습니다.');
+        joinProcessRoom();
+    });
     socket.on('disconnect', () => console.log('Socket.IO 서버 연결이 끊어졌습니다.'));
     socket.on('data_updated', (data) => {
         console.log('서버로부터 데이터 업데이트 이벤트를 받았습니다:', data.message);
-        if (state.active_tab === '실시간 현황') {
-            showToast('실시간 데이터가 업데이트되었습니다. 갱신합니다...');
-            renderActiveTabData();
-        } else {
+        // 현재 공정 데이터가 바뀌었으면 다음 탭 렌더링 시 섹션을 다시 조회
+        if (state.process_mode === '전체 비교' || (data.processes || []).includes(state.process_mode)) {
+            state.loaded_sections = new Set();
+        }
+        // 실시간 현황 탭은 realtime_delta로 직접 갱신되므로 재조회하지 않음
+        if (state.active_tab !== '실시간 현황') {
             showToast('새로운 데이터가 감지되었습니다. 실시간 현황 탭에서 확인할 수 있습니다.');
         }
     });
+    socket.on('realtime_delta', handleRealtimeDelta);
+
+    function joinProcessRoom() {
+        socket.emit('join_process', { process_mode: state.process_mode });
+    }
+
+    function isRealtimeTabActive() {
+        return normalizeTabName(state.active_tab || '') === '현황';
+    }
+
+    function upsertRows(rows, updates, key, removedKeys = []) {
+        // 같은 키의 행을 교체/추가하고, PCS가 0이 되었거나 제거된 키는 삭제 후 PCS 내림차순 정렬
+        const byKey = new Map(rows.map(row => [row[key], row]));
+        updates.forEach(row => byKey.set(row[key], row));
+        removedKeys.forEach(k => byKey.delete(k));
+        return Array.from(byKey.values())
+            .filter(row => (row.pcs_completed || 0) > 0)
+            .sort((a, b) => (b.pcs_completed || 0) - (a.pcs_completed || 0));
+    }
+
+    function applyRealtimeDelta(data, delta) {
+        data.worker_status = upsertRows(data.worker_status, delta.workers, 'worker', delta.removed_workers);
+        data.item_status = upsertRows(data.item_status, delta.items, 'item_display');
+        const labels = data.hourly_production.labels;
+        Object.entries(delta.hourly).forEach(([hour, pcs]) => {
+            const index = labels.indexOf(`${String(hour).padStart(2, '0')}시`);
+            if (index >= 0) data.hourly_production.today[index] = pcs;
+        });
+        data.hourly_production.average = delta.average_hourly;
+        data.monthly_averages = delta.monthly_averages;
+    }
+
+    function handleRealtimeDelta(delta) {
+        if (delta.process_mode !== state.process_mode) return;
+        const data = state.realtime_data;
+
+        if (data && data.is_today && data.display_date === delta.date) {
+            applyRealtimeDelta(data, delta);
+            if (isRealtimeTabActive()) {
+                state.realtime_patched = true;
+                renderActiveTabData();
+            }
+        } else if (isRealtimeTabActive()) {
+            // 어제 데이터를 보고 있다가 오늘 첫 데이터가 들어온 경우 등: 한 번만 다시 조회
+            state.realtime_data = null;
+            renderActiveTabData();
+        }
+
+        if (isRealtimeTabActive() && delta.sessions.length > 0) {
+            const workers = [...new Set(delta.sessions.map(session => session.worker))].join(', ');
+            showToast(`${workers} - ${delta.sessions.length}개 세트 반영`);
+        }
+    }
 
     initialize();
 
@@ -414,6 +497,8 @@ document.addEventListener('DOMContentLoaded', () => {
             const newMode = event.target.value;
             console.log(`🔄 [DEBUG] 공정 모드 변경: ${oldMode} → ${newMode}`);
             state.process_mode = newMode;
+            state.realtime_data = null;
+            joinProcessRoom();
             updateMainTitle();
             console.log(`📡 [DEBUG] 공정 모드 변경으로 인한 자동 분석 실행...`);
             fetchAnalysisData();
@@ -567,38 +652,31 @@ document.addEventListener('DOMContentLoaded', () => {
         //     return;
         // }
 
+        // 첫 화면에 표시할 탭에 필요한 섹션만 조회 (나머지는 탭 전환 시 loadMissingSections)
+        const tabsForMode = getTabsForProcess(state.process_mode, { start_date: state.start_date, end_date: state.end_date });
+        const firstTab = tabsForMode.includes(state.active_tab) ? state.active_tab : tabsForMode[0];
+        const sections = [...new Set(['summary', ...(TAB_SECTIONS[normalizeTabName(firstTab || '')] || ['sessions'])])];
+        const requestId = ++state.data_request_id;
+
         // 타임아웃을 위한 AbortController
         const controller = new AbortController();
         const timeoutId = setTimeout(() => controller.abort(), TIMEOUT_MS);
 
         try {
-            const response = await fetch('/api/data', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    process_mode: state.process_mode,
-                    start_date: state.start_date,
-                    end_date: state.end_date,
-                    selected_workers: state.selected_workers,
-                }),
-                signal: controller.signal
-            });
+            const data = await requestSections(sections, controller.signal);
 
             clearTimeout(timeoutId);
+            if (requestId !== state.data_request_id) return; // 그 사이 필터가 다시 바뀜
 
-            if (!response.ok) {
-                const errorData = await response.json().catch(() => ({}));
-                throw new Error(errorData.error || `서버 오류 (${response.status})`);
-            }
-
-            const data = await response.json();
             console.log('✅ [fetchAnalysisData] API 응답 수신:', {
+                sections: sections.join(','),
                 kpis: Object.keys(data.kpis || {}).length,
                 workers: data.workers?.length || 0,
                 sessions: data.filtered_sessions_data?.length || 0
             });
 
             state.full_data = data;
+            state.loaded_sections = new Set(sections);
 
             // 캐시 기능 비활성화
             // saveCacheToStorage(cacheKey, data);
@@ -615,6 +693,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
         } catch (error) {
             clearTimeout(timeoutId);
+            if (requestId !== state.data_request_id) return;
             console.error('데이터 분석 중 오류 발생:', error);
 
             let errorMessage = '';
@@ -657,12 +736,59 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    async function requestSections(sections, signal) {
+        const response = await fetch('/api/data', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                process_mode: state.process_mode,
+                start_date: state.start_date,
+                end_date: state.end_date,
+                selected_workers: state.selected_workers,
+                sections: sections,
+            }),
+            signal: signal
+        });
+
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({}));
+            throw new Error(errorData.error || `서버 오류 (${response.status})`);
+        }
+        return response.json();
+    }
+
+    async function loadMissingSections(sections) {
+        // 탭 전환 시 아직 받지 않은 섹션만 추가 조회 후 다시 렌더링
+        const requestId = state.data_request_id;
+        const tabName = state.active_tab;
+        elements.tabContentContainer.innerHTML = '<div class="card"><p>데이터를 불러오는 중입니다...</p></div>';
+
+        try {
+            const data = await requestSections(sections);
+            if (requestId !== state.data_request_id) return; // 그 사이 필터가 바뀜
+            Object.assign(state.full_data, data);
+            sections.forEach(section => state.loaded_sections.add(section));
+            console.log(`✅ [loadMissingSections] ${sections.join(',')} 섹션 수신`);
+            if (state.active_tab === tabName) renderActiveTabData();
+        } catch (error) {
+            console.error('섹션 데이터 로드 오류:', error);
+            if (requestId !== state.data_request_id || state.active_tab !== tabName) return;
+            elements.tabContentContainer.innerHTML = `
+                <div class="card" style="padding: 2rem; text-align: center;">
+                    <p style="color: var(--color-danger); font-weight: 600;">⚠️ 데이터를 불러오는 데 실패했습니다: ${error.message}</p>
+                </div>
+            `;
+        }
+    }
+
     async function fetchRealtimeData() {
         try {
             const params = new URLSearchParams({ process_mode: state.process_mode });
             const response = await fetch(`/api/realtime?${params.toString()}`);
             if (!response.ok) throw new Error('실시간 데이터 로드 실패');
-            return await response.json();
+            const data = await response.json();
+            state.realtime_data = data;
+            return data;
         } catch (error) {
             console.error('실시간 데이터 API 호출 오류:', error);
             return null;
@@ -802,6 +928,12 @@ document.addEventListener('DOMContentLoaded', () => {
         elements.tabContentContainer.innerHTML = '';
         if (!state.full_data) return;
 
+        const missingSections = getMissingSections(state.active_tab);
+        if (missingSections.length > 0) {
+            loadMissingSections(missingSections);
+            return;
+        }
+
         const pane = document.createElement('div');
         pane.className = 'tab-pane active';
         elements.tabContentContainer.appendChild(pane);
@@ -875,7 +1007,10 @@ document.addEventListener('DOMContentLoaded', () => {
                 <div id="monthly-averages-card" class="card"></div>
             </div>`;
         
-        const realtimeData = await fetchRealtimeData();
+        // 서버 델타로 갱신된 경우 재조회 없이 로컬 상태로 다시 그림
+        const usePatched = state.realtime_patched && state.realtime_data;
+        state.realtime_patched = false;
+        const realtimeData = usePatched ? state.realtime_data : await fetchRealtimeData();
         if (!realtimeData) {
             content.innerHTML = '<p>실시간 데이터를 불러오는 데 실패했습니다.</p>';
             return;
@@ -1892,7 +2027,7 @@ document.addEventListener('DOMContentLoaded', () => {
             } else { // session_trace
                 headers = ['공정', '작업자', '작업 시작', '작업 종료', '품목', '완료수량', 'WID', 'FPB'];
                 rows = result.data.map(s => ({
-                    id: s.start_time_dt, // 고유 ID로 사용
+                    id: s.id, // 세션 고유 ID
                     data: [
                         s.process,
                         s.worker,
@@ -1909,11 +2044,12 @@ document.addEventListener('DOMContentLoaded', () => {
             const table = createTable(headers, rows, true);
             resultsContainer.appendChild(table);
 
-            // 세션 추적 결과에 더블클릭 이벤트 추가
+            // 세션 추적 결과에 더블클릭 이벤트 추가 (바코드 목록은 한 번에 미리 불러옴)
             if (result.type === 'session_trace') {
+                prefetchSessionBarcodes(result.data.map(s => s.id));
                 table.querySelectorAll('tbody tr').forEach(tr => {
                     tr.addEventListener('dblclick', async () => {
-                        const sessionData = result.data.find(s => s.start_time_dt === tr.dataset.id);
+                        const sessionData = result.data.find(s => String(s.id) === tr.dataset.id);
                         if (sessionData) {
                             await showBarcodePopup(sessionData);
                         }
@@ -1926,15 +2062,44 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    // 세션 id별 바코드 목록 캐시 (세션 id는 동기화 후에도 유지됨)
+    const sessionBarcodeCache = new Map();
+    const SESSION_BARCODE_BATCH_SIZE = 500;
+
+    async function prefetchSessionBarcodes(sessionIds) {
+        const missing = sessionIds.filter(id => id != null && !sessionBarcodeCache.has(id));
+        for (let i = 0; i < missing.length; i += SESSION_BARCODE_BATCH_SIZE) {
+            try {
+                const response = await fetch('/api/session_barcodes/batch', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ session_ids: missing.slice(i, i + SESSION_BARCODE_BATCH_SIZE) })
+                });
+                if (!response.ok) return;
+                const data = await response.json();
+                Object.entries(data.barcodes || {}).forEach(([id, barcodes]) => {
+                    sessionBarcodeCache.set(Number(id), barcodes);
+                });
+            } catch (error) {
+                return;  // 미리 불러오기 실패 시 더블클릭할 때 개별 조회
+            }
+        }
+    }
+
     async function showBarcodePopup(sessionData) {
         try {
-            const response = await fetch('/api/session_barcodes', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(sessionData)
-            });
-            if (!response.ok) throw new Error('바코드 정보를 가져오는 데 실패했습니다.');
-            const data = await response.json();
+            let data;
+            if (sessionBarcodeCache.has(sessionData.id)) {
+                data = { barcodes: sessionBarcodeCache.get(sessionData.id) };
+            } else {
+                const response = await fetch('/api/session_barcodes', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(sessionData)
+                });
+                if (!response.ok) throw new Error('바코드 정보를 가져오는 데 실패했습니다.');
+                data = await response.json();
+            }
             
             const modal = createModal('barcode-popup', `제품 바코드 목록 (${sessionData.item_display})`);
             const content = modal.querySelector('.modal-content');
@@ -104,7 +104,9 @@ document.addEventListener('DOMContentLoaded', () => {
                     process_mode: state.process_mode,
                     start_date: state.start_date,
                     end_date: state.end_date,
-                    selected_workers: []
+                    selected_workers: [],
+                    // HR 전체 기간 데이터(hr)는 HR 탭을 열 때 따로 조회
+                    sections: ['summary', 'sessions', 'history', 'comparison']
                 }),
                 signal: AbortSignal.timeout(30000) // 30초 타임아웃
             });
@@ -135,6 +137,38 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    async function loadHRData(data) {
+        log.debug('📡 HR 데이터 로딩 시작...');
+        data.hr_loading = true;
+        try {
+            const response = await fetch((typeof API_BASE !== 'undefined' ? API_BASE : '/') + 'api/data', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ process_mode: state.process_mode, sections: ['hr'] }),
+                signal: AbortSignal.timeout(30000)
+            });
+            if (!response.ok) throw new Error('API 오류: ' + response.status);
+
+            const hrData = await response.json();
+            data.hr_sessions_data = hrData.hr_sessions_data || [];
+            log.debug('✅ HR 데이터 수신:', data.hr_sessions_data.length);
+            // 그 사이 공정/기간이 바뀌었거나 다른 탭으로 이동했으면 표시하지 않음
+            if (state.full_data === data && state.active_tab === 'HR') {
+                renderTab('HR', data);
+            }
+        } catch (error) {
+            log.error('❌ HR 데이터 로딩 실패:', error);
+            data.hr_loading = false;
+            if (state.full_data === data && state.active_tab === 'HR') {
+                elements.tabContentContainer.innerHTML = `
+                    <div style="padding: 40px; text-align: center;">
+                        <p style="color: red;">❌ HR 데이터 로딩 실패: ${escapeHtml(error.message)}</p>
+                    </div>
+                `;
+            }
+        }
+    }
+
     function renderDashboard(data) {
         log.debug('📊 대시보드 렌더링 시작...');
 
@@ -336,6 +370,11 @@ document.addEventListener('DOMContentLoaded', () => {
         } else if (tabName === '상세 데이터') {
             renderDetailsWithSearch(container, data); // 검색 기능 추가
         } else if (tabName === 'HR') {
+            if (!data.hr_sessions_data) {
+                container.innerHTML = '<div style="padding: 40px; text-align: center;">HR 데이터를 불러오는 중...</div>';
+                if (!data.hr_loading) loadHRData(data);
+                return;
+            }
             renderHRDashboard(container, data); // HR 분석 (입사/퇴사)
         }
     }
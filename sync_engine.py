@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+sync_engine.py - 프로세스 내 증분 동기화 엔진
+작업 이벤트 로그를 파일별 오프셋(LogTailReader)으로 읽어 raw 이벤트/세션을 DB에 반영하는
+상주 서비스. 파일 감시(watchdog)와 주기 점검이 작업 큐에 파일을 넣으면 단일 쓰기 스레드가
+순서대로 처리하고, 한 번에 처리한 묶음마다 파생 테이블 갱신과 알림을 한 번만 수행한다.
+watchdog 이벤트는 파일별로 디바운스하되 최대 지연 시간을 넘기지 않도록 모아서 처리한다.
+raw_events 월별 보관 같은 DB 유지보수 작업도 같은 스레드에서 파일 처리 사이에 실행한다.
+"""
+
+import os
+import sqlite3
+import time
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import logging
+
+from log_catalog import LIVE_LOCATIONS, LOCATION_MAIN
+from log_tail_reader import LogTailReader, normalize_event_frame
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REQUIRED_EVENT_COLUMNS = ['timestamp', 'event', 'details']
+# on_synced로 전달하는 변경 세션 요약 컬럼 (실시간 델타 계산용)
+CHANGED_SESSION_FIELDS = ('worker', 'process', 'date', 'start_time_dt', 'end_time_dt', 'item_code',
+                          'item_display', 'pcs_completed', 'work_time')
+DEFAULT_DEBOUNCE_SECONDS = 0.2     # 같은 파일의 연속 수정은 이 시간 동안 조용해질 때까지 모음
+DEFAULT_MAX_LATENCY_SECONDS = 1.0  # 계속 수정되는 파일도 첫 이벤트 후 이 시간 안에는 처리
+DEFAULT_RAW_EVENT_HOT_MONTHS = 2     # 유지보수 시 메인 DB에 남길 raw_events 개월 수
+
+
+def sessions_to_records(sessions_df: pd.DataFrame) -> list:
+    """세션 DataFrame을 DB 삽입용 dict 목록으로 변환 (날짜/시각은 ISO 문자열, NaN은 None)"""
+    df = sessions_df.copy()
+    for column in ('start_time_dt', 'end_time_dt'):
+        df[column] = df[column].map(lambda v: v.isoformat() if pd.notna(v) else None)
+    df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+    df['shipping_date'] = pd.to_datetime(df['shipping_date'], errors='coerce').dt.strftime('%Y-%m-%d')
+    df['had_error'] = df['had_error'].astype(int)
+    df['first_pass_yield'] = (df['had_error'] == 0).astype(float)
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict('records')
+
+
+class SyncEngine:
+    """작업 큐 기반 증분 동기화 엔진
+
+    - 파일별 오프셋은 LogTailReader가 유지하므로 매번 새로 추가된 행만 읽는다.
+    - DB 쓰기는 엔진의 작업 스레드 하나에서만 일어난다. 작업 스레드는 풀과 별개인 전용 쓰기 연결
+      하나를 열어 모든 쓰기에 사용하고, 엔진이 멈출 때 닫는다.
+    - 큐는 파일별로 합쳐진다. 같은 파일의 수정 이벤트는 debounce초 동안 조용해지면 처리하되,
+      첫 이벤트 후 max_latency초가 지나면 계속 수정 중이어도 처리한다 (파일마다 독립적으로 판정).
+    - 큐에 쌓인 파일을 모두 처리한 뒤 파생 테이블(롤업/세션 바코드) 갱신과 on_synced 콜백을 한 번 호출한다.
+    - request_maintenance()로 요청한 유지보수(raw_events 월별 보관/압축)도 작업 스레드에서 실행한다.
+    """
+
+    def __init__(self, db, analyzer, tail_reader: LogTailReader, catalog, folder_path: str,
+                 on_synced: Optional[Callable[[dict], None]] = None,
+                 debounce: float = DEFAULT_DEBOUNCE_SECONDS, max_latency: float = DEFAULT_MAX_LATENCY_SECONDS,
+                 raw_event_hot_months: int = DEFAULT_RAW_EVENT_HOT_MONTHS):
+        """
+        Args:
+            db: DatabaseManager
+            analyzer: 이벤트 → 세션 변환기 (process_events_to_sessions 제공)
+            tail_reader: 파일별 오프셋 리더
+            catalog: 로그 파일 카탈로그 (주기 점검 시 파일 목록 조회용)
+            folder_path: 로그 루트 폴더
+            on_synced: 새 데이터가 반영된 묶음마다 호출
+                (인자: {'files', 'events', 'sessions', 'updated', 'changed_sessions'},
+                changed_sessions는 삽입/갱신된 세션의 CHANGED_SESSION_FIELDS 목록)
+            debounce: 파일별 디바운스 시간 (초)
+            max_latency: 첫 수정 이벤트부터 처리까지 최대 지연 시간 (초)
+            raw_event_hot_months: 유지보수 시 메인 DB에 남길 raw_events 개월 수 (이전 월은 파티션으로 이동)
+        """
+        self.db = db
+        self.analyzer = analyzer
+        self.tail_reader = tail_reader
+        self.catalog = catalog
+        self.folder_path = folder_path
+        self.on_synced = on_synced
+        self.debounce = debounce
+        self.max_latency = max_latency
+        self.raw_event_hot_months = raw_event_hot_months
+
+        # 파일 경로 → (첫 이벤트 시각, 처리 예정 시각) (time.monotonic 기준)
+        self._pending: Dict[str, Tuple[float, float]] = {}
+        self._maintenance_requested = False
+        self._cond = threading.Condition()
+        self._sync_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    # ------------------------------------------------------------------
+    # 작업 큐
+    # ------------------------------------------------------------------
+
+    def queue_status(self) -> dict:
+        """큐 상태 (대기 파일 수, 가장 오래 기다린 파일의 대기 시간)"""
+        now = time.monotonic()
+        with self._cond:
+            oldest = max((now - first for first, _ in self._pending.values()), default=0.0)
+            return {'depth': len(self._pending), 'oldest_wait_sec': round(oldest, 3)}
+
+    def enqueue(self, file_path: str, immediate: bool = False) -> bool:
+        """파일을 동기화 큐에 추가 (이미 대기 중이면 처리 예정 시각만 갱신하고 False)
+
+        Args:
+            immediate: True면 디바운스 없이 바로 처리 (주기 점검, 파일 생성/이동 등)
+        """
+        now = time.monotonic()
+        with self._cond:
+            first_seen, _ = self._pending.get(file_path, (now, now))
+            due = now if immediate else min(now + self.debounce, first_seen + self.max_latency)
+            is_new = file_path not in self._pending
+            self._pending[file_path] = (first_seen, due)
+            self._cond.notify()
+        return is_new
+
+    def enqueue_many(self, file_paths: Iterable[str]) -> int:
+        return sum(self.enqueue(file_path, immediate=True) for file_path in file_paths)
+
+    def request_maintenance(self):
+        """유지보수 작업 요청 (작업 스레드가 대기 중인 파일 처리 후 실행, 중복 요청은 한 번으로 합침)"""
+        with self._cond:
+            self._maintenance_requested = True
+            self._cond.notify()
+
+    def enqueue_unsynced(self) -> int:
+        """카탈로그의 라이브 로그 파일 중 마지막 동기화 이후 수정된 파일을 큐에 추가 (주기 점검용)
+
+        Returns:
+            새로 큐에 넣은 파일 수
+        """
+        self.catalog.refresh(self.folder_path)
+        candidates = []
+        for file_path in self.catalog.get_files(self.folder_path, locations=LIVE_LOCATIONS):
+            if "작업이벤트로그" not in os.path.basename(file_path):
+                continue
+            try:
+                candidates.append((file_path, datetime.fromtimestamp(os.stat(file_path).st_mtime)))
+            except OSError:
+                continue
+        unsynced = self.db.get_unsynced_files(candidates)
+        return self.enqueue_many(file_path for file_path, _ in unsynced)
+
+    # ------------------------------------------------------------------
+    # 작업 스레드
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """작업 스레드 시작 (이미 실행 중이면 무시)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='SyncEngine', daemon=True)
+        self._thread.start()
+        logger.info("증분 동기화 엔진 시작")
+
+    def stop(self, timeout: Optional[float] = None):
+        """작업 스레드 정지 (스레드 종료 시 쓰기 연결도 닫힘)"""
+        with self._cond:
+            self._stopped.set()
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _take_due(self) -> Tuple[List[str], bool]:
+        """처리 예정 시각이 된 파일과 유지보수 요청 여부를 꺼냄
+
+        둘 다 없으면 가장 가까운 예정 시각까지 대기하고, 정지 시 ([], False)를 반환한다.
+        """
+        with self._cond:
+            while not self._stopped.is_set():
+                now = time.monotonic()
+                due = [path for path, (_, due_at) in self._pending.items() if due_at <= now]
+                maintenance, self._maintenance_requested = self._maintenance_requested, False
+                if due or maintenance:
+                    for path in due:
+                        del self._pending[path]
+                    return due, maintenance
+                next_due = min((due_at for _, due_at in self._pending.values()), default=None)
+                self._cond.wait(None if next_due is None else next_due - now)
+            return [], False
+
+    def _run(self):
+        try:
+            while not self._stopped.is_set():
+                # 예정 시각이 된 파일을 모두 처리한 뒤 파생 테이블 갱신/알림은 한 번만
+                batch, maintenance = self._take_due()
+                if not (batch or maintenance):
+                    continue
+                self._open_writer()
+                if batch:
+                    self.process_batch(batch)
+                if maintenance:
+                    self.run_maintenance()
+        finally:
+            self.db.close_writer_connection()
+
+    def _open_writer(self):
+        """작업 스레드 전용 쓰기 연결 확보 (묶음마다 호출, DB 파일이 교체된 경우에만 다시 연결)"""
+        try:
+            self.db.open_writer_connection()
+        except sqlite3.Error as e:
+            logger.warning(f"쓰기 연결 열기 실패, 연결 풀 사용: {e}")
+
+    def run_maintenance(self):
+        """DB 유지보수 - hot 기간 이전 월의 raw_events를 월별 파티션으로 이동 후 필요 시 메인 DB 압축
+        (작업 스레드에서 호출)"""
+        with self._sync_lock:
+            try:
+                moved = self.db.archive_raw_events(self.raw_event_hot_months)
+            except Exception as e:
+                logger.warning(f"raw_events 월별 보관 실패: {e}")
+                return
+        if not moved:
+            return
+        # VACUUM은 동기화 잠금 밖에서, 빈 페이지가 충분히 쌓였을 때만 실행
+        try:
+            self.db.vacuum_if_fragmented()
+        except Exception as e:
+            logger.warning(f"DB VACUUM 실패: {e}")
+
+    def process_batch(self, file_paths: Iterable[str]) -> dict:
+        """파일 묶음을 순서대로 동기화하고 변경이 있으면 파생 테이블 갱신 후 on_synced 호출"""
+        summary = {'files': [], 'events': 0, 'sessions': 0, 'updated': 0, 'changed_sessions': []}
+        for file_path in dict.fromkeys(file_paths):
+            result = self.sync_file(file_path)
+            if any(result.values()):
+                summary['files'].append(os.path.basename(file_path))
+                for key in ('events', 'sessions', 'updated'):
+                    summary[key] += result[key]
+                summary['changed_sessions'].extend(result['changed_sessions'])
+
+        self.tail_reader.save_state()
+        if not summary['files']:
+            return summary
+        try:
+            if summary['sessions'] or summary['updated']:
+                self.db.refresh_derived_tables()
+            if self.on_synced:
+                self.on_synced(summary)
+        except Exception as e:
+            logger.error(f"동기화 후처리 오류: {e}")
+        return summary
+
+    # ------------------------------------------------------------------
+    # 파일 단위 동기화
+    # ------------------------------------------------------------------
+
+    def sync_file(self, file_path: str) -> dict:
+        """로그 파일에 마지막 동기화 이후 추가된 행만 읽어 raw 이벤트/세션을 DB에 반영
+
+        Returns:
+            {'events': 삽입된 이벤트 수, 'sessions': 삽입된 세션 수, 'updated': 갱신된 세션 수,
+             'changed_sessions': 삽입/갱신이 있었을 때 이번에 반영한 세션 요약 목록}
+        """
+        result = {'events': 0, 'sessions': 0, 'updated': 0, 'changed_sessions': []}
+        file_name = os.path.basename(file_path)
+        with self._sync_lock:
+            try:
+                delta_df = self.tail_reader.read_new_rows(file_path)
+                if not delta_df.empty and all(h in delta_df.columns for h in REQUIRED_EVENT_COLUMNS):
+                    delta_df = normalize_event_frame(delta_df, file_name)
+                    if not delta_df.empty:
+                        self._write_delta(delta_df, file_name, result)
+                self._record_sync(file_path, file_name, len(delta_df))
+            except Exception as e:
+                logger.error(f"증분 동기화 오류 {file_path}: {e}")
+                self._record_sync(file_path, file_name, 0, error=str(e))
+                return result
+
+        if result['events'] or result['sessions']:
+            logger.info(f"증분 동기화: {file_name} - 이벤트 {result['events']}개, 세션 {result['sessions']}개")
+        return result
+
+    def _write_delta(self, delta_df: pd.DataFrame, file_name: str, result: dict):
+        # JSON details는 일괄 파싱 후 정규화/바코드 추출, 그 외 형식은 원문 유지 (중복은 DB에서 무시)
+        result['events'] = self.db.insert_raw_event_frame(delta_df.assign(source_file=file_name))['inserted']
+
+        sessions_df = self.analyzer.process_events_to_sessions(delta_df, keep_raw=False)
+        if not sessions_df.empty:
+            records = sessions_to_records(sessions_df)
+            session_result = self.db.upsert_sessions(records)
+            result['sessions'], result['updated'] = session_result['inserted'], session_result['updated']
+            if result['sessions'] or result['updated']:
+                result['changed_sessions'] = [
+                    {field: record.get(field) for field in CHANGED_SESSION_FIELDS} for record in records
+                ]
+
+    def _record_sync(self, file_path: str, file_name: str, row_count: int, error: Optional[str] = None):
+        """file_sync_log 갱신 (주기 점검에서 변경 없는 파일을 건너뛰기 위함)"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+        try:
+            self.db.update_sync_log(file_path, file_name, datetime.fromtimestamp(stat.st_mtime), row_count,
+                                    stat.st_size, status='error' if error else 'success', error_message=error)
+        except Exception as e:
+            logger.warning(f"동기화 로그 기록 실패 {file_name}: {e}")
+
+        # 메인 폴더 밖(날짜별 아카이브)의 파일은 더 이상 추가되지 않으므로 오프셋 상태를 남기지 않음
+        if not error:
+            info = self.catalog.get_file_info(file_path)
+            if info and info['location'] != LOCATION_MAIN:
+                self.tail_reader.forget(file_path)